@@ -1,9 +1,9 @@
 
 from langchain_ollama import OllamaEmbeddings
 import chromadb
-from config import CHROMA_DIR
+from config import settings
 
 client = chromadb.Client()
 collection = client.get_or_create_collection("students")
 
-embedder = OllamaEmbeddings(model="nomic-embed-text:latest")
+embedder = OllamaEmbeddings(model="nomic-embed-text:latest", base_url=settings.OLLAMA_BASE_URL)
@@ -1,5 +1,6 @@
 
 from langchain_ollama import ChatOllama
+from config import settings
 
-llm = ChatOllama(model="gemma2:2b", temperature=0.0)
+llm = ChatOllama(model="gemma2:2b", temperature=0.0, base_url=settings.OLLAMA_BASE_URL)
 print(f"ollama llm is running:{llm}")
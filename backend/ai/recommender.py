@@ -1,9 +1,11 @@
 
 from ai.ollama_llm import llm
 from ai.prompts import RECOMMEND_PROMPT
+from utils import metrics
 
 def explain(universities):
     print(f"recommender explain function is calling",universities)
-    return llm.invoke(
-        RECOMMEND_PROMPT.format(universities=universities)
-    ).content
+    with metrics.timed("llm"):
+        return llm.invoke(
+            RECOMMEND_PROMPT.format(universities=universities)
+        ).content
@@ -0,0 +1,116 @@
+# async_db.py - Awaitable SQLite access for async route handlers
+"""
+async def handlers must not call sqlite3 directly: every query would block
+the event loop and stall all other requests. They await DBPool instead.
+DBPool runs the work on a small dedicated thread pool, and each worker
+keeps one connection open for reuse.
+
+    rows = await db_pool().fetchall("SELECT ... WHERE id = ?", (uid,))
+    doc_id = await db_pool().run(save_document, application_id, path)
+
+run() calls fn(conn, *args) on a worker, inside the caller's context, so
+per-request DB timing and slow-query logging still reach the request.
+A job that fails leaves no open transaction behind. Sync handlers keep
+using sqlite.get_db on Starlette's thread pool.
+"""
+import time
+import sqlite3
+import asyncio
+import threading
+import contextvars
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+from config import settings
+from sqlite import connect
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+POOL_WAIT = metrics.REGISTRY.register(metrics.Histogram(
+    "db_pool_wait_seconds", "Time async DB jobs wait for a pool thread"))
+
+
+class DBPool:
+    def __init__(self, size: int, db_name: Optional[str] = None):
+        self.size = size
+        self.db_name = db_name
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sqlite-pool")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only this worker uses it; check_same_thread=False just lets close() run elsewhere
+            conn = connect(self.db_name, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _call(self, queued_at: float, fn: Callable[..., T], args, kwargs) -> T:
+        POOL_WAIT.observe((), time.perf_counter() - queued_at)
+        conn = self._connection()
+        try:
+            return fn(conn, *args, **kwargs)
+        finally:
+            # The connection outlives the job; never hand an open transaction to the next one
+            if conn.in_transaction:
+                conn.rollback()
+
+    def submit(self, fn: Callable[..., T], *args, **kwargs) -> "Future[T]":
+        """Schedule fn(conn, *args, **kwargs) on a pool thread; returns a concurrent Future"""
+        ctx = contextvars.copy_context()
+        return self._executor.submit(ctx.run, self._call, time.perf_counter(), fn, args, kwargs)
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Await fn(conn, *args, **kwargs) without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> Tuple[int, int]:
+        """Run one write statement and commit; returns (lastrowid, rowcount)"""
+        def write(conn: sqlite3.Connection):
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid, cursor.rowcount
+        return await self.run(write)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+_pool: Optional[DBPool] = None
+_pool_lock = threading.Lock()
+
+
+def db_pool() -> DBPool:
+    """The process-wide async DB pool (created on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DBPool(settings.DB_POOL_SIZE)
+    return _pool
+
+
+def close_db_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
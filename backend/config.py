@@ -5,14 +5,45 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Settings:
-    # Database
+    # Database: the transactional store (users, applications, payments, notifications, chat, ...)
     DATABASE_NAME = os.getenv("DATABASE_NAME", "University.db")
+    # Read-mostly catalog store (universities, majors, scholarships, partners, ...); empty keeps it in DATABASE_NAME
+    CATALOG_DATABASE_NAME = os.getenv("CATALOG_DATABASE_NAME", "")
+    CATALOG_IMMUTABLE = os.getenv("CATALOG_IMMUTABLE", "false").lower() == "true"  # only if the catalog file is never written while served
+    # Cold store for rows moved out of the hot tables (services/archive_service.py); empty disables archiving
+    ARCHIVE_DATABASE_NAME = os.getenv("ARCHIVE_DATABASE_NAME", os.path.splitext(DATABASE_NAME)[0] + "_archive.db")
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))  # 0 disables the slow-query log
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))  # threads serving async handlers' queries
+    DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "64"))  # write jobs per group commit
+
+    # Logging
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_DIR = os.getenv("LOG_DIR", "log")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # console format: text or json (the log file is always json)
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))  # share of requests traced at DEBUG
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records beyond this are dropped, never waited on
+
+    # Catalog response cache
+    CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))  # seconds; bounds staleness across workers
+    CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "30"))  # Cache-Control max-age for catalog responses
+    CATALOG_SNAPSHOT_TTL = float(os.getenv("CATALOG_SNAPSHOT_TTL", "300"))  # seconds before a background reload
+    # AI weights (services/weights_registry.py): how stale another worker's view of /ai-settings may be
+    AI_WEIGHTS_REFRESH_SECONDS = float(os.getenv("AI_WEIGHTS_REFRESH_SECONDS", "5"))
 
     # JWT Settings
     SECRET_KEY = os.getenv("SECRET_KEY", "bcbe7c26cb50d2ebe7e5e7b6f7a58464316791a568c46a053b6803852a07eaee")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  
     REFRESH_TOKEN_EXPIRE_DAYS = 30
+    # Revocation filter (services/token_revocation.py): how stale another worker's view of logouts may be
+    TOKEN_REVOCATION_REFRESH_SECONDS = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "30"))
+    TOKEN_REVOCATION_CAPACITY = int(os.getenv("TOKEN_REVOCATION_CAPACITY", "100000"))  # filter size; grows with the table
+    TOKEN_REVOCATION_ERROR_RATE = float(os.getenv("TOKEN_REVOCATION_ERROR_RATE", "0.01"))  # share of requests confirmed in SQLite
+
+    # Password hashing (password_pool.py)
+    PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))  # bcrypt cost; perf/password_cost.py picks one for a target latency
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))  # hashes run at once; 0 = one per core
+    PASSWORD_HASH_QUEUE_MAX = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", "64"))  # waiting beyond this get 503
     
     # File Upload
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/frontend/static/storage/scholarship")
@@ -27,6 +58,22 @@ class Settings:
     CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_db")
     CHROMA_COLLECTION = "university_embeddings"
     
+    # Backups (services/backup_service.py)
+    BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+    BACKUP_INTERVAL_MINUTES = int(os.getenv("BACKUP_INTERVAL_MINUTES", "1440"))  # 0 disables scheduled snapshots
+    BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))  # completed snapshots kept
+    BACKUP_STEP_PAGES = int(os.getenv("BACKUP_STEP_PAGES", "256"))  # pages copied per backup step
+    BACKUP_STEP_SLEEP_MS = float(os.getenv("BACKUP_STEP_SLEEP_MS", "5"))  # pause between steps to leave I/O for requests
+
+    # Archival (services/archive_service.py); a retention of 0 days keeps that table's rows hot
+    ARCHIVE_INTERVAL_MINUTES = int(os.getenv("ARCHIVE_INTERVAL_MINUTES", "60"))  # 0 disables scheduled runs
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))  # rows moved per transaction
+    ARCHIVE_BATCH_PAUSE_MS = float(os.getenv("ARCHIVE_BATCH_PAUSE_MS", "20"))  # pause between batches to leave the writer to requests
+    ARCHIVE_NOTIFICATIONS_DAYS = int(os.getenv("ARCHIVE_NOTIFICATIONS_DAYS", "30"))  # read notifications only
+    ARCHIVE_OTP_DAYS = int(os.getenv("ARCHIVE_OTP_DAYS", "1"))  # after expiry
+    ARCHIVE_CHAT_DAYS = int(os.getenv("ARCHIVE_CHAT_DAYS", "90"))  # since the session's last activity
+    ARCHIVE_APPLICATIONS_DAYS = int(os.getenv("ARCHIVE_APPLICATIONS_DAYS", "180"))  # Final Offer / Rejected, since last update
+    
     # OTP Settings (Simulated - replace with real SMS service in production)
     OTP_EXPIRY_MINUTES = 10
     OTP_LENGTH = 6
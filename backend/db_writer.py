@@ -0,0 +1,251 @@
+# db_writer.py - Single writer thread with group commit
+"""
+SQLite allows one writer at a time. When every request commits on its own
+connection, concurrent writers queue on the file lock and can time out
+with "database is locked". Instead, each process has one writer thread
+that owns the only write connection. Writes are queued as jobs:
+
+    app = db_writer().write(ApplicationService.create_application, user_id, ...)
+    lastrowid, rowcount = db_writer().execute("UPDATE ... WHERE id = ?", (uid,))
+    lastrowid, rowcount = await db_writer().run(execute_statement, sql, params)
+
+write() calls job(conn, *args) on the writer thread and returns its result
+once the job is committed. The thread drains up to DB_WRITE_BATCH_MAX
+queued jobs and runs them in a single BEGIN IMMEDIATE ... COMMIT, so a
+burst of writes pays for one fsync rather than one per job (group commit).
+
+Each job runs in its own savepoint, and conn.commit()/rollback() inside a
+job act on that savepoint. A job therefore behaves as it would on a private
+connection: work after its last commit() is discarded when it returns, and
+a job that raises only loses its own writes. Jobs must not do slow non-DB
+work (HTTP, SMS, LLM calls); do that before or after write().
+
+The writer attaches the catalog and archive stores read-write (request
+connections get them read-only) and switches every database to WAL, so
+readers on other connections are not blocked while a batch commits. Other
+worker processes still have their own writer and contend on the file lock
+with the usual busy timeout.
+"""
+import time
+import queue
+import sqlite3
+import asyncio
+import threading
+import contextvars
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+from config import settings
+from sqlite import connect
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WRITE_WAIT = metrics.REGISTRY.register(metrics.Histogram(
+    "db_write_wait_seconds", "Time write jobs wait in the writer queue"))
+WRITE_BATCH_SIZE = metrics.REGISTRY.register(metrics.Histogram(
+    "db_write_batch_size", "Write jobs committed per transaction", buckets=metrics.COUNT_BUCKETS))
+WRITE_COMMIT_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    "db_write_commit_seconds", "Duration of a group commit"))
+
+SAVEPOINT = "write_job"
+_STOP = object()
+
+
+def execute_statement(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> Tuple[int, int]:
+    """Write job for a single statement; returns (lastrowid, rowcount)"""
+    cursor = conn.execute(sql, params)
+    conn.commit()
+    return cursor.lastrowid, cursor.rowcount
+
+
+class JobConnection:
+    """
+    What a write job sees as its connection. Statements go to the writer's
+    connection; commit, rollback and close are scoped to the job's savepoint.
+    """
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection):
+        object.__setattr__(self, "_conn", conn)
+
+    def commit(self):
+        # Keep everything so far: release the savepoint and start a new one
+        self._conn.execute(f"RELEASE {SAVEPOINT}")
+        self._conn.execute(f"SAVEPOINT {SAVEPOINT}")
+
+    def rollback(self):
+        self._conn.execute(f"ROLLBACK TO {SAVEPOINT}")
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # e.g. row_factory; the writer resets it before every job
+        setattr(self._conn, name, value)
+
+
+class _Job:
+    __slots__ = ("fn", "args", "kwargs", "ctx", "future", "queued_at")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.ctx = contextvars.copy_context()
+        self.future: Future = Future()
+        self.queued_at = time.perf_counter()
+
+
+class DBWriter:
+    def __init__(self, db_name: Optional[str] = None, batch_max: int = 64):
+        self.db_name = db_name
+        self.batch_max = batch_max
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        # Opened here so a bad path fails the caller instead of the thread
+        self._conn = self._open()
+        self._job_conn = JobConnection(self._conn)
+        self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def _open(self) -> sqlite3.Connection:
+        # isolation_level=None: transactions are only the ones issued here
+        conn = connect(self.db_name, catalog="rw", archive="rw", check_same_thread=False, isolation_level=None)
+        for (_, schema, _) in conn.execute("PRAGMA database_list").fetchall():
+            if schema == "temp":
+                continue
+            mode = conn.execute(f"PRAGMA {schema}.journal_mode=WAL").fetchone()[0]
+            if mode.lower() != "wal":
+                logger.warning("sqlite writer: %s journal_mode is %s, readers will block during commits", schema, mode)
+        return conn
+
+    def _run(self):
+        try:
+            while True:
+                job = self._queue.get()
+                if job is _STOP:
+                    return
+                batch = [job]
+                stop = False
+                while len(batch) < self.batch_max:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is _STOP:
+                        stop = True
+                        break
+                    batch.append(job)
+                self._run_batch(batch)
+                if stop:
+                    return
+        finally:
+            self._conn.close()
+
+    def _run_job(self, job: _Job) -> Tuple[bool, Any]:
+        conn = self._conn
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"SAVEPOINT {SAVEPOINT}")
+        try:
+            value = job.ctx.run(job.fn, self._job_conn, *job.args, **job.kwargs)
+            ok = True
+        except Exception as e:
+            value, ok = e, False
+        # Drop whatever the job did after its last commit(), then end its savepoint
+        conn.execute(f"ROLLBACK TO {SAVEPOINT}")
+        conn.execute(f"RELEASE {SAVEPOINT}")
+        return ok, value
+
+    def _run_batch(self, batch: List[_Job]):
+        conn = self._conn
+        now = time.perf_counter()
+        running = []
+        for job in batch:
+            if job.future.set_running_or_notify_cancel():
+                WRITE_WAIT.observe((), now - job.queued_at)
+                running.append(job)
+        if not running:
+            return
+
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job in running:
+                outcomes.append(self._run_job(job))
+            start = time.perf_counter()
+            conn.execute("COMMIT")
+            WRITE_COMMIT_SECONDS.observe((), time.perf_counter() - start)
+        except Exception as e:
+            # BEGIN/COMMIT failed or a job broke the transaction: nothing in the batch was kept
+            logger.error("sqlite writer: batch of %s jobs failed: %s", len(running), e)
+            if conn.in_transaction:
+                conn.rollback()
+            for job in running:
+                job.future.set_exception(e)
+            return
+
+        WRITE_BATCH_SIZE.observe((), len(running))
+        for job, (ok, value) in zip(running, outcomes):
+            if ok:
+                job.future.set_result(value)
+            else:
+                job.future.set_exception(value)
+
+    def submit(self, fn: Callable[..., T], *args, **kwargs) -> "Future[T]":
+        """Queue fn(conn, *args, **kwargs); the Future resolves after its batch commits"""
+        job = _Job(fn, args, kwargs)
+        if threading.current_thread() is self._thread:
+            # A job calling write() would wait on itself; run it inside the current job
+            try:
+                job.future.set_result(fn(self._job_conn, *args, **kwargs))
+            except Exception as e:
+                job.future.set_exception(e)
+            return job.future
+        if not self._thread.is_alive():
+            raise RuntimeError("sqlite writer is closed")
+        self._queue.put(job)
+        return job.future
+
+    def write(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run fn(conn, *args, **kwargs) on the writer and wait for the commit"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Awaitable write(), for async handlers"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> Tuple[int, int]:
+        """Run one write statement; returns (lastrowid, rowcount)"""
+        return self.write(execute_statement, sql, params)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+
+_writer: Optional[DBWriter] = None
+_writer_lock = threading.Lock()
+
+
+def db_writer() -> DBWriter:
+    """The process-wide writer (started on first use)"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = DBWriter(batch_max=settings.DB_WRITE_BATCH_MAX)
+    return _writer
+
+
+def close_db_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
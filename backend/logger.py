@@ -1,15 +1,151 @@
+# logger.py - Queue-based logging for the whole application
+"""
+Request threads only put records on a bounded queue; a single listener
+thread formats them and writes the file (JSON lines) and the console.
+When the queue is full, records are dropped rather than waited on.
+
+DEBUG output is sampled per request: with LOG_LEVEL=DEBUG and
+LOG_DEBUG_SAMPLE_RATE=0.05, one request in twenty is traced in full and the
+rest skip debug records before they are formatted. Use lazy arguments
+(logger.debug("rows: %s", rows)) so unsampled calls cost almost nothing.
+"""
+import os
+import copy
+import json
+import queue
+import atexit
+import random
 import logging
-from logging import FileHandler,StreamHandler
-import os 
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from config import settings
+from utils import metrics
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+DROPPED_RECORDS = metrics.REGISTRY.register(metrics.Counter(
+    "log_records_dropped_total", "Log records dropped because the logging queue was full"))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; extra={...} fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = record.stack_info
+        return json.dumps(payload, default=str)
+
+
+# ============= Debug sampling =============
+
+_trace_sampled: ContextVar[Optional[bool]] = ContextVar("log_trace_sampled", default=None)
+
+
+def begin_trace():
+    """Decide once per request whether its DEBUG records are kept"""
+    rate = settings.LOG_DEBUG_SAMPLE_RATE
+    return _trace_sampled.set(rate >= 1.0 or random.random() < rate)
+
+
+def end_trace(token):
+    _trace_sampled.reset(token)
+
+
+class DebugSampler(logging.Filter):
+    """Drops DEBUG records of unsampled requests (per record outside a request)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        sampled = _trace_sampled.get()
+        if sampled is None:
+            rate = settings.LOG_DEBUG_SAMPLE_RATE
+            return rate >= 1.0 or random.random() < rate
+        return sampled
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Never blocks the caller; only resolves the message, formatting happens on the listener"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED_RECORDS.inc()
+
+    def prepare(self, record):
+        # Bind args now (they may be mutated after this call returns) but
+        # leave JSON/text formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full at shutdown; wait for room instead of failing
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+# ============= Setup =============
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> logging.Logger:
+    """Route the root logger through the queue; safe to call more than once"""
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None:
+        return root
+
+    os.makedirs(settings.LOG_DIR, exist_ok=True)
+    file_handler = logging.FileHandler(os.path.join(settings.LOG_DIR, "log.txt"))
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampler())
 
-os.makedirs("log",exist_ok=False)
-logging.basicConfig(level=logging.INFO,format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-     handlers=[
-         FileHandler("log/log.txt"),
-         StreamHandler()
-     ] )
+    # Replace handlers installed by basicConfig calls that ran before us
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, settings.LOG_LEVEL, logging.INFO))
 
-logger=logging.getLogger(__name__)
+    _listener = _Listener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return root
 
 
-logger.info("sucessfully imported logger module")
+setup_logging()
+logger = logging.getLogger(__name__)
@@ -1,16 +1,26 @@
+from logger import logger
 from fastapi import FastAPI #type:ignore
 from fastapi.middleware.cors import CORSMiddleware #type:ignore
 from fastapi.staticfiles import StaticFiles #type:ignore
 from fastapi.responses import FileResponse, HTMLResponse #type:ignore
-from routers import auth, chat, admin, application, university, assessment, university_chatbot, admin_applications, scholarship, services, payment, admin_system
-import logging
-logging.basicConfig(level=logging.INFO)
-logger=logging.getLogger(__name__)
+from routers import auth, chat, admin, application, university, assessment, university_chatbot, admin_applications, scholarship, services, payment, admin_system, metrics
+from middleware.metrics_middleware import MetricsMiddleware
+from utils.responses import FastJSONResponse
 import uvicorn # type: iore
+from config import settings
+from migrations import apply_migrations
+from services.catalog_snapshot import get_catalog_snapshot
+from services.token_revocation import revocation_list
+from async_db import close_db_pool
+from password_pool import close_password_pool
+from db_writer import close_db_writer
+from services.backup_service import start_backup_scheduler, stop_backup_scheduler
+from services.archive_service import start_archive_scheduler, stop_archive_scheduler
 
 app = FastAPI(
     title="University Recommendation Platform",
-
+    # orjson-encoded bodies; see utils/responses.py for skipping validation on large lists
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -28,6 +38,7 @@ app.include_router(scholarship.router)
 app.include_router(services.router)
 app.include_router(payment.router)
 app.include_router(admin_system.router)
+app.include_router(metrics.router)
 
 
 app.mount(
@@ -47,9 +58,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it wraps everything, including CORS preflights
+app.add_middleware(MetricsMiddleware)
+
 logger.info("sucessfully created the connection")
 
 
+@app.on_event("startup")
+def run_migrations():
+    """Apply any pending schema migrations before serving requests"""
+    apply_migrations(settings.DATABASE_NAME)
+
+
+@app.on_event("startup")
+def load_catalog_snapshot():
+    """Load the catalog into memory so the first catalog read doesn't pay for it"""
+    get_catalog_snapshot()
+
+
+@app.on_event("startup")
+def load_revocation_list():
+    """Build the revoked-token filter before the first authenticated request"""
+    revocation_list().rebuild()
+
+
+@app.on_event("startup")
+def schedule_backups():
+    """Periodic online snapshots (BACKUP_INTERVAL_MINUTES; 0 disables)"""
+    start_backup_scheduler()
+
+
+@app.on_event("startup")
+def schedule_archival():
+    """Move cold rows into the archive store (ARCHIVE_INTERVAL_MINUTES; 0 disables)"""
+    start_archive_scheduler()
+
+
+@app.on_event("shutdown")
+def stop_backups():
+    stop_backup_scheduler()
+
+
+@app.on_event("shutdown")
+def stop_archival():
+    stop_archive_scheduler()
+
+
+@app.on_event("shutdown")
+def shutdown_db_pool():
+    close_db_pool()
+
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    close_password_pool()
+
+
+@app.on_event("shutdown")
+def shutdown_db_writer():
+    """Commit the queued writes and stop the writer thread"""
+    close_db_writer()
+
+
 
 @app.get("/", response_class=HTMLResponse)
 def root():
@@ -7,6 +7,7 @@ from datetime import datetime
 import sqlite3
 from sqlite import get_db
 from logger import logger 
+from services.token_revocation import revocation_list
 
 security = HTTPBearer(auto_error=False)
 
@@ -30,10 +31,9 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Security(securi
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        logger.info(f"JWT payload decoded successfully for sub: {payload.get('sub')}")
+        logger.debug("JWT payload decoded for sub: %s", payload.get('sub'))
         
         user_id: int = payload.get("sub")
-        logger.info(f"extracted token for user_id:{user_id}")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -50,7 +50,28 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Security(securi
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return {"user_id": user_id, "email": payload.get("email")}
+        if payload.get("type", "access") != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token type",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # In-memory Bloom filter first: only a possible hit costs a query
+        if revocation_list().is_revoked(payload.get("jti"), payload.get("fam")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        return {
+            "user_id": user_id,
+            "email": payload.get("email"),
+            "jti": payload.get("jti"),
+            "fam": payload.get("fam"),
+            "exp": exp,
+        }
         
     except JWTError:
         logger.error("jwt decode error")
@@ -64,8 +85,7 @@ def get_current_active_user(current_user: dict = Depends(get_current_user),db: s
     cursor = db.cursor()
     cursor.execute("SELECT is_active FROM users WHERE id = ?", (current_user["user_id"],))
     result = cursor.fetchone()
-    print(f"active user fetched from db:{result}")
-    logger.info(f"active user fetched from db:{result}")
+    logger.debug("active user fetched from db: %s", result)
     if not result or not result[0]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -112,7 +132,6 @@ def require_admin(current_user: dict = Depends(get_current_active_user),db: sqli
         logger.error("adminstrative access required")
         raise HTTPException(403, "Administrative access required")  
    
-    print("current user id ",current_user) 
     return current_user
 
 
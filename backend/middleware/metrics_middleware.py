@@ -0,0 +1,47 @@
+# middleware/metrics_middleware.py - Per-route latency and dependency timing
+import time
+from utils import metrics
+from logger import begin_trace, end_trace
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, so /api/universities/3 and /4 share a series"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (does not buffer streaming responses).
+    Opens a RequestStats context that the SQLite, LLM and Chroma timers
+    write into, then publishes it under the route template. Also makes the
+    per-request DEBUG sampling decision for the logging pipeline.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = metrics.begin_request()
+        trace_token = begin_trace()
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            end_trace(trace_token)
+            metrics.end_request(token)
+            metrics.observe_request(scope["method"], route_template(scope), status, duration, stats)
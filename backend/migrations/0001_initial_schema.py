@@ -0,0 +1,394 @@
+# migrations/0001_initial_schema.py - Baseline platform schema
+"""Tables as originally created by database_enhanced.create_enhanced_schema"""
+
+DESCRIPTION = "initial schema"
+
+TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        phone TEXT UNIQUE,
+        email TEXT UNIQUE,
+        password_hash TEXT,
+        auth_provider TEXT,
+        is_active INTEGER DEFAULT 1,
+        is_premium INTEGER DEFAULT 0,
+        is_admin INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS otp_verification (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        phone TEXT,
+        otp_code TEXT,
+        expires_at TIMESTAMP,
+        is_verified INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS student_profiles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER UNIQUE,
+        full_name TEXT,
+        nationality TEXT,
+        date_of_birth DATE,
+        gpa REAL,
+        budget INTEGER,
+        preferred_country TEXT,
+        preferred_major TEXT,
+        learning_style TEXT,
+        career_goal TEXT,
+        bio TEXT,
+        profile_image TEXT,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS assessment_tests (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        test_type TEXT CHECK(test_type IN ('personality', 'academic', 'thinking', 'learning', 'interests', 'career')),
+        questions TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS assessment_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        test_type TEXT,
+        answers TEXT,
+        scores TEXT,
+        personality_type TEXT,
+        strengths TEXT,
+        weaknesses TEXT,
+        completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS major_recommendations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        major_name TEXT,
+        match_score REAL,
+        explanation TEXT,
+        difficulty_level TEXT,
+        career_paths TEXT,
+        estimated_cost INTEGER,
+        study_duration TEXT,
+        roadmap TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS universities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        country TEXT,
+        city TEXT,
+        tuition_fee INTEGER,
+        min_gpa REAL,
+        language TEXT,
+        scholarship_available INTEGER DEFAULT 0,
+        success_weight REAL DEFAULT 1.0,
+        overview TEXT,
+        duration TEXT,
+        accommodation_info TEXT,
+        website TEXT,
+        ranking INTEGER,
+        acceptance_rate REAL,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS university_media (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        university_id INTEGER,
+        media_type TEXT CHECK(media_type IN ('image', 'video')),
+        media_url TEXT,
+        caption TEXT,
+        display_order INTEGER DEFAULT 0,
+        FOREIGN KEY(university_id) REFERENCES universities(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS majors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        category TEXT,
+        difficulty TEXT CHECK(difficulty IN ('Easy', 'Medium', 'Hard')),
+        career_paths TEXT,
+        average_cost INTEGER,
+        description TEXT,
+        required_skills TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS university_majors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        university_id INTEGER,
+        major_name TEXT,
+        FOREIGN KEY(university_id) REFERENCES universities(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        university_id INTEGER,
+        major_id INTEGER,
+        status TEXT CHECK(status IN ('Draft', 'Submitted', 'Under Review',
+            'Missing Documents', 'Conditional Offer', 'Final Offer', 'Rejected'))
+            DEFAULT 'Draft',
+        application_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        notes TEXT,
+        admin_notes TEXT,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY(university_id) REFERENCES universities(id),
+        FOREIGN KEY(major_id) REFERENCES university_majors(id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS application_documents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        application_id INTEGER,
+        document_type TEXT,
+        file_path TEXT,
+        file_name TEXT,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_verified INTEGER DEFAULT 0,
+        FOREIGN KEY(application_id) REFERENCES applications(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        doc_type TEXT,
+        file_path TEXT,
+        file_name TEXT,
+        file_size INTEGER,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS scholarships (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        country TEXT,
+        provider TEXT,
+        min_gpa REAL,
+        max_age INTEGER,
+        nationality_requirement TEXT,
+        coverage TEXT,
+        amount INTEGER,
+        deadline DATE,
+        description TEXT,
+        required_documents TEXT,
+        website TEXT,
+        is_active INTEGER DEFAULT 1
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS scholarship_applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        scholarship_id INTEGER,
+        status TEXT CHECK(status IN ('Draft', 'Submitted', 'Under Review', 'Approved', 'Rejected')) DEFAULT 'Draft',
+        eligibility_score REAL,
+        submitted_at TIMESTAMP,
+        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY(scholarship_id) REFERENCES scholarships(id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS scholarship_documents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scholarship_app_id INTEGER,
+        document_type TEXT,
+        file_path TEXT,
+        file_name TEXT,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        is_verified INTEGER DEFAULT 0,
+        FOREIGN KEY(scholarship_app_id) REFERENCES scholarship_applications(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS partners (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        category TEXT CHECK(category IN ('car', 'bank', 'telecom', 'travel')),
+        description TEXT,
+        logo_url TEXT,
+        website TEXT,
+        contact_email TEXT,
+        is_active INTEGER DEFAULT 1
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS service_offers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        partner_id INTEGER,
+        title TEXT,
+        description TEXT,
+        discount_percentage REAL,
+        terms TEXT,
+        image_url TEXT,
+        valid_until DATE,
+        is_active INTEGER DEFAULT 1,
+        FOREIGN KEY(partner_id) REFERENCES partners(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS service_leads (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        partner_id INTEGER,
+        offer_id INTEGER,
+        student_name TEXT,
+        student_email TEXT,
+        student_phone TEXT,
+        message TEXT,
+        status TEXT DEFAULT 'New',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id),
+        FOREIGN KEY(partner_id) REFERENCES partners(id),
+        FOREIGN KEY(offer_id) REFERENCES service_offers(id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS premium_features (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feature_name TEXT,
+        description TEXT,
+        price REAL,
+        duration_days INTEGER,
+        is_active INTEGER DEFAULT 1
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        feature_id INTEGER,
+        amount REAL,
+        currency TEXT DEFAULT 'KWD',
+        payment_method TEXT CHECK(payment_method IN ('KNET', 'ApplePay', 'Card')),
+        transaction_id TEXT,
+        status TEXT CHECK(status IN ('Pending', 'Completed', 'Failed', 'Refunded')) DEFAULT 'Pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id),
+        FOREIGN KEY(feature_id) REFERENCES premium_features(id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        title TEXT,
+        message TEXT,
+        type TEXT CHECK(type IN ('info', 'success', 'warning', 'error')),
+        is_read INTEGER DEFAULT 0,
+        link TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS ai_weights (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        acceptance_rate_weight REAL DEFAULT 0.3,
+        scholarship_weight REAL DEFAULT 0.4,
+        success_history_weight REAL DEFAULT 0.2,
+        feedback_weight REAL DEFAULT 0.1,
+        gpa_weight REAL DEFAULT 0.3,
+        budget_weight REAL DEFAULT 0.25,
+        assessment_weight REAL DEFAULT 0.45,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS student_success_cases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        university_id INTEGER,
+        major_id INTEGER,
+        student_gpa REAL,
+        student_profile TEXT,
+        admission_result TEXT CHECK(admission_result IN ('Accepted', 'Rejected')),
+        scholarship_received INTEGER DEFAULT 0,
+        year INTEGER,
+        embedding_id TEXT,
+        FOREIGN KEY(university_id) REFERENCES universities(id),
+        FOREIGN KEY(major_id) REFERENCES majors(id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS chat_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        session_id TEXT UNIQUE,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT,
+        role TEXT CHECK(role IN ('user', 'assistant', 'system')),
+        content TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(session_id) REFERENCES chat_sessions(session_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS ai_assessment (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        major TEXT NOT NULL UNIQUE,
+        academic_strengths TEXT NOT NULL,
+        thinking_style TEXT NOT NULL,
+        learning_style TEXT NOT NULL,
+        skills_required TEXT NOT NULL,
+        career_interests TEXT NOT NULL,
+        career_tendencies TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS main_catgeory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category_id INTEGER,
+        category_Name TEXT NOT NULL UNIQUE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS Major_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        major TEXT NOT NULL UNIQUE,
+        academic_strengths_scores JSON NOT NULL,
+        thinking_style_scores JSON NOT NULL,
+        learning_style_scores JSON NOT NULL,
+        interests_scores JSON NOT NULL,
+        category_id INTEGER,
+        FOREIGN KEY (category_id) REFERENCES main_catgeory(id)
+            ON DELETE SET NULL
+            ON UPDATE CASCADE
+    )
+    ''',
+]
+
+
+def upgrade(conn):
+    for ddl in TABLES:
+        conn.execute(ddl)
@@ -0,0 +1,10 @@
+# migrations/0002_users_is_admin.py - Admin flag on pre-existing users tables
+"""Databases created before is_admin was part of CREATE TABLE users lack the column"""
+
+DESCRIPTION = "add users.is_admin"
+
+
+def upgrade(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+    if "is_admin" not in columns:
+        conn.execute("ALTER TABLE users ADD COLUMN is_admin INTEGER DEFAULT 0")
@@ -0,0 +1,13 @@
+# migrations/0003_notification_counters.py - Cached unread notification counts
+DESCRIPTION = "notification counters"
+
+
+def upgrade(conn):
+    # Kept in sync by notification_service; rows are seeded lazily per user
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS notification_counters (
+        user_id INTEGER PRIMARY KEY,
+        unread_count INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''')
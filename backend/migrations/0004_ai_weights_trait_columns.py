@@ -0,0 +1,16 @@
+# migrations/0004_ai_weights_trait_columns.py - Major matching weights in ai_weights
+DESCRIPTION = "ai_weights trait weight columns"
+
+TRAIT_COLUMNS = {
+    "academic_strengths_weight": 0.30,
+    "thinking_style_weight": 0.25,
+    "learning_style_weight": 0.20,
+    "interests_weight": 0.15,
+}
+
+
+def upgrade(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(ai_weights)")}
+    for column, default in TRAIT_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE ai_weights ADD COLUMN {column} REAL DEFAULT {default}")
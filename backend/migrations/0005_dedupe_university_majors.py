@@ -0,0 +1,33 @@
+# migrations/0005_dedupe_university_majors.py - Remove repeated university programs
+"""
+create_enhanced_schema re-inserted the sample programs on every run, so most
+databases carry several copies of each (university_id, major_name) pair.
+The lowest id of each pair is kept and applications are pointed at it;
+the unique index in migrations.indexes keeps the table clean afterwards.
+"""
+
+DESCRIPTION = "dedupe university_majors"
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TEMP TABLE university_majors_remap AS
+    SELECT um.id AS old_id, keep.id AS new_id
+    FROM university_majors um
+    JOIN (
+        SELECT MIN(id) AS id, university_id, major_name
+        FROM university_majors
+        GROUP BY university_id, major_name
+    ) keep
+        ON keep.university_id IS um.university_id
+        AND keep.major_name IS um.major_name
+    WHERE um.id != keep.id
+    ''')
+
+    conn.execute('''
+    UPDATE applications
+    SET major_id = (SELECT new_id FROM university_majors_remap WHERE old_id = applications.major_id)
+    WHERE major_id IN (SELECT old_id FROM university_majors_remap)
+    ''')
+    conn.execute("DELETE FROM university_majors WHERE id IN (SELECT old_id FROM university_majors_remap)")
+    conn.execute("DROP TABLE university_majors_remap")
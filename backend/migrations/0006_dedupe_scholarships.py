@@ -0,0 +1,32 @@
+# migrations/0006_dedupe_scholarships.py - Remove repeated scholarship rows
+"""
+The sample scholarships were seeded with INSERT OR IGNORE against a table
+without a unique key, so re-seeding duplicated them. Duplicates share
+(name, provider); the lowest id is kept and applications are re-pointed.
+"""
+
+DESCRIPTION = "dedupe scholarships"
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TEMP TABLE scholarships_remap AS
+    SELECT s.id AS old_id, keep.id AS new_id
+    FROM scholarships s
+    JOIN (
+        SELECT MIN(id) AS id, name, provider
+        FROM scholarships
+        GROUP BY name, provider
+    ) keep
+        ON keep.name IS s.name
+        AND keep.provider IS s.provider
+    WHERE s.id != keep.id
+    ''')
+
+    conn.execute('''
+    UPDATE scholarship_applications
+    SET scholarship_id = (SELECT new_id FROM scholarships_remap WHERE old_id = scholarship_applications.scholarship_id)
+    WHERE scholarship_id IN (SELECT old_id FROM scholarships_remap)
+    ''')
+    conn.execute("DELETE FROM scholarships WHERE id IN (SELECT old_id FROM scholarships_remap)")
+    conn.execute("DROP TABLE scholarships_remap")
@@ -0,0 +1,34 @@
+# migrations/0007_payment_rollups.py - Daily payment totals for the admin reports
+"""
+One row per (day, feature, payment method, status) with the number and sum
+of the payments in it; day is the date the payment reached its status
+(completed_at, or created_at while Pending). services.payment_rollups keeps
+it in step with every payment write and can rebuild it from payments; the
+backfill below is the same aggregate, frozen as of this migration.
+"""
+
+DESCRIPTION = "payment rollups"
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS payment_rollups (
+        day TEXT NOT NULL,
+        feature_id INTEGER NOT NULL,
+        payment_method TEXT NOT NULL,
+        status TEXT NOT NULL,
+        payments INTEGER NOT NULL DEFAULT 0,
+        amount REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, feature_id, payment_method, status)
+    ) WITHOUT ROWID
+    ''')
+    conn.execute("DELETE FROM payment_rollups")
+    # NULLs become 0/'' since they are part of the key
+    conn.execute('''
+    INSERT INTO payment_rollups (day, feature_id, payment_method, status, payments, amount)
+    SELECT date(COALESCE(completed_at, created_at)), COALESCE(feature_id, 0),
+           COALESCE(payment_method, ''), COALESCE(status, 'Pending'),
+           COUNT(*), SUM(COALESCE(amount, 0))
+    FROM payments
+    GROUP BY 1, 2, 3, 4
+    ''')
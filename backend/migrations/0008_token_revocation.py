@@ -0,0 +1,26 @@
+# migrations/0008_token_revocation.py - Revoked sessions and issued refresh tokens
+DESCRIPTION = "token revocation"
+
+
+def upgrade(conn):
+    # Kept by services.token_revocation; rows are purged once they expire
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        jti TEXT PRIMARY KEY,
+        user_id INTEGER,
+        expires_at TIMESTAMP NOT NULL,
+        revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        jti TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        family TEXT NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        used_at TIMESTAMP,
+        revoked_at TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    ''')
@@ -0,0 +1,5 @@
+# migrations - Versioned schema migrations for the platform database
+from migrations.runner import apply_migrations, migrate, pending_migrations, discover_migrations
+from migrations.indexes import INDEXES, sync_indexes
+from migrations.catalog_split import split_catalog
+from migrations.archive_schema import ARCHIVE_TABLES, ensure_archive_schema
@@ -0,0 +1,86 @@
+# migrations/archive_schema.py - Tables of the archive (cold) database
+"""
+services.archive_service moves old rows out of the hot tables into the
+attached "archive" database. Each archived table is created there from the
+hot table's own CREATE statement, so ids and columns line up; columns a
+later migration adds to a hot table are added to its archive copy too.
+
+The archive keeps its own indexes (archive_ prefix, outside sync_indexes'
+managed set) for the reads that span hot and cold rows: the admin
+application list and per-user history.
+"""
+import re
+import sqlite3
+import logging
+from typing import List, Sequence
+from migrations.catalog_split import qualify
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_TABLES = (
+    "notifications", "otp_verification", "chat_sessions", "chat_messages",
+    "applications", "application_documents",
+)
+
+ARCHIVE_INDEXES = {
+    "archive_applications_user": "CREATE INDEX archive_applications_user ON applications(user_id, application_date DESC)",
+    "archive_applications_updated": "CREATE INDEX archive_applications_updated ON applications(last_updated DESC)",
+    "archive_applications_status_updated": "CREATE INDEX archive_applications_status_updated ON applications(status, last_updated DESC)",
+    "archive_applications_university_updated": "CREATE INDEX archive_applications_university_updated ON applications(university_id, last_updated DESC)",
+    "archive_application_documents_application": "CREATE INDEX archive_application_documents_application ON application_documents(application_id)",
+    "archive_notifications_user_created": "CREATE INDEX archive_notifications_user_created ON notifications(user_id, created_at DESC)",
+    "archive_chat_messages_session": "CREATE INDEX archive_chat_messages_session ON chat_messages(session_id)",
+}
+
+_DECLARED_TYPE = re.compile(r"^[\w ]*(?:\([\d, ]*\))?$")
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[tuple]:
+    return conn.execute(f'PRAGMA {schema}.table_info("{table}")').fetchall()
+
+
+def ensure_archive_schema(conn: sqlite3.Connection, tables: Sequence[str] = ARCHIVE_TABLES,
+                          schema: str = "archive") -> List[str]:
+    """Create or extend the archive copies of `tables`; returns the tables created"""
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    if schema not in attached:
+        return []
+
+    created = []
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute(f"PRAGMA {schema}.journal_mode=WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in tables:
+                row = conn.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                ).fetchone()
+                if row is None:
+                    continue
+                archived = {col[1] for col in _columns(conn, schema, table)}
+                if not archived:
+                    conn.execute(qualify(row[0], schema))
+                    created.append(table)
+                    continue
+                for _, name, col_type, _, _, _ in _columns(conn, "main", table):
+                    if name not in archived:
+                        # Archive rows are copies, so no NOT NULL/DEFAULT: just the column and its type
+                        col_type = col_type if _DECLARED_TYPE.match(col_type or "") else ""
+                        conn.execute(f'ALTER TABLE {schema}."{table}" ADD COLUMN "{name}" {col_type}')
+                        logger.info(f"Added column {name} to {schema}.{table}")
+            present = {r[0] for r in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")}
+            for name, sql in ARCHIVE_INDEXES.items():
+                if re.search(r"\bON\s+(\w+)", sql).group(1) in present:
+                    conn.execute(qualify(sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1), schema))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+
+    if created:
+        logger.info(f"Created archive tables: {', '.join(created)}")
+    return created
@@ -0,0 +1,123 @@
+# migrations/catalog_split.py - Move the catalog tables into their own database
+"""
+Catalog tables are read on almost every request and written by admins only;
+notifications, OTPs, chat and payments are written constantly. In one file
+they share a WAL and its checkpoints. split_catalog moves the catalog tables
+(sqlite.CATALOG_TABLES) from the transactional database into the attached
+"catalog" database, with their rows, indexes and AUTOINCREMENT counters.
+
+It runs from apply_migrations whenever CATALOG_DATABASE_NAME is set, and can
+be run by hand:
+
+    python -m migrations.catalog_split University.db Catalog.db
+
+Copying and dropping are separate transactions (a commit spanning two
+databases is not atomic in WAL mode). If the process dies in between, the
+next run finds the copies complete and only drops the originals.
+"""
+import re
+import sqlite3
+import logging
+from typing import List, Sequence
+
+logger = logging.getLogger(__name__)
+
+_CREATE_PREFIX = re.compile(r"^\s*(CREATE\s+(?:UNIQUE\s+)?(?:TABLE|INDEX)\s+(?:IF\s+NOT\s+EXISTS\s+)?)", re.IGNORECASE)
+
+
+def qualify(sql: str, schema: str) -> str:
+    """CREATE TABLE/INDEX statement rewritten to create the object in `schema`"""
+    return _CREATE_PREFIX.sub(lambda m: f"{m.group(1)}{schema}.", sql, count=1)
+
+
+def _tables(conn: sqlite3.Connection, schema: str) -> set:
+    return {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")}
+
+
+def _count(conn: sqlite3.Connection, schema: str, table: str) -> int:
+    return conn.execute(f'SELECT COUNT(*) FROM {schema}."{table}"').fetchone()[0]
+
+
+def split_catalog(conn: sqlite3.Connection, tables: Sequence[str] = None, schema: str = "catalog") -> List[str]:
+    """Move catalog tables still in main into `schema`; returns the tables moved"""
+    if tables is None:
+        from sqlite import CATALOG_TABLES
+        tables = CATALOG_TABLES
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    if schema not in attached:
+        raise RuntimeError(f"Catalog database is not attached as '{schema}'")
+
+    main_tables = _tables(conn, "main")
+    pending = [t for t in tables if t in main_tables]
+    if not pending:
+        return []
+
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute(f"PRAGMA {schema}.journal_mode=WAL")
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            catalog_tables = _tables(conn, schema)
+            has_sequence = "sqlite_sequence" in main_tables
+            for table in pending:
+                if table in catalog_tables:
+                    # Left by an interrupted split: fine if complete, otherwise refuse to guess
+                    if _count(conn, schema, table) != _count(conn, "main", table):
+                        raise RuntimeError(f"{schema}.{table} already exists with different contents")
+                    continue
+                create_sql = conn.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+                ).fetchone()[0]
+                conn.execute(qualify(create_sql, schema))
+                conn.execute(f'INSERT INTO {schema}."{table}" SELECT * FROM main."{table}"')
+                for (index_sql,) in conn.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                    (table,)
+                ).fetchall():
+                    conn.execute(qualify(index_sql, schema))
+                if has_sequence:
+                    conn.execute(
+                        f"""UPDATE {schema}.sqlite_sequence
+                        SET seq = MAX(seq, (SELECT seq FROM main.sqlite_sequence WHERE name = ?))
+                        WHERE name = ?""",
+                        (table, table)
+                    )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in pending:
+                conn.execute(f'DROP TABLE main."{table}"')
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+
+    logger.info(f"Moved {len(pending)} catalog tables into the catalog database: {', '.join(pending)}")
+    return pending
+
+
+if __name__ == "__main__":
+    import sys
+    from sqlite import open_stores
+    from migrations.runner import migrate
+
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m migrations.catalog_split <main.db> <catalog.db>")
+    conn = open_stores(sys.argv[1], sys.argv[2])
+    try:
+        migrate(conn)
+        moved = split_catalog(conn)
+        migrate(conn)  # re-sync indexes now that the tables have moved
+    finally:
+        conn.close()
+    print(f"moved: {moved}")
+    print(f"set CATALOG_DATABASE_NAME={sys.argv[2]} to serve from the split layout")
@@ -0,0 +1,91 @@
+# migrations/indexes.py - Declarative index management
+"""
+Every index the application relies on is declared here. After migrations run,
+sync_indexes creates missing ones, rebuilds any whose definition changed and
+drops managed (idx_/ux_) indexes that are no longer declared. With the
+catalog split out, each index is created in the database that holds its table.
+"""
+import re
+import logging
+from migrations.catalog_split import qualify
+
+logger = logging.getLogger(__name__)
+
+MANAGED_PREFIXES = ("idx_", "ux_")
+
+INDEXES = {
+    "idx_users_email": "CREATE INDEX idx_users_email ON users(email)",
+    "idx_users_phone": "CREATE INDEX idx_users_phone ON users(phone)",
+    # Applications: per-user history and the admin list (newest first, optionally by status/university)
+    "idx_applications_user": "CREATE INDEX idx_applications_user ON applications(user_id, application_date DESC)",
+    "idx_applications_updated": "CREATE INDEX idx_applications_updated ON applications(last_updated DESC)",
+    "idx_applications_status_updated": "CREATE INDEX idx_applications_status_updated ON applications(status, last_updated DESC)",
+    "idx_applications_university_updated": "CREATE INDEX idx_applications_university_updated ON applications(university_id, last_updated DESC)",
+    "idx_application_documents_application": "CREATE INDEX idx_application_documents_application ON application_documents(application_id)",
+    # Catalog: country filter, ranking-ordered search pages and tuition-ordered chatbot results
+    "idx_universities_country": "CREATE INDEX idx_universities_country ON universities(country)",
+    "idx_universities_active_ranking": "CREATE INDEX idx_universities_active_ranking ON universities(is_active, ranking, name)",
+    "idx_universities_active_tuition": "CREATE INDEX idx_universities_active_tuition ON universities(is_active, tuition_fee)",
+    "idx_university_media_university": "CREATE INDEX idx_university_media_university ON university_media(university_id, display_order)",
+    # Notifications: newest-first listing per user, plus a partial index covering only unread rows
+    "idx_notifications_user_created": "CREATE INDEX idx_notifications_user_created ON notifications(user_id, created_at DESC)",
+    "idx_notifications_user_unread": "CREATE INDEX idx_notifications_user_unread ON notifications(user_id, created_at DESC) WHERE is_read = 0",
+    "idx_chat_messages_session": "CREATE INDEX idx_chat_messages_session ON chat_messages(session_id)",
+    # Admin payment report and leads, newest first: exports stream off these instead of sorting
+    "idx_payments_completed": "CREATE INDEX idx_payments_completed ON payments(completed_at DESC)",
+    "idx_service_leads_created": "CREATE INDEX idx_service_leads_created ON service_leads(created_at DESC)",
+    # Token revocation: session revokes and the purge of expired rows
+    "idx_revoked_tokens_expires": "CREATE INDEX idx_revoked_tokens_expires ON revoked_tokens(expires_at)",
+    "idx_refresh_tokens_family": "CREATE INDEX idx_refresh_tokens_family ON refresh_tokens(family)",
+    "idx_refresh_tokens_expires": "CREATE INDEX idx_refresh_tokens_expires ON refresh_tokens(expires_at)",
+    # Natural keys, enforced once the dedupe migrations have run
+    "ux_university_majors_university_major": "CREATE UNIQUE INDEX ux_university_majors_university_major ON university_majors(university_id, major_name)",
+    "ux_scholarships_name_provider": "CREATE UNIQUE INDEX ux_scholarships_name_provider ON scholarships(name, provider)",
+}
+
+
+def _normalize(sql: str) -> str:
+    sql = re.sub(r"\s+", " ", sql.strip())
+    sql = re.sub(r"\s*([(),])\s*", r"\1", sql)
+    return re.sub(r"IF NOT EXISTS ", "", sql, flags=re.IGNORECASE).lower()
+
+
+def _indexed_table(sql: str) -> str:
+    return re.search(r"\bON\s+(\w+)\s*\(", sql, flags=re.IGNORECASE).group(1)
+
+
+def sync_indexes(conn, indexes=None) -> dict:
+    """Bring the database's managed indexes in line with the declared set"""
+    indexes = INDEXES if indexes is None else indexes
+    schemas = [row[1] for row in conn.execute("PRAGMA database_list") if row[1] != "temp"]
+    existing = {}  # index name -> (schema, sql)
+    table_schema = {}
+    for schema in schemas:
+        for kind, name, sql in conn.execute(f"SELECT type, name, sql FROM {schema}.sqlite_master"):
+            if kind == "index" and sql is not None:
+                existing[name] = (schema, sql)
+            elif kind == "table":
+                # Unqualified names resolve to the first database that has the table
+                table_schema.setdefault(name, schema)
+    changes = {"created": [], "rebuilt": [], "dropped": []}
+
+    for name, (schema, sql) in existing.items():
+        if name.startswith(MANAGED_PREFIXES) and name not in indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {schema}.{name}")
+            changes["dropped"].append(name)
+
+    for name, sql in indexes.items():
+        schema = table_schema.get(_indexed_table(sql), "main")
+        current = existing.get(name)
+        if current is not None and current[0] == schema and _normalize(current[1]) == _normalize(sql):
+            continue
+        if current is not None:
+            conn.execute(f"DROP INDEX IF EXISTS {current[0]}.{name}")
+            changes["rebuilt"].append(name)
+        else:
+            changes["created"].append(name)
+        conn.execute(sql if schema == "main" else qualify(sql, schema))
+
+    if any(changes.values()):
+        logger.info(f"Index sync: {changes}")
+    return changes
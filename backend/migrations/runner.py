@@ -0,0 +1,142 @@
+# migrations/runner.py - Applies pending schema migrations in order
+import os
+import re
+import sqlite3
+import importlib
+import logging
+import time
+from typing import List, Optional, Tuple
+from migrations.indexes import sync_indexes
+from migrations.catalog_split import split_catalog
+from migrations.archive_schema import ensure_archive_schema
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+_migrations: Optional[List[Tuple[int, str, object]]] = None
+
+
+def discover_migrations() -> List[Tuple[int, str, object]]:
+    """(version, name, module) for every NNNN_name.py file in this package, in order"""
+    global _migrations
+    if _migrations is None:
+        found = []
+        for filename in os.listdir(os.path.dirname(__file__)):
+            match = MIGRATION_FILE.match(filename)
+            if match:
+                module = importlib.import_module(f"migrations.{filename[:-3]}")
+                found.append((int(match.group(1)), match.group(2), module))
+        found.sort(key=lambda m: m[0])
+        versions = [v for v, _, _ in found]
+        if len(versions) != len(set(versions)):
+            raise RuntimeError(f"Duplicate migration versions: {versions}")
+        _migrations = found
+    return _migrations
+
+
+def _ensure_version_table(conn: sqlite3.Connection):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def applied_versions(conn: sqlite3.Connection) -> set:
+    _ensure_version_table(conn)
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+
+def pending_migrations(conn: sqlite3.Connection) -> List[Tuple[int, str, object]]:
+    applied = applied_versions(conn)
+    return [m for m in discover_migrations() if m[0] not in applied]
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    Apply pending migrations, each in its own transaction, then sync indexes.
+    Returns the versions applied by this call.
+    """
+    started = time.perf_counter()
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # explicit transactions so DDL is rolled back too
+    applied = []
+    try:
+        for version, name, module in pending_migrations(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have applied it while we waited for the lock
+                if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                    conn.execute("COMMIT")
+                    continue
+                module.upgrade(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                    (version, name)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                logger.error(f"Migration {version:04d}_{name} failed")
+                raise
+            applied.append(version)
+            logger.info(f"Applied migration {version:04d}_{name}: {getattr(module, 'DESCRIPTION', '')}")
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            sync_indexes(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+
+    logger.info(
+        f"Schema up to date ({len(applied)} migrations applied) in "
+        f"{(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    return applied
+
+
+def _is_current(conn: sqlite3.Connection) -> bool:
+    """Versioned and with nothing pending (checked without creating schema_version)"""
+    versioned = conn.execute(
+        "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    return bool(versioned) and not pending_migrations(conn)
+
+
+def apply_migrations(db_name: Optional[str] = None, catalog_name: Optional[str] = None) -> List[int]:
+    """
+    Open the database, bring it to the latest schema and close it again.
+    With CATALOG_DATABASE_NAME set, catalog tables still in the main
+    database are moved out (see migrations.catalog_split): before migrating
+    when the schema is already current, otherwise after, since pending
+    migrations (0001's unqualified CREATE TABLE IF NOT EXISTS on a legacy
+    database) would recreate moved tables empty in main. The archive
+    store's tables follow the migrated hot tables.
+    """
+    from sqlite import open_stores
+    conn = open_stores(db_name, catalog_name)
+    try:
+        split = "catalog" in {row[1] for row in conn.execute("PRAGMA database_list")}
+        if split and _is_current(conn):
+            # Nothing will recreate the tables in main, so move them before the index sync
+            split_catalog(conn)
+        applied = migrate(conn)
+        if split and split_catalog(conn):
+            migrate(conn)  # the tables were created or migrated in main; re-sync indexes
+        ensure_archive_schema(conn)
+        return applied
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    print(apply_migrations(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -174,8 +174,15 @@ class RecommendationResponse(BaseModel):
 
 # ============= Comparison =============
 
+MAX_COMPARE_UNIVERSITIES = 10
+MAX_BATCH_UNIVERSITIES = 50
+
 class ComparisonRequest(BaseModel):
-    university_ids: List[int] = Field(..., min_length=2, max_length=3)
+    university_ids: List[int] = Field(..., min_length=2, max_length=MAX_COMPARE_UNIVERSITIES)
+
+class UniversityBatchRequest(BaseModel):
+    university_ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_UNIVERSITIES)
+    include_media: bool = True
 
 class UniversityComparison(BaseModel):
     universities: List[UniversityDetail]
@@ -0,0 +1,136 @@
+# password_pool.py - Bounded thread pool for bcrypt hashing and verification
+"""
+A bcrypt hash or check costs 100-300 ms of CPU by design. Run inline in
+handlers, a login burst ties up the request threads (or the event loop)
+and every other request waits behind it. Password work goes through this
+pool instead:
+
+    password_hash = await password_pool().hash_async(password)
+    valid, new_hash = await password_pool().verify_async(password, stored_hash)
+
+bcrypt releases the GIL while it hashes, so PASSWORD_HASH_WORKERS threads
+(default: one per core) hash in parallel and throughput scales with cores
+without the cost of a process pool. At most that many hashes run at once;
+when PASSWORD_HASH_QUEUE_MAX more are already waiting, new calls raise
+PasswordPoolBusy rather than queueing without bound.
+
+Hashes use PASSWORD_HASH_ROUNDS (pick it with perf/password_cost.py).
+verify returns a new hash when the stored one was made with another cost,
+so changing the setting migrates users as they log in.
+"""
+import os
+import time
+import asyncio
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+from passlib.context import CryptContext
+from config import settings
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HASH_WAIT = metrics.REGISTRY.register(metrics.Histogram(
+    "password_hash_wait_seconds", "Time password hashes and checks wait for a pool thread"))
+HASH_REJECTED = metrics.REGISTRY.register(metrics.Counter(
+    "password_hash_rejected_total", "Password hashes and checks refused because the pool queue was full"))
+
+
+class PasswordPoolBusy(RuntimeError):
+    """More password hashes are queued than PASSWORD_HASH_QUEUE_MAX"""
+
+
+def bcrypt_rounds(password_hash: str) -> Optional[int]:
+    """The cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None for other formats"""
+    parts = password_hash.split("$")
+    if len(parts) == 4 and parts[1].startswith("2") and parts[2].isdigit():
+        return int(parts[2])
+    return None
+
+
+class PasswordPool:
+    def __init__(self, workers: int, rounds: int, queue_max: int):
+        self.workers = workers
+        self.rounds = rounds
+        self.queue_max = queue_max
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        # Running plus waiting calls; the executor's own queue is unbounded
+        self._slots = threading.BoundedSemaphore(workers + queue_max)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    def _call(self, queued_at: float, fn: Callable[..., T], *args) -> T:
+        HASH_WAIT.observe((), time.perf_counter() - queued_at)
+        try:
+            return fn(*args)
+        finally:
+            self._slots.release()
+
+    def submit(self, fn: Callable[..., T], *args) -> "Future[T]":
+        if not self._slots.acquire(blocking=False):
+            HASH_REJECTED.inc()
+            raise PasswordPoolBusy(f"{self.workers + self.queue_max} password hashes already in progress")
+        try:
+            return self._executor.submit(self._call, time.perf_counter(), fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _hash(self, password: str) -> str:
+        return self.context.hash(password)
+
+    def _verify(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        try:
+            valid = self.context.verify(password, password_hash)
+        except ValueError:
+            # Not a hash this context knows (corrupt, or an old scheme): treat as a wrong password
+            logger.warning("Unrecognized password hash format")
+            return False, None
+        if valid and (bcrypt_rounds(password_hash) != self.rounds or self.context.needs_update(password_hash)):
+            return True, self.context.hash(password)
+        return valid, None
+
+    def hash(self, password: str) -> str:
+        """Hash a password on the pool (blocks the calling thread, not the pool)"""
+        return self.submit(self._hash, password).result()
+
+    def verify(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new_hash): new_hash is set when a valid hash should be replaced (cost changed)"""
+        return self.submit(self._verify, password, password_hash).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(self._hash, password))
+
+    async def verify_async(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self.submit(self._verify, password, password_hash))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool: Optional[PasswordPool] = None
+_pool_lock = threading.Lock()
+
+
+def password_pool() -> PasswordPool:
+    """The process-wide password pool (created on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordPool(
+                    settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+                    settings.PASSWORD_HASH_ROUNDS,
+                    settings.PASSWORD_HASH_QUEUE_MAX,
+                )
+    return _pool
+
+
+def close_password_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,332 @@
+# perf/benchmarks.py - Micro-benchmarks for the recommendation hot paths
+"""
+Times the functions every recommendation runs through, on fixed synthetic
+inputs, and compares them with stored baselines:
+
+    python -m perf.benchmarks                 # run and compare with perf/baselines.json
+    python -m perf.benchmarks --save          # record new baselines
+    python -m perf.benchmarks -k scoring      # only benchmarks whose name contains "scoring"
+
+Exits 1 when a benchmark's best (minimum) per-call time is slower than its
+baseline by more than its tolerance; the minimum is far less noisy than the
+median on shared machines. --save runs the suite --save-runs times and keeps,
+per benchmark, the best minimum and a tolerance of twice the spread between
+runs (never below --tolerance), so a gate on an unchanged tree doesn't fail.
+
+Baselines are machine-specific and perf/baselines.json is not shipped: record
+them with --save on the machine that runs the comparison (a dedicated one, not
+a shared box). Against baselines from a different environment the report is
+printed but never fails.
+"""
+import io
+import os
+import sys
+import json
+import random
+import sqlite3
+import argparse
+import platform
+import statistics
+import timeit
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+LOOP_SECONDS = 0.5
+
+# Trait counts per group, matching the assessment score template
+TRAIT_COUNTS = {"academic_strengths": 12, "thinking_style": 8, "learning_style": 7, "interests": 11}
+COUNTRIES = ["USA", "UK", "Germany", "Canada", "Netherlands", "France", "Australia", "Japan"]
+MAJORS = ["Computer Science", "Data Science", "Medicine", "Law", "Finance", "Robotics",
+          "Economics", "Architecture", "Biology", "Physics"]
+
+
+class Fixtures:
+    """Deterministic inputs shared by every benchmark"""
+
+    def __init__(self, seed: int = 1234, n_majors: int = 120, n_universities: int = 5000, n_hits: int = 60):
+        rng = random.Random(seed)
+
+        def trait_scores():
+            return {group: {f"{group}_{i}": round(rng.random(), 2) for i in range(count)}
+                    for group, count in TRAIT_COUNTS.items()}
+
+        self.user_traits = trait_scores()
+        self.majors = []
+        for i in range(n_majors):
+            scores = trait_scores()
+            # Major_data stores each group as a JSON column
+            self.majors.append({"major": f"Major {i}", **{f"{g}_scores": json.dumps(s) for g, s in scores.items()}})
+
+        self.universities = [
+            {
+                "id": i, "name": f"University {i}", "country": rng.choice(COUNTRIES), "city": f"City {i % 300}",
+                "tuition_fee": rng.randint(0, 60000), "min_gpa": round(rng.uniform(2.0, 4.0), 2),
+                "scholarship_available": rng.random() < 0.4, "success_weight": round(rng.uniform(0.8, 1.5), 2),
+                "acceptance_rate": round(rng.uniform(0.05, 0.9), 2), "ranking": i,
+            }
+            for i in range(1, n_universities + 1)
+        ]
+        self.university_majors = [(u["id"], m) for u in self.universities for m in rng.sample(MAJORS, 4)]
+        self.student = {"gpa": 3.4, "budget": 30000, "preferred_country": "Germany"}
+
+        hits = rng.sample(self.universities, n_hits)
+        self.chroma_results = {
+            "ids": [[f"uni_{u['id']}" for u in hits]],
+            "metadatas": [[
+                {"id": u["id"], "name": u["name"], "country": u["country"], "city": u["city"],
+                 "tuition_fee": u["tuition_fee"], "min_gpa": u["min_gpa"], "scholarship": u["scholarship_available"],
+                 "ranking": u["ranking"], "majors": ", ".join(rng.sample(MAJORS, 4))}
+                for u in hits
+            ]],
+            "documents": [[f"University: {u['name']}\nCountry: {u['country']}" for u in hits]],
+            "distances": [[round(0.1 + i * 0.01, 3) for i in range(n_hits)]],
+        }
+        self.search_filters = {"max_tuition": 35000, "min_gpa": 3.5, "major": "science"}
+        self.context_universities = self.universities[:10]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # Receives the fixtures, returns the zero-argument callable to time
+    setup: Callable[[Fixtures], Callable[[], Any]]
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup))
+        return setup
+    return register
+
+
+def _trait_weights():
+    from services.weights_registry import DEFAULT_TRAIT_WEIGHTS
+    return dict(DEFAULT_TRAIT_WEIGHTS)
+
+
+def _use_default_weights():
+    """Pin the registry to the built-in defaults so no database is read"""
+    from services.weights_registry import get_weights_registry
+    conn = sqlite3.connect(":memory:")
+    try:
+        get_weights_registry().reload(conn)
+    finally:
+        conn.close()
+
+
+@benchmark("scoring.trait_similarity")
+def _bench_trait_similarity(fx: Fixtures):
+    from services.scoring_service import trait_similarity
+    user = fx.user_traits["academic_strengths"]
+    major = json.loads(fx.majors[0]["academic_strengths_scores"])
+    return lambda: trait_similarity(user, major)
+
+
+@benchmark("scoring.score_major")
+def _bench_score_major(fx: Fixtures):
+    from services.scoring_service import score_major
+    weights = _trait_weights()
+    return lambda: score_major(fx.user_traits, fx.majors[0], weights)
+
+
+@benchmark("scoring.recommend_majors")
+def _bench_recommend_majors(fx: Fixtures):
+    from services.scoring_service import recommend_majors
+    _use_default_weights()
+    return lambda: recommend_majors(fx.user_traits, fx.majors)
+
+
+@benchmark("scoring.score_university")
+def _bench_score_university(fx: Fixtures):
+    from services.scoring_service import score_university
+    from services.weights_registry import DEFAULT_WEIGHTS
+    return lambda: score_university(fx.student, fx.universities[0], DEFAULT_WEIGHTS)
+
+
+@benchmark("scoring.score_features")
+def _bench_score_features(fx: Fixtures):
+    from services.scoring_service import UniversityFeatures, score_features
+    from services.weights_registry import DEFAULT_WEIGHTS
+    features = UniversityFeatures(fx.universities, fx.university_majors)
+    return lambda: score_features(features, fx.student["gpa"], fx.student["budget"],
+                                  fx.student["preferred_country"], DEFAULT_WEIGHTS)
+
+
+@benchmark("scoring.features_build")
+def _bench_features_build(fx: Fixtures):
+    from services.scoring_service import UniversityFeatures
+    return lambda: UniversityFeatures(fx.universities, fx.university_majors)
+
+
+@benchmark("rag.post_filter_results")
+def _bench_post_filter(fx: Fixtures):
+    from services.university_rag_service import post_filter_results
+    return lambda: post_filter_results(fx.chroma_results, fx.search_filters, 10)
+
+
+@benchmark("rag._build_context")
+def _bench_build_context_chat(fx: Fixtures):
+    from services.university_rag_service import UniversityRAGService
+    return lambda: UniversityRAGService._build_context(fx.context_universities)
+
+
+@benchmark("rag.build_context")
+def _bench_build_context_filters(fx: Fixtures):
+    from services.university_rag_service import UniversityRAGService
+    return lambda: UniversityRAGService.build_context(fx.context_universities)
+
+
+@benchmark("serialize.university_list.stdlib")
+def _bench_serialize_stdlib(fx: Fixtures):
+    # What JSONResponse did for every list endpoint before FastJSONResponse
+    body = {"universities": fx.universities}
+    return lambda: json.dumps(body, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@benchmark("serialize.university_list.dumps")
+def _bench_serialize_dumps(fx: Fixtures):
+    from utils.serialization import dumps
+    body = {"universities": fx.universities}
+    return lambda: dumps(body)
+
+
+@benchmark("serialize.university_list.ndjson")
+def _bench_serialize_ndjson(fx: Fixtures):
+    from utils.serialization import dumps_lines
+    return lambda: dumps_lines(fx.universities)
+
+
+# ============= Runner =============
+
+def measure(fn: Callable[[], Any], rounds: int = 15) -> Dict[str, float]:
+    """Per-call timings in microseconds over `rounds` rounds of a loop sized to ~0.5s"""
+    timer = timeit.Timer(fn)
+    with redirect_stdout(io.StringIO()):
+        number, elapsed = timer.autorange()
+    # autorange stops at 0.2s; longer loops average out scheduler hiccups
+    number = max(number, int(number * LOOP_SECONDS / elapsed))
+    # Call sites may print; keep that cost but not the noise
+    with redirect_stdout(io.StringIO()):
+        totals = timer.repeat(repeat=rounds, number=number)
+    per_call = [t / number * 1e6 for t in totals]
+    return {
+        "median_us": round(statistics.median(per_call), 3),
+        "min_us": round(min(per_call), 3),
+        "stdev_us": round(statistics.stdev(per_call), 3) if len(per_call) > 1 else 0.0,
+        "loops": number,
+        "rounds": rounds,
+    }
+
+
+def run(selected: List[Benchmark], rounds: int) -> Dict[str, Dict[str, float]]:
+    fixtures = Fixtures()
+    results = {}
+    for bench in selected:
+        with redirect_stdout(io.StringIO()):
+            fn = bench.setup(fixtures)
+            fn()  # warm caches and lazy imports outside the timed loop
+        results[bench.name] = measure(fn, rounds=rounds)
+    return results
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def environment() -> Dict[str, Any]:
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()}
+
+
+def combine_runs(runs: List[Dict[str, Dict[str, float]]], tolerance: float) -> Dict[str, Dict[str, float]]:
+    """Baselines from repeated runs: each benchmark's best run, with a tolerance above its run-to-run spread"""
+    combined = {}
+    for name in runs[0]:
+        mins = [run[name]["min_us"] for run in runs]
+        best = min(runs, key=lambda run: run[name]["min_us"])[name]
+        spread = max(mins) / min(mins) - 1.0
+        combined[name] = dict(best, tolerance=round(max(tolerance, 2 * spread), 3))
+    return combined
+
+
+def save_baselines(path: str, results: Dict[str, Dict[str, float]]):
+    data = load_baselines(path)
+    data.setdefault("benchmarks", {}).update(results)
+    data["environment"] = environment()
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results: Dict[str, Dict[str, float]], baselines: Dict[str, Any], tolerance: float) -> int:
+    """Print the report; returns the number of regressions"""
+    stored = baselines.get("benchmarks", {})
+    regressions = 0
+    print(f"{'benchmark':<28}{'median us':>12}{'min us':>12}{'base min':>12}{'change':>10}")
+    print("-" * 74)
+    for name, result in results.items():
+        base = stored.get(name)
+        if base:
+            change = result["min_us"] / base["min_us"] - 1.0
+            flag = ""
+            if change > max(tolerance, base.get("tolerance", 0.0)):
+                regressions += 1
+                flag = "  REGRESSION"
+            print(f"{name:<28}{result['median_us']:>12.3f}{result['min_us']:>12.3f}"
+                  f"{base['min_us']:>12.3f}{change:>+9.1%}{flag}")
+        else:
+            print(f"{name:<28}{result['median_us']:>12.3f}{result['min_us']:>12.3f}{'-':>12}{'new':>10}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recommendation hot-path micro-benchmarks")
+    parser.add_argument("-k", dest="keyword", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--save", action="store_true", help="store these results as the new baselines")
+    parser.add_argument("--save-runs", type=int, default=3, help="suite runs --save measures noise over")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="smallest allowed slowdown before failing (0.25 = 25%%); noisy benchmarks get more")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    selected = [b for b in BENCHMARKS if not args.keyword or args.keyword in b.name]
+    if args.list:
+        for bench in selected:
+            print(bench.name)
+        return 0
+    if not selected:
+        parser.error(f"no benchmark matches {args.keyword!r}")
+
+    baselines = load_baselines(args.baselines)
+    if args.save:
+        results = combine_runs([run(selected, args.rounds) for _ in range(max(args.save_runs, 1))], args.tolerance)
+        compare(results, baselines, args.tolerance)
+        save_baselines(args.baselines, results)
+        print(f"\nbaselines written to {args.baselines}")
+        return 0
+
+    results = run(selected, args.rounds)
+    regressions = compare(results, baselines, args.tolerance)
+    recorded_on = baselines.get("environment")
+    if regressions and recorded_on and recorded_on != environment():
+        print(f"\n{regressions} benchmark(s) slower than baseline, but the baselines were recorded "
+              f"on another environment ({recorded_on}); re-record them here with --save")
+        return 0
+    if regressions:
+        print(f"\n{regressions} benchmark(s) slower than baseline by more than their tolerance")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# perf/datagen.py - Large synthetic University.db (and Chroma collection) for load tests
+"""
+Writes a migrated database the real app can serve, sized by preset or scale:
+
+    python -m perf.datagen --preset intake --out University.db --chroma chroma_db_dir
+
+The "intake" preset is peak-season volume: 50k universities, 500k programs,
+1M users, applications and notifications. User 1 is an admin. With --chroma,
+the universities collection is filled through UniversityRAGService, so
+the chatbot searches the same documents it would in production.
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from typing import Dict, Optional
+from perf.fixtures import build_fixture_db, fixture_sizes
+
+PRESETS: Dict[str, Dict[str, int]] = {
+    "ci": fixture_sizes(0.05),
+    "default": fixture_sizes(1.0),
+    "intake": {
+        "universities": 50000,
+        "majors_per_university": 10,
+        "users": 1000000,
+        "applications": 1000000,
+        "documents_per_application": 2,
+        "notifications": 1000000,
+        "scholarships": 20000,
+    },
+}
+
+
+def generate_database(path: str, sizes: Dict[str, int], seed: int = 42, force: bool = False) -> sqlite3.Connection:
+    if os.path.exists(path):
+        if not force:
+            raise FileExistsError(f"{path} exists; pass --force to replace it")
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    conn = build_fixture_db(path, seed=seed, sizes=sizes)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return conn
+
+
+def populate_chroma(db_path: str, chroma_path: str, batch_size: int = 2000) -> Dict[str, int]:
+    """Embed every active university into the chatbot's collection"""
+    import chromadb
+    from services.university_rag_service import UniversityRAGService
+
+    # Create the collection up front: the service ingests a missing collection
+    # in a single add(), which exceeds Chroma's batch limit at this size
+    client = chromadb.PersistentClient(path=chroma_path)
+    client.get_or_create_collection(name="universities", metadata={"description": "University information for RAG"})
+
+    service = UniversityRAGService(db_path=db_path, chroma_path=chroma_path)
+    conn = sqlite3.connect(db_path)
+    ids = [row[0] for row in conn.execute("SELECT id FROM universities WHERE is_active = 1")]
+    conn.close()
+    return service.sync_universities(ids, batch_size=batch_size)
+
+
+def table_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    tables = ["universities", "university_majors", "users", "applications",
+              "application_documents", "notifications", "scholarships"]
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in tables}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a large synthetic University.db")
+    parser.add_argument("--out", default="University.db", help="database file to write")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="default")
+    parser.add_argument("--scale", type=float, default=None, help="multiply the default preset instead")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chroma", default=None, help="Chroma directory to populate (skipped if omitted)")
+    parser.add_argument("--chroma-batch", type=int, default=2000)
+    parser.add_argument("--force", action="store_true", help="replace an existing database")
+    args = parser.parse_args(argv)
+
+    sizes: Optional[Dict[str, int]] = fixture_sizes(args.scale) if args.scale is not None else PRESETS[args.preset]
+
+    start = time.perf_counter()
+    try:
+        conn = generate_database(args.out, sizes, seed=args.seed, force=args.force)
+    except FileExistsError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for table, count in table_counts(conn).items():
+        print(f"{table:>24}: {count:,}")
+    conn.close()
+    print(f"database written to {args.out} in {time.perf_counter() - start:.1f}s")
+
+    if args.chroma:
+        start = time.perf_counter()
+        result = populate_chroma(args.out, args.chroma, batch_size=args.chroma_batch)
+        print(f"chroma: {result['upserted']:,} documents in {args.chroma} ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
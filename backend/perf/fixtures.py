@@ -0,0 +1,119 @@
+# perf/fixtures.py - Generated large databases for performance checks
+import random
+import sqlite3
+from typing import Dict, Optional
+from migrations import migrate
+
+COUNTRIES = ["USA", "UK", "Germany", "Canada", "Netherlands", "France", "Australia", "Japan",
+             "Singapore", "Switzerland", "Sweden", "Spain", "Italy", "Ireland", "Kuwait", "India"]
+MAJORS = ["Computer Science", "Data Science", "Artificial Intelligence", "Mechanical Engineering",
+          "Electrical Engineering", "Civil Engineering", "Business Administration", "Economics",
+          "Medicine", "Psychology", "Law", "Architecture", "Biology", "Chemistry", "Physics",
+          "Mathematics", "Finance", "Marketing", "Robotics", "Bioinformatics"]
+STATUSES = ["Draft", "Submitted", "Under Review", "Missing Documents", "Conditional Offer", "Final Offer", "Rejected"]
+
+# Row counts at scale=1.0
+BASE_SIZES = {
+    "universities": 20000,
+    "majors_per_university": 10,
+    "users": 20000,
+    "applications": 100000,
+    "documents_per_application": 2,
+    "notifications": 300000,
+    "scholarships": 5000,
+}
+
+
+PER_PARENT = ("majors_per_university", "documents_per_application")
+
+
+def fixture_sizes(scale: float = 1.0, overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Row counts for a scale; per-parent counts are not scaled, overrides win"""
+    sizes = {k: v if k in PER_PARENT else max(1, int(v * scale)) for k, v in BASE_SIZES.items()}
+    sizes.update(overrides or {})
+    return sizes
+
+
+def build_fixture_db(
+    path: str = ":memory:",
+    scale: float = 1.0,
+    seed: int = 42,
+    sizes: Optional[Dict[str, int]] = None
+) -> sqlite3.Connection:
+    """
+    Create a migrated database filled with deterministic synthetic data.
+    User 1 is an admin so admin endpoints can be exercised.
+    """
+    rng = random.Random(seed)
+    sizes = fixture_sizes(scale, sizes)
+
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.execute("PRAGMA synchronous = OFF")
+    cursor = conn.cursor()
+
+    n_unis = sizes["universities"]
+    cursor.executemany(
+        """INSERT INTO universities (id, name, country, city, tuition_fee, min_gpa, language,
+        scholarship_available, success_weight, ranking, acceptance_rate, is_active)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            (i, f"University {i}", rng.choice(COUNTRIES), f"City {i % 500}", rng.randint(0, 60000),
+             round(rng.uniform(2.0, 4.0), 2), "English", rng.random() < 0.4, round(rng.uniform(0.8, 1.5), 2),
+             i, round(rng.uniform(0.03, 0.9), 2), 1 if rng.random() < 0.95 else 0)
+            for i in range(1, n_unis + 1)
+        )
+    )
+    cursor.executemany(
+        "INSERT INTO university_majors (university_id, major_name) VALUES (?, ?)",
+        (
+            (uni_id, major)
+            for uni_id in range(1, n_unis + 1)
+            for major in rng.sample(MAJORS, sizes["majors_per_university"])
+        )
+    )
+
+    n_users = sizes["users"]
+    cursor.executemany(
+        "INSERT INTO users (id, email, password_hash, auth_provider) VALUES (?, ?, 'x', 'local')",
+        ((i, f"user{i}@example.com") for i in range(1, n_users + 1))
+    )
+    cursor.execute("UPDATE users SET is_admin = 1 WHERE id = 1")
+    cursor.executemany(
+        """INSERT INTO student_profiles (user_id, full_name, gpa, budget, preferred_country)
+        VALUES (?, ?, ?, ?, ?)""",
+        ((i, f"Student {i}", round(rng.uniform(2.0, 4.0), 2), rng.randint(5000, 60000), rng.choice(COUNTRIES))
+         for i in range(1, n_users + 1))
+    )
+
+    n_majors = n_unis * sizes["majors_per_university"]
+    n_apps = sizes["applications"]
+    cursor.executemany(
+        """INSERT INTO applications (id, user_id, university_id, major_id, status, application_date, last_updated)
+        VALUES (?, ?, ?, ?, ?, datetime('2024-01-01', ? || ' minutes'), datetime('2024-01-01', ? || ' minutes'))""",
+        (
+            (i, rng.randint(1, n_users), rng.randint(1, n_unis), rng.randint(1, n_majors),
+             rng.choice(STATUSES), i, i + rng.randint(0, 10000))
+            for i in range(1, n_apps + 1)
+        )
+    )
+    cursor.executemany(
+        "INSERT INTO application_documents (application_id, document_type, file_path, file_name) VALUES (?, 'transcript', '/tmp/x', 'x.pdf')",
+        ((app_id,) for app_id in range(1, n_apps + 1) for _ in range(sizes["documents_per_application"]))
+    )
+
+    cursor.executemany(
+        """INSERT INTO notifications (user_id, title, message, type, is_read, created_at)
+        VALUES (?, 'Update', 'Your application changed', 'info', ?, datetime('2024-01-01', ? || ' minutes'))""",
+        ((rng.randint(1, n_users), 1 if rng.random() < 0.8 else 0, i) for i in range(sizes["notifications"]))
+    )
+
+    cursor.executemany(
+        """INSERT INTO scholarships (name, country, provider, min_gpa, coverage, amount, deadline)
+        VALUES (?, ?, ?, ?, 'Partial tuition', ?, '2026-01-01')""",
+        ((f"Scholarship {i}", rng.choice(COUNTRIES), f"Provider {i % 300}", round(rng.uniform(2.5, 3.9), 1),
+          rng.randint(1000, 30000)) for i in range(sizes["scholarships"]))
+    )
+
+    conn.commit()
+    return conn
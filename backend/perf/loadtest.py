@@ -0,0 +1,304 @@
+# perf/loadtest.py - Concurrent load against a running instance of the app
+"""
+Drives the real HTTP API with a weighted endpoint mix and reports
+p50/p95/p99 latency, throughput and errors per endpoint.
+
+    python -m perf.datagen --preset intake --out University.db
+    python -m perf.ollama_stub &                  # LLM endpoints without a GPU
+    uvicorn main:app --workers 4 &
+    python -m perf.loadtest --base-url http://127.0.0.1:8000 --db University.db \\
+        --concurrency 64 --duration 60 --mix search=5,list=1,chat=1,assessment=1,admin=1,upload=1
+
+Tokens are minted with the app's own SECRET_KEY (or pass --token/--admin-token).
+"""
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import sqlite3
+import argparse
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+PDF_BYTES = b"%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+SEARCH_TERMS = ["Computer Science", "Data Science", "Medicine", "Law", "Finance", "Robotics"]
+COUNTRIES = ["USA", "UK", "Germany", "Canada", "Netherlands", "France", "Australia", "Japan"]
+CHAT_QUESTIONS = [
+    "Which universities in Germany offer Computer Science under 20000 tuition?",
+    "Compare affordable medicine programs in Canada",
+    "I have a 3.2 GPA, where can I study Data Science with a scholarship?",
+]
+
+
+@dataclass
+class Dataset:
+    """Id ranges sampled by the scenarios"""
+    max_university_id: int
+    max_user_id: int
+    max_application_id: int
+
+    @classmethod
+    def from_db(cls, path: str) -> "Dataset":
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            def top(table):
+                return conn.execute(f"SELECT COALESCE(MAX(id), 1) FROM {table}").fetchone()[0]
+            return cls(top("universities"), top("users"), top("applications"))
+        finally:
+            conn.close()
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+    files: Optional[dict] = None
+    data: Optional[dict] = None
+    admin: bool = False
+    user_id: Optional[int] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[random.Random, Dataset], Request]
+
+
+def _search(rng, ds):
+    params = {"page": rng.randint(1, 5), "page_size": 20}
+    if rng.random() < 0.7:
+        params["country"] = rng.choice(COUNTRIES)
+    if rng.random() < 0.4:
+        params["major"] = rng.choice(SEARCH_TERMS)
+    if rng.random() < 0.3:
+        params["max_tuition"] = rng.choice([10000, 20000, 40000])
+    return Request("GET", "/api/universities/search", params=params)
+
+
+def _chat(rng, ds):
+    return Request("POST", "/chatbot/university/chat", json={
+        "message": rng.choice(CHAT_QUESTIONS),
+        "filters": {"country": rng.choice(COUNTRIES)} if rng.random() < 0.5 else None,
+    })
+
+
+def _assessment(rng, ds):
+    answers = [
+        {"question": "Do you enjoy solving math problems?", "answer": rng.choice(["Yes", "No", "Sometimes"])},
+        {"question": "Do you like working with people?", "answer": rng.choice(["Yes", "No"])},
+        {"question": "Do you prefer building things?", "answer": rng.choice(["Yes", "No"])},
+    ]
+    return Request("POST", "/assessment/evaluate", json={"user_data": answers})
+
+
+def _admin(rng, ds):
+    params = {"page": rng.randint(1, 10), "page_size": 20}
+    if rng.random() < 0.5:
+        params["status"] = rng.choice(["Submitted", "Under Review", "Final Offer"])
+    return Request("GET", "/api/admin/applications/", params=params, admin=True)
+
+
+def _upload(rng, ds):
+    application_id = rng.randint(1, ds.max_application_id)
+    return Request(
+        "POST", f"/api/applications/{application_id}/upload",
+        data={"document_type": "transcript"},
+        files={"file": ("transcript.pdf", PDF_BYTES, "application/pdf")},
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in [
+    Scenario("search", _search),
+    Scenario("list", lambda rng, ds: Request("GET", "/api/universities/list")),
+    Scenario("detail", lambda rng, ds: Request("GET", f"/api/universities/{rng.randint(1, ds.max_university_id)}")),
+    Scenario("majors", lambda rng, ds: Request("GET", f"/api/universities/{rng.randint(1, ds.max_university_id)}/majors")),
+    Scenario("filters", lambda rng, ds: Request("GET", "/chatbot/university/filters")),
+    Scenario("scholarships", lambda rng, ds: Request("GET", "/api/scholarships/")),
+    Scenario("notifications", lambda rng, ds: Request(
+        "GET", f"/api/applications/notifications/{rng.randint(1, ds.max_user_id)}")),
+    Scenario("chat", _chat),
+    Scenario("assessment", _assessment),
+    Scenario("admin", _admin),
+    Scenario("upload", _upload),
+]}
+
+DEFAULT_MIX = "search=5,list=1,detail=2,majors=2,notifications=2,chat=1,assessment=1,admin=1,upload=1"
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, status: Optional[int], elapsed: float):
+        self.latencies.append(elapsed)
+        if status is not None:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self, wall_seconds: float) -> dict:
+        values = sorted(self.latencies)
+        return {
+            "requests": len(values),
+            "errors": self.errors,
+            "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+            "status": {str(k): v for k, v in sorted(self.status_counts.items())},
+        }
+
+
+class LoadTest:
+    def __init__(self, base_url: str, dataset: Dataset, mix: Dict[str, int], concurrency: int,
+                 duration: float, max_requests: Optional[int], user_token: Optional[str],
+                 admin_token: Optional[str], timeout: float = 120.0, seed: int = 1):
+        self.base_url = base_url.rstrip("/")
+        self.dataset = dataset
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.max_requests = max_requests
+        self.user_token = user_token
+        self.admin_token = admin_token
+        self.timeout = timeout
+        self.seed = seed
+        self.stats: Dict[str, EndpointStats] = {n: EndpointStats() for n in self.names}
+        self._issued = 0
+
+    def _headers(self, request: Request) -> dict:
+        token = self.admin_token if request.admin else self.user_token
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    async def _worker(self, client: httpx.AsyncClient, worker_id: int, deadline: float):
+        rng = random.Random(self.seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            if self.max_requests is not None:
+                if self._issued >= self.max_requests:
+                    return
+                self._issued += 1
+            name = rng.choices(self.names, self.weights)[0]
+            request = SCENARIOS[name].build(rng, self.dataset)
+            start = time.perf_counter()
+            status = None
+            try:
+                response = await client.request(
+                    request.method, request.path, params=request.params, json=request.json,
+                    data=request.data, files=request.files, headers=self._headers(request),
+                )
+                await response.aread()
+                status = response.status_code
+            except httpx.HTTPError:
+                pass
+            self.stats[name].record(status, time.perf_counter() - start)
+
+    async def run(self) -> dict:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            start = time.perf_counter()
+            deadline = start + self.duration
+            await asyncio.gather(*(self._worker(client, i, deadline) for i in range(self.concurrency)))
+            wall = time.perf_counter() - start
+
+        total = EndpointStats()
+        for stats in self.stats.values():
+            total.latencies.extend(stats.latencies)
+            total.errors += stats.errors
+            for status, count in stats.status_counts.items():
+                total.status_counts[status] = total.status_counts.get(status, 0) + count
+        return {
+            "concurrency": self.concurrency,
+            "wall_seconds": round(wall, 2),
+            "endpoints": {name: s.summary(wall) for name, s in self.stats.items() if s.latencies},
+            "total": total.summary(wall),
+        }
+
+
+def mint_tokens(admin_user_id: int, user_id: int):
+    """Sign tokens with the app's SECRET_KEY so no login round-trip is needed"""
+    from services.auth_service import create_access_token
+    return (create_access_token({"sub": str(user_id)}),
+            create_access_token({"sub": str(admin_user_id)}))
+
+
+def print_report(report: dict):
+    header = f"{'endpoint':<14}{'reqs':>8}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(f"\nconcurrency={report['concurrency']}  wall={report['wall_seconds']}s")
+    print(header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, s in rows:
+        print(f"{name:<14}{s['requests']:>8}{s['errors']:>6}{s['throughput_rps']:>9}"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['max_ms']:>10}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the running API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--db", default="University.db", help="database the server uses (for id ranges)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight list")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests")
+    parser.add_argument("--token", default=None, help="bearer token for user endpoints")
+    parser.add_argument("--admin-token", default=None, help="bearer token for admin endpoints")
+    parser.add_argument("--user-id", type=int, default=2)
+    parser.add_argument("--admin-user-id", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    user_token, admin_token = args.token, args.admin_token
+    if user_token is None or admin_token is None:
+        minted_user, minted_admin = mint_tokens(args.admin_user_id, args.user_id)
+        user_token = user_token or minted_user
+        admin_token = admin_token or minted_admin
+
+    test = LoadTest(
+        args.base_url, Dataset.from_db(args.db), mix, args.concurrency, args.duration,
+        args.requests, user_token, admin_token, timeout=args.timeout, seed=args.seed,
+    )
+    report = asyncio.run(test.run())
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["total"]["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# perf/migration_check.py - Startup migrations on a legacy, unversioned database
+"""
+Databases created by database_enhanced.create_enhanced_schema have every
+table but no schema_version. This builds one in a temporary directory,
+runs apply_migrations on it twice (first start and restart) with a
+separate catalog store, and exits non-zero unless the catalog rows end up
+in the catalog store with no copies left in main. Run from the backend
+directory:
+
+    python -m perf.migration_check
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+from typing import List
+from migrations import apply_migrations, discover_migrations
+from migrations.runner import pending_migrations
+from sqlite import CATALOG_TABLES
+
+LEGACY_UNIVERSITIES = 25
+
+
+def build_legacy_db(path: str):
+    """The baseline schema and a few catalog rows, as an unversioned database"""
+    initial = discover_migrations()[0][2]
+    conn = sqlite3.connect(path)
+    try:
+        initial.upgrade(conn)
+        conn.executemany(
+            "INSERT INTO universities (name, country, is_active) VALUES (?, ?, 1)",
+            [(f"Legacy University {i}", "UK") for i in range(LEGACY_UNIVERSITIES)]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def check(directory: str) -> List[str]:
+    main_db, catalog_db = os.path.join(directory, "legacy.db"), os.path.join(directory, "catalog.db")
+    build_legacy_db(main_db)
+    problems = []
+    for run in ("first start", "restart"):
+        try:
+            apply_migrations(main_db, catalog_name=catalog_db)
+        except Exception as e:
+            return problems + [f"{run}: apply_migrations failed: {e}"]
+
+    conn = sqlite3.connect(main_db)
+    try:
+        conn.execute("ATTACH DATABASE ? AS catalog", (catalog_db,))
+        main_tables = {r[0] for r in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+        shadowed = sorted(set(CATALOG_TABLES) & main_tables)
+        if shadowed:
+            problems.append(f"catalog tables left in main: {', '.join(shadowed)}")
+        universities = conn.execute("SELECT COUNT(*) FROM catalog.universities").fetchone()[0]
+        if universities != LEGACY_UNIVERSITIES:
+            problems.append(f"catalog.universities has {universities} rows, expected {LEGACY_UNIVERSITIES}")
+        if pending_migrations(conn):
+            problems.append("migrations still pending after startup")
+    finally:
+        conn.close()
+    return problems
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        problems = check(directory)
+    for problem in problems:
+        print(f"[FAIL] {problem}")
+    if not problems:
+        print("[ok] legacy database migrated and its catalog moved out")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+# perf/ollama_stub.py - Deterministic stand-in for the Ollama HTTP API
+"""
+Speaks enough of the Ollama protocol for ChatOllama / OllamaEmbeddings (and so
+UniversityRAGService, ai_service and VectorStore) to run unchanged:
+
+    POST /api/chat         streaming NDJSON or single JSON reply
+    POST /api/generate     same, with "response" instead of "message"
+    POST /api/embed        batch embeddings
+    POST /api/embeddings   legacy single embedding
+    GET  /api/tags, /api/version, POST /api/show
+
+Replies and embeddings depend only on the request text, so runs are
+reproducible. Latency is shaped by time-to-first-token and tokens/sec.
+
+    python -m perf.ollama_stub --port 11434 --ttft-ms 300 --tokens-per-sec 40
+
+Point the app at it with OLLAMA_BASE_URL=http://127.0.0.1:11434 (and
+OLLAMA_HOST for clients constructed without a base_url).
+"""
+import json
+import math
+import time
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+VOCABULARY = (
+    "university program tuition scholarship campus research student degree faculty admission "
+    "engineering science business medicine data computer design law economics ranking country "
+    "budget application deadline housing language semester credit course internship career "
+    "the a of and to in for with on is offers strong good excellent affordable options"
+).split()
+
+
+@dataclass
+class StubConfig:
+    ttft_ms: float = 200.0            # delay before the first token
+    tokens_per_sec: float = 50.0      # pacing of subsequent tokens (0 = no delay)
+    reply_tokens: int = 64            # tokens per generated reply
+    embed_dim: int = 768              # nomic-embed-text dimension
+    embed_latency_ms: float = 5.0     # per embed request
+    fixed_reply: Optional[str] = None  # reply with this text instead of generated words
+    model: str = "stub"
+
+
+# ============= Deterministic content =============
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def generate_reply(prompt: str, config: StubConfig, json_format: bool = False) -> List[str]:
+    """Reply split into tokens (word + trailing space), derived from the prompt hash"""
+    if config.fixed_reply is not None:
+        text = config.fixed_reply
+    else:
+        state = _seed(prompt)
+        words = []
+        for _ in range(config.reply_tokens):
+            # xorshift64: cheap, deterministic, independent of the random module
+            state ^= (state << 13) & 0xFFFFFFFFFFFFFFFF
+            state ^= state >> 7
+            state ^= (state << 17) & 0xFFFFFFFFFFFFFFFF
+            words.append(VOCABULARY[state % len(VOCABULARY)])
+        text = " ".join(words)
+    if json_format:
+        text = json.dumps({"response": text})
+        # Stream JSON in fixed-size pieces so it stays valid once concatenated
+        return [text[i:i + 8] for i in range(0, len(text), 8)]
+    words = text.split(" ")
+    return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+
+
+def embed_text(text: str, dim: int) -> List[float]:
+    """
+    Feature-hashed bag of words, L2-normalised. Texts sharing words get
+    similar vectors, so similarity search behaves plausibly.
+    """
+    vector = [0.0] * dim
+    for token in text.lower().split():
+        h = _seed(token)
+        vector[h % dim] += 1.0 if (h >> 32) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0.0:
+        vector[_seed(text) % dim] = 1.0
+        return vector
+    return [v / norm for v in vector]
+
+
+def _prompt_from_messages(messages) -> str:
+    return "\n".join(f"{m.get('role', '')}: {m.get('content', '')}" for m in messages or [])
+
+
+# ============= HTTP handler =============
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "OllamaStub/1.0"
+
+    @property
+    def config(self) -> StubConfig:
+        return self.server.config
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---------- plumbing ----------
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return {}
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _send_chunk(self, payload: dict):
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    # ---------- routes ----------
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{
+                "name": self.config.model, "model": self.config.model,
+                "modified_at": _now(), "size": 0, "digest": "stub",
+                "details": {"family": "stub", "parameter_size": "0B", "quantization_level": "none"},
+            }]})
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-stub"})
+        elif self.path in ("/", "/api/ps"):
+            self._send_json({"models": []} if self.path == "/api/ps" else {"status": "Ollama is running"})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        body = self._read_json()
+        if self.path == "/api/chat":
+            self._generate(body, _prompt_from_messages(body.get("messages")), chat=True)
+        elif self.path == "/api/generate":
+            self._generate(body, body.get("prompt", ""), chat=False)
+        elif self.path == "/api/embed":
+            self._embed(body)
+        elif self.path == "/api/embeddings":
+            self._sleep_ms(self.config.embed_latency_ms)
+            self._send_json({"embedding": embed_text(body.get("prompt", ""), self.config.embed_dim)})
+        elif self.path == "/api/show":
+            self._send_json({"modelfile": "", "parameters": "", "template": "",
+                             "details": {"family": "stub"}, "model_info": {}, "capabilities": ["completion"]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _sleep_ms(self, ms: float):
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def _embed(self, body: dict):
+        inputs = body.get("input", "")
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        start = time.perf_counter_ns()
+        self._sleep_ms(self.config.embed_latency_ms)
+        self._send_json({
+            "model": body.get("model", self.config.model),
+            "embeddings": [embed_text(t, self.config.embed_dim) for t in texts],
+            "total_duration": time.perf_counter_ns() - start,
+            "load_duration": 0,
+            "prompt_eval_count": sum(len(t.split()) for t in texts),
+        })
+
+    def _generate(self, body: dict, prompt: str, chat: bool):
+        config = self.config
+        model = body.get("model", config.model)
+        stream = body.get("stream", True)
+        tokens = generate_reply(prompt, config, json_format=body.get("format") == "json")
+        interval = 1.0 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+        start = time.perf_counter_ns()
+
+        def piece(text: str, done: bool) -> dict:
+            payload = {"model": model, "created_at": _now(), "done": done}
+            if chat:
+                payload["message"] = {"role": "assistant", "content": text}
+            else:
+                payload["response"] = text
+            return payload
+
+        def final_stats(eval_started: int) -> dict:
+            now = time.perf_counter_ns()
+            return {
+                "done_reason": "stop",
+                "total_duration": now - start,
+                "load_duration": 0,
+                "prompt_eval_count": len(prompt.split()),
+                "prompt_eval_duration": eval_started - start,
+                "eval_count": len(tokens),
+                "eval_duration": now - eval_started,
+            }
+
+        self._sleep_ms(config.ttft_ms)
+        eval_started = time.perf_counter_ns()
+
+        if not stream:
+            if interval and len(tokens) > 1:
+                time.sleep(interval * (len(tokens) - 1))
+            payload = piece("".join(tokens), True)
+            payload.update(final_stats(eval_started))
+            self._send_json(payload)
+            return
+
+        self._start_stream()
+        try:
+            for i, token in enumerate(tokens):
+                if i and interval:
+                    time.sleep(interval)
+                self._send_chunk(piece(token, False))
+            payload = piece("", True)
+            payload.update(final_stats(eval_started))
+            self._send_chunk(payload)
+            self._end_stream()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client cancelled mid-stream
+            self.close_connection = True
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class OllamaStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: StubConfig, verbose: bool = False):
+        super().__init__(address, OllamaStubHandler)
+        self.config = config
+        self.verbose = verbose
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> OllamaStubServer:
+    """Start the stub on a background thread (port 0 picks a free port); call .shutdown() to stop"""
+    server = OllamaStubServer((host, port), config or StubConfig())
+    threading.Thread(target=server.serve_forever, name="ollama-stub", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deterministic Ollama API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--ttft-ms", type=float, default=StubConfig.ttft_ms)
+    parser.add_argument("--tokens-per-sec", type=float, default=StubConfig.tokens_per_sec)
+    parser.add_argument("--reply-tokens", type=int, default=StubConfig.reply_tokens)
+    parser.add_argument("--embed-dim", type=int, default=StubConfig.embed_dim)
+    parser.add_argument("--embed-latency-ms", type=float, default=StubConfig.embed_latency_ms)
+    parser.add_argument("--fixed-reply", default=None)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        ttft_ms=args.ttft_ms, tokens_per_sec=args.tokens_per_sec, reply_tokens=args.reply_tokens,
+        embed_dim=args.embed_dim, embed_latency_ms=args.embed_latency_ms, fixed_reply=args.fixed_reply,
+    )
+    server = OllamaStubServer((args.host, args.port), config, verbose=args.verbose)
+    print(f"Ollama stub listening on {server.base_url} "
+          f"(ttft={config.ttft_ms}ms, {config.tokens_per_sec} tok/s, {config.reply_tokens} tokens)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# perf/password_cost.py - Picks the bcrypt cost for a target hashing latency
+"""
+Each bcrypt cost step doubles the work. Run this on the production
+hardware and set PASSWORD_HASH_ROUNDS to the cost it recommends: the
+highest whose hash still takes at most --target-ms.
+
+    python -m perf.password_cost                        # default 250 ms target
+    python -m perf.password_cost --target-ms 150 --throughput
+
+--throughput also hashes a burst through password_pool.PasswordPool at
+1, 2, 4 ... workers up to the core count, to check that logins per second
+scale with cores. Existing hashes are upgraded to a new cost as their
+users log in.
+"""
+import os
+import sys
+import time
+import argparse
+from typing import Dict, List
+from passlib.hash import bcrypt
+
+MIN_ROUNDS, MAX_ROUNDS = 8, 16
+PASSWORD = "correct horse battery staple"
+
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """Best-of-`samples` milliseconds for one hash at this cost"""
+    hasher = bcrypt.using(rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash(PASSWORD)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def calibrate(target_ms: float, samples: int) -> Dict[int, float]:
+    """ms per hash for each cost, stopping at the first one over target"""
+    timings = {}
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        timings[rounds] = time_rounds(rounds, samples)
+        if timings[rounds] > target_ms:
+            break
+    return timings
+
+
+def throughput(rounds: int, hashes: int) -> Dict[int, float]:
+    """Hashes per second through the pool, per worker count"""
+    from password_pool import PasswordPool
+    cores = os.cpu_count() or 1
+    counts: List[int] = []
+    workers = 1
+    while workers < cores:
+        counts.append(workers)
+        workers *= 2
+    counts.append(cores)
+
+    rates = {}
+    for workers in counts:
+        pool = PasswordPool(workers, rounds, queue_max=hashes)
+        try:
+            started = time.perf_counter()
+            futures = [pool.submit(pool.context.hash, PASSWORD) for _ in range(hashes)]
+            for future in futures:
+                future.result()
+            rates[workers] = hashes / (time.perf_counter() - started)
+        finally:
+            pool.close()
+    return rates
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pick the bcrypt cost for a target latency")
+    parser.add_argument("--target-ms", type=float, default=250, help="slowest acceptable hash (and so login)")
+    parser.add_argument("--samples", type=int, default=3, help="hashes timed per cost; the fastest counts")
+    parser.add_argument("--throughput", action="store_true", help="also measure pool throughput per worker count")
+    parser.add_argument("--hashes", type=int, default=32, help="hashes per throughput run")
+    args = parser.parse_args(argv)
+
+    timings = calibrate(args.target_ms, args.samples)
+    for rounds, ms in timings.items():
+        print(f"cost {rounds:2d}  {ms:8.1f} ms")
+    fitting = [rounds for rounds, ms in timings.items() if ms <= args.target_ms]
+    if not fitting:
+        print(f"\neven cost {MIN_ROUNDS} takes longer than {args.target_ms:g} ms on this machine")
+        return 1
+    chosen = max(fitting)
+    print(f"\nPASSWORD_HASH_ROUNDS={chosen}  ({timings[chosen]:.1f} ms per hash, target {args.target_ms:g} ms)")
+
+    if args.throughput:
+        print()
+        rates = throughput(chosen, args.hashes)
+        for workers, rate in rates.items():
+            print(f"{workers:3d} workers  {rate:7.1f} hashes/s  ({rate / rates[1]:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# perf/query_plan_check.py - Fails when hot queries stop using indexes
+"""
+Builds a large synthetic database (perf/fixtures.py), runs EXPLAIN QUERY PLAN
+for every hot query and exits non-zero if any of them full-scans a large
+table, or if a streamed export sorts (which buffers every row before the
+first is sent). Run in CI from the backend directory:
+
+    python -m perf.query_plan_check [--scale 0.2]
+"""
+import re
+import sys
+import argparse
+from dataclasses import dataclass, field
+from typing import Any, FrozenSet, List, Sequence, Tuple
+from perf.fixtures import build_fixture_db
+from services import query_builders as qb
+from services.notification_service import user_notifications_query
+from migrations.archive_schema import ensure_archive_schema
+
+# Tables big enough in production that a full scan is a regression
+LARGE_TABLES = {
+    "universities", "university_majors", "applications", "application_documents",
+    "notifications", "scholarships", "student_profiles", "users", "university_media",
+}
+
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(?:\w+\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIAS = {"where", "join", "left", "inner", "on", "order", "group", "limit", "using", "cross", "natural"}
+
+
+@dataclass
+class HotQuery:
+    name: str
+    sql: str
+    params: Sequence[Any] = ()
+    # Tables this query reads in full by design (e.g. the complete catalog list)
+    allow_scan: FrozenSet[str] = field(default_factory=frozenset)
+    # Streamed to the client: rows must come out in index order, without a sort
+    streamed: bool = False
+
+
+def hot_queries() -> List[HotQuery]:
+    def q(name, built, allow_scan=(), streamed=False):
+        sql, params = built
+        return HotQuery(name, sql, params, frozenset(allow_scan), streamed)
+
+    return [
+        HotQuery("universities.list",
+                 "SELECT id, name, country, city, tuition_fee, min_gpa, scholarship_available, ranking "
+                 "FROM universities WHERE is_active = 1",
+                 allow_scan=frozenset({"universities"})),
+        HotQuery("universities.majors",
+                 "SELECT id, major_name FROM university_majors WHERE university_id = ? ORDER BY major_name ASC",
+                 (42,)),
+        q("universities.search.count", qb.university_search_count_query(country="Germany")),
+        q("universities.search.page", qb.university_search_query(country="Germany")),
+        q("universities.search.page_unfiltered", qb.university_search_query()),
+        q("universities.search.major", qb.university_search_query(country="Canada", major="Data")),
+        q("universities.search.budget", qb.university_search_query(country="USA", max_tuition=20000, scholarship_track=True)),
+        q("chatbot.filtered.country_major",
+          qb.filtered_universities_query({"country": "Germany", "major": "Computer Science", "max_tuition": 30000})),
+        q("chatbot.filtered.unfiltered", qb.filtered_universities_query({})),
+        q("universities.batch.media", qb.university_media_query([3, 17, 42])),
+        q("admin.applications.count", qb.admin_applications_count_query(status="Submitted")),
+        q("admin.applications.page", qb.admin_applications_query()),
+        q("admin.applications.status", qb.admin_applications_query(status="Under Review")),
+        q("admin.applications.university", qb.admin_applications_query(university_id=17)),
+        q("admin.applications.archived.count",
+          qb.admin_applications_count_query(status="Rejected", include_archived=True)),
+        q("admin.applications.archived.page", qb.admin_applications_query(page=3, include_archived=True)),
+        q("admin.applications.archived.university",
+          qb.admin_applications_query(university_id=17, include_archived=True)),
+        q("admin.applications.export", qb.admin_applications_export_query(include_archived=True), streamed=True),
+        q("admin.applications.export.status",
+          qb.admin_applications_export_query(status="Rejected", include_archived=True), streamed=True),
+        q("admin.payments.export", qb.payment_report_query(), allow_scan={"payments"}, streamed=True),
+        q("admin.leads.export", qb.leads_query(), allow_scan={"service_leads"}, streamed=True),
+        q("admin.payments.summary", qb.payment_rollups_query("2024-01-01", "2024-03-31"), allow_scan={"premium_features"}),
+        q("notifications.all", user_notifications_query(7)),
+        q("notifications.unread", user_notifications_query(7, is_read=False)),
+        HotQuery("notifications.unread_count",
+                 "SELECT unread_count FROM notification_counters WHERE user_id = ?", (7,)),
+        HotQuery("applications.by_user",
+                 "SELECT id, status FROM applications WHERE user_id = ? ORDER BY application_date DESC", (7,)),
+    ]
+
+
+def table_aliases(sql: str) -> dict:
+    """alias (or bare table name) -> table name for every FROM/JOIN reference"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.lower() not in _NOT_ALIAS:
+            aliases[alias] = table
+    return aliases
+
+
+def plan_violations(conn, query: HotQuery) -> Tuple[List[str], List[str]]:
+    plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query.sql, query.params)]
+    aliases = table_aliases(query.sql)
+    violations = []
+    for detail in plan:
+        if query.streamed and detail.startswith("USE TEMP B-TREE"):
+            violations.append(f"{detail}  (streamed query sorts)")
+            continue
+        match = _SCAN.match(detail)
+        if not match:
+            continue
+        name, alias, rest = match.groups()
+        table = aliases.get(alias or name, aliases.get(name, name))
+        if "USING" in rest or table not in LARGE_TABLES or table in query.allow_scan:
+            continue
+        violations.append(f"{detail}  (full scan of {table})")
+    return violations, plan
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="fixture size multiplier")
+    parser.add_argument("--db", default=":memory:", help="where to build the fixture database")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    conn = build_fixture_db(args.db, scale=args.scale)
+    # An empty archive store: the plans of the queries that read it still have to use its indexes
+    conn.execute("ATTACH DATABASE ':memory:' AS archive")
+    ensure_archive_schema(conn)
+    failures = 0
+    for query in hot_queries():
+        violations, plan = plan_violations(conn, query)
+        status = "FAIL" if violations else "ok"
+        print(f"[{status}] {query.name}")
+        if violations or args.verbose:
+            for line in (violations if violations and not args.verbose else plan):
+                print(f"        {line}")
+        failures += bool(violations)
+    conn.close()
+
+    print(f"\n{failures} of {len(hot_queries())} hot queries scan large tables")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlite import get_db
 from middleware.auth_middleware import require_admin
+from services.weights_registry import get_weights_registry
 import sqlite3
 import logging
 
@@ -8,11 +9,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/admin", tags=["Legacy Admin"])
 
 @router.get("/ai-weights")
-def get_weights(db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
-    logger.info("fetched database weights from db")
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM ai_weights ORDER BY updated_at DESC LIMIT 1")
-    row = cursor.fetchone()
-    if not row:
+def get_weights(current_user: dict = Depends(require_admin)):
+    snapshot = get_weights_registry().current()
+    if snapshot.version == 0:
         return {}
-    return dict(row)
+    return {"id": snapshot.version, **snapshot.as_settings()}
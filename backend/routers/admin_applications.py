@@ -1,8 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional, List
 from services.application_service import ApplicationService
+from services.query_builders import (
+    admin_applications_count_query, admin_applications_query, admin_applications_export_query
+)
 from middleware.auth_middleware import require_admin
-from sqlite import get_db
+from sqlite import get_db, has_archive
+from db_writer import db_writer
+from utils.responses import FastJSONResponse, stream_query
+from utils.serialization import column_names, rows_to_dicts
 import sqlite3
 from logger import logger
 router = APIRouter(prefix="/api/admin/applications", tags=["Admin Applications"])
@@ -19,77 +25,50 @@ def get_all_applications(
     
     try:
         cursor = db.cursor()
+        # Finalized applications past retention live in the archive store; list them too
+        archived = has_archive(db)
         
-        # Build query
-        query = """
-            SELECT 
-                a.id, a.user_id, a.status, a.application_date, a.last_updated,
-                u.name as university_name, u.country,
-                m.name as major_name,
-                sp.full_name as student_name
-            FROM applications a
-            JOIN universities u ON a.university_id = u.id
-            JOIN university_majors m ON a.major_id = m.id
-            JOIN student_profiles sp ON a.user_id = sp.user_id
-        """
-        
-        where_clauses = []
-        params = []
-        
-        if status:
-            where_clauses.append("a.status = ?")
-            params.append(status)
-            
-        if university_id:
-            where_clauses.append("a.university_id = ?")
-            params.append(university_id)
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-      
-        count_query = "SELECT COUNT(*) FROM (" + query + ")"
-        cursor.execute(count_query, params)
+        cursor.execute(*admin_applications_count_query(
+            status=status, university_id=university_id, include_archived=archived
+        ))
         total_count = cursor.fetchone()[0]
         
-        
-        query += " ORDER BY a.last_updated DESC LIMIT ? OFFSET ?"
-        offset = (page - 1) * page_size
-        params.extend([page_size, offset])
-        
-        cursor.execute(query, params)
-        apps = cursor.fetchall()
-        
-        applications = []
-        for row in apps:
-            # Get document count
-            cursor.execute("SELECT COUNT(*) FROM application_documents WHERE application_id = ?", (row[0],))
-            doc_count = cursor.fetchone()[0]
-            
-            applications.append({
-                "id": row[0],
-                "user_id": row[1],
-                "status": row[2],
-                "application_date": row[3],
-                "last_updated": row[4],
-                "university_name": row[5],
-                "country": row[6],
-                "major_name": row[7],
-                "student_name": row[8],
-                "document_count": doc_count
-            })
+        # Document counts come back as a correlated subquery instead of one query per row
+        cursor.execute(*admin_applications_query(
+            status=status, university_id=university_id, page=page, page_size=page_size,
+            include_archived=archived
+        ))
+        # The selected columns are named after the response keys
+        applications = rows_to_dicts(column_names(cursor), cursor.fetchall())
         logger.info(f"Fetched {len(applications)} applications for admin")
-        return {
+        return FastJSONResponse({
             "applications": applications,
             "total_count": total_count,
             "page": page,
             "page_size": page_size,
             "total_pages": (total_count + page_size - 1) // page_size
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/export")
+def export_applications(
+    status: Optional[str] = Query(None),
+    university_id: Optional[int] = Query(None),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_admin: dict = Depends(require_admin),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """
+    Every application matching the listing filters, streamed as CSV or NDJSON
+    """
+    sql, params = admin_applications_export_query(
+        status=status, university_id=university_id, include_archived=has_archive(db)
+    )
+    logger.info(f"Exporting applications as {format} (status={status}, university_id={university_id})")
+    return stream_query(sql, params, fmt=format, filename="applications")
+
 @router.patch("/{application_id}/status")
 def update_status(
     application_id: int,
@@ -105,11 +84,12 @@ def update_status(
     if not new_status:
         raise HTTPException(status_code=400, detail="New status is required")
         
-    result = ApplicationService.update_application_status(
+    result = db_writer().write(lambda db: ApplicationService.update_application_status(
         application_id=application_id,
         new_status=new_status,
-        admin_notes=admin_notes
-    )
+        admin_notes=admin_notes,
+        db=db
+    ))
     
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -120,8 +100,7 @@ def update_status(
 def verify_document(
     document_id: int,
     verification: dict,
-    current_admin: dict = Depends(require_admin),
-    db: sqlite3.Connection = Depends(get_db)
+    current_admin: dict = Depends(require_admin)
 ):
     """
     Verify or reject a document
@@ -129,14 +108,12 @@ def verify_document(
     is_verified = verification.get("is_verified", False)
     
     try:
-        cursor = db.cursor()
-        cursor.execute(
+        _, rowcount = db_writer().execute(
             "UPDATE application_documents SET is_verified = ? WHERE id = ?",
             (1 if is_verified else 0, document_id)
         )
-        db.commit()
         
-        if cursor.rowcount == 0:
+        if rowcount == 0:
             raise HTTPException(status_code=404, detail="Document not found")
             
         return {"success": True, "is_verified": is_verified}
@@ -153,20 +130,23 @@ def get_dashboard_stats(current_admin: dict = Depends(require_admin), db: sqlite
     """
     try:
         cursor = db.cursor()
+        schemas = ["main", "archive"] if has_archive(db) else ["main"]
         
         # Applications by status
-        cursor.execute("SELECT status, COUNT(*) FROM applications GROUP BY status")
-        status_counts = {row[0]: row[1] for row in cursor.fetchall()}
+        status_counts = {}
+        for schema in schemas:
+            cursor.execute(f"SELECT status, COUNT(*) FROM {schema}.applications GROUP BY status")
+            for row in cursor.fetchall():
+                status_counts[row[0]] = status_counts.get(row[0], 0) + row[1]
         
-        # Recent applications (last 7 days)
+        # Recent applications (last 7 days); archived ones are finalized and past retention
         cursor.execute("SELECT COUNT(*) FROM applications WHERE application_date > date('now', '-7 days')")
         recent_count = cursor.fetchone()[0]
         
         # Total applications
-        cursor.execute("SELECT COUNT(*) FROM applications")
-        total_count = cursor.fetchone()[0]
+        total_count = sum(status_counts.values())
         
-        # Pending verification count
+        # Pending verification count (documents of archived applications are no longer pending)
         cursor.execute("SELECT COUNT(*) FROM application_documents WHERE is_verified = 0")
         pending_verification = cursor.fetchone()[0]
         
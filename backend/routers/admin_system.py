@@ -1,13 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends, Form, Body
-from typing import List, Optional, Dict
+from fastapi import APIRouter, HTTPException, Depends, Form, Body, UploadFile, File, Request, Query
+from typing import List, Optional, Dict, Tuple
 from middleware.auth_middleware import require_admin
-from sqlite import get_db
+from sqlite import get_db, connect, has_archive
 import sqlite3
 import logging
+import io
+import os
 from datetime import datetime
 from logger import logger
 from models.university import UniversityUpdate,UniversityBase
 from models.scholarship import ScholarshipCreate, ScholarshipUpdate
+from services import catalog_version
+from services.query_builders import leads_query, payment_report_query
+from services.payment_rollups import payment_summary, total_revenue
+from db_writer import db_writer
+from utils.responses import FastJSONResponse, stream_query, wants_ndjson
+from utils.serialization import column_names, rows_to_dicts
+from services.catalog_import import IMPORTERS, run_import
+from services.weights_registry import DEFAULT_WEIGHTS, get_weights_registry, weight_values
 
 router = APIRouter(prefix="/api/admin/system", tags=["Admin System"])
 
@@ -18,15 +28,17 @@ def get_dashboard_stats(current_user:dict=Depends(require_admin),db: sqlite3.Con
     
     stats = {}
     
-    # Applications
-    cursor.execute("SELECT COUNT(*) FROM applications")
+    # Applications, including those moved to the archive store
+    cursor.execute("SELECT COUNT(*) FROM main.applications")
     stats["total_applications"] = cursor.fetchone()[0]
+    if has_archive(db):
+        cursor.execute("SELECT COUNT(*) FROM archive.applications")
+        stats["total_applications"] += cursor.fetchone()[0]
     logger.info("total applications fetched sucessfully")
     
-    # Revenue
-    cursor.execute("SELECT SUM(amount) FROM payments WHERE status = 'Completed'")
-    stats["total_revenue"] = cursor.fetchone()[0] or 0
-    print(f"total revenue fetched : {stats['total_revenue']}")
+    # Revenue, from the daily rollups rather than every payment
+    stats["total_revenue"] = total_revenue(db)
+    logger.debug("total revenue fetched: %s", stats['total_revenue'])
     
     # Students
     cursor.execute("SELECT COUNT(*) FROM users WHERE is_admin = 0")
@@ -36,33 +48,15 @@ def get_dashboard_stats(current_user:dict=Depends(require_admin),db: sqlite3.Con
     cursor.execute("SELECT COUNT(*) FROM partners WHERE is_active = 1")
     stats["active_partners"] = cursor.fetchone()[0]
     
-    print("stats fetched sucessfully")
+    logger.debug("dashboard stats fetched")
     cursor.close()
     return stats
 
 @router.get("/ai-settings")
-def get_ai_settings(db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
-    """Fetch current AI weights and settings"""
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM ai_weights ORDER BY updated_at DESC LIMIT 1")
-    row = cursor.fetchone()
-    
-    if not row:
-        return {
-            "gpa_weight": 0.3,
-            "budget_weight": 0.25,
-            "assessment_weight": 0.45
-        }
-        
-    return {
-        "acceptance_rate_weight": row[1],
-        "scholarship_weight": row[2],
-        "success_history_weight": row[3],
-        "feedback_weight": row[4],
-        "gpa_weight": row[5],
-        "budget_weight": row[6],
-        "assessment_weight": row[7]
-    }
+def get_ai_settings(current_user: dict = Depends(require_admin)):
+    """Fetch current AI weights and settings (served from the in-memory registry)"""
+    snapshot = get_weights_registry().current()
+    return {**snapshot.as_settings(), "version": snapshot.version}
 
 @router.post("/ai-settings")
 def update_ai_settings(
@@ -70,106 +64,88 @@ def update_ai_settings(
     db: sqlite3.Connection = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
-    """Update AI performance weights"""
+    """Update AI performance weights and hot-reload them"""
+    registry = get_weights_registry()
+    defaults = registry.current().as_settings()
+    columns = [c for c in registry.columns if c in defaults] or list(DEFAULT_WEIGHTS)
+    # Validate before the write: a row that doesn't parse would become the newest version
     try:
-        cursor = db.cursor()
-        cursor.execute(
-            """INSERT INTO ai_weights 
-            (acceptance_rate_weight, scholarship_weight, success_history_weight, feedback_weight, gpa_weight, budget_weight, assessment_weight)
-            VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (
-                settings.get("acceptance_rate_weight", 0.3),
-                settings.get("scholarship_weight", 0.4),
-                settings.get("success_history_weight", 0.2),
-                settings.get("feedback_weight", 0.1),
-                settings.get("gpa_weight", 0.3),
-                settings.get("budget_weight", 0.25),
-                settings.get("assessment_weight", 0.45)
-            )
+        values = weight_values(settings, columns, defaults)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        db_writer().execute(
+            f"""INSERT INTO ai_weights ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)})""",
+            values
         )
-        db.commit()
-        return {"success": True}
+        snapshot = registry.reload(db)
+        return {"success": True, "version": snapshot.version}
     except Exception as e:
         logger.error(f"Error updating AI settings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# The admin listings below are unpaginated: the columns are aliased to the response
+# keys so rows encode directly. "Accept: application/x-ndjson" streams them instead,
+# and the /export routes stream them as CSV or NDJSON downloads.
+
+def _listing(request: Request, db: sqlite3.Connection, key: str, query: Tuple[str, list]):
+    """{key: [rows]} as one JSON body, or the rows as an NDJSON stream"""
+    if wants_ndjson(request):
+        return stream_query(*query)
+    cursor = db.execute(*query)
+    return FastJSONResponse({key: rows_to_dicts(column_names(cursor), cursor.fetchall())})
+
+
 @router.get("/payments/report")
-def get_payment_report(db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
+def get_payment_report(request: Request, db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
     """Get summarized payment reports"""
-    cursor = db.cursor()
-    
-    cursor.execute("""
-        SELECT p.id, u.email, f.feature_name, p.amount, p.payment_method, p.status, p.completed_at
-        FROM payments p
-        JOIN users u ON p.user_id = u.id
-        JOIN premium_features f ON p.feature_id = f.id
-        ORDER BY p.completed_at DESC
-    """)
-    rows = cursor.fetchall()
-    
-    reports = []
-    for row in rows:
-        reports.append({
-            "id": row[0],
-            "student_email": row[1],
-            "feature": row[2],
-            "amount": row[3],
-            "method": row[4],
-            "status": row[5],
-            "date": row[6]
-        })
-    return {"reports": reports}
+    return _listing(request, db, "reports", payment_report_query())
+
+@router.get("/payments/summary")
+def get_payment_summary(
+    start: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    db: sqlite3.Connection = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Revenue, payments by status and conversion for a date range, per day, feature and method"""
+    return payment_summary(db, start, end)
+
+@router.get("/payments/report/export")
+def export_payment_report(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: dict = Depends(require_admin)
+):
+    """The full payment report, streamed as CSV or NDJSON"""
+    return stream_query(*payment_report_query(), fmt=format, filename="payments")
 
 @router.get("/leads")
-def list_all_leads(db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
+def list_all_leads(request: Request, db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
     """Fetch all service leads for administration"""
-    cursor = db.cursor()
-    cursor.execute("""
-        SELECT l.id, l.student_name, l.student_email, l.student_phone, l.status, l.created_at, 
-               p.name as partner_name, o.title as offer_title
-        FROM service_leads l
-        JOIN partners p ON l.partner_id = p.id
-        JOIN service_offers o ON l.offer_id = o.id
-        ORDER BY l.created_at DESC
-    """)
-    rows = cursor.fetchall()
-    
-    leads = []
-    for row in rows:
-        leads.append({
-            "id": row[0],
-            "name": row[1],
-            "email": row[2],
-            "phone": row[3],
-            "status": row[4],
-            "date": row[5],
-            "partner": row[6],
-            "offer": row[7]
-        })
-        
-    return {"leads": leads}
+    return _listing(request, db, "leads", leads_query())
+
+@router.get("/leads/export")
+def export_leads(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: dict = Depends(require_admin)
+):
+    """Every service lead, streamed as CSV or NDJSON"""
+    return stream_query(*leads_query(), fmt=format, filename="leads")
 
 # ================= University Management =================
 
 @router.get("/universities")
-def list_universities(db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
+def list_universities(request: Request, db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
     """Fetch all universities for administration"""
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM universities ORDER BY id DESC")
-    rows = cursor.fetchall()
-    
-    universities = []
-    for row in rows:
-        universities.append(dict(row))
-    return {"universities": universities}
+    return _listing(request, db, "universities", ("SELECT * FROM universities ORDER BY id DESC", []))
 
 @router.post("/universities")
-def create_university(university: UniversityBase, db: sqlite3.Connection = Depends(get_db),current_user:dict=Depends(require_admin)):
+def create_university(university: UniversityBase, current_user:dict=Depends(require_admin)):
     """Create a new university record"""
-    # user, conn = db
     try:
-        cursor = db.cursor()
-        cursor.execute(
+        uni_id, _ = db_writer().execute(
             """INSERT INTO universities 
             (name, country, city, tuition_fee, min_gpa, language, scholarship_available, 
          overview, duration, accommodation_info, website, ranking, acceptance_rate)
@@ -181,18 +157,17 @@ def create_university(university: UniversityBase, db: sqlite3.Connection = Depen
                 university.accommodation_info, university.website, university.ranking, university.acceptance_rate
             )
         )
-        db.commit()
-        return {"success": True, "id": cursor.lastrowid}
+        catalog_version.bump([uni_id])
+        return {"success": True, "id": uni_id}
     except Exception as e:
         logger.error(f"Error creating university: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/universities/{uni_id}")
-def update_university(uni_id: int, university: UniversityUpdate, db: sqlite3.Connection = Depends(get_db),current_user:dict=Depends(require_admin)):
+def update_university(uni_id: int, university: UniversityUpdate, current_user:dict=Depends(require_admin)):
     """Update an existing university record"""
    
     try:
-        cursor = db.cursor()
         # Dynamically build UPDATE query
         update_data = university.model_dump(exclude_unset=True)
         if not update_data:
@@ -209,21 +184,20 @@ def update_university(uni_id: int, university: UniversityUpdate, db: sqlite3.Con
         
         values.append(uni_id)
         query = f"UPDATE universities SET {', '.join(fields)} WHERE id = ?"
-        cursor.execute(query, values)
-        db.commit()
+        db_writer().execute(query, values)
+        catalog_version.bump([uni_id])
         return {"success": True}
     except Exception as e:
         logger.error(f"Error updating university: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/universities/{uni_id}")
-def delete_university(uni_id: int, db: sqlite3.Connection = Depends(get_db),current_user:dict=Depends(require_admin)):
+def delete_university(uni_id: int, current_user:dict=Depends(require_admin)):
     """Soft delete (toggle active) a university"""
     
     try:
-        cursor = db.cursor()
-        cursor.execute("UPDATE universities SET is_active = 1 - is_active WHERE id = ?", (uni_id,))
-        db.commit()
+        db_writer().execute("UPDATE universities SET is_active = 1 - is_active WHERE id = ?", (uni_id,))
+        catalog_version.bump([uni_id])
         return {"success": True}
     except Exception as e:
         logger.error(f"Error deleting university: {e}")
@@ -234,23 +208,15 @@ def delete_university(uni_id: int, db: sqlite3.Connection = Depends(get_db),curr
 # ================= Scholarship Management =================
 
 @router.get("/scholarships")
-def list_scholarships(db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
+def list_scholarships(request: Request, db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
     """Fetch all scholarships for administration"""
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM scholarships ORDER BY id DESC")
-    rows = cursor.fetchall()
-    
-    scholarships = []
-    for row in rows:
-        scholarships.append(dict(row))
-    return {"scholarships": scholarships}
+    return _listing(request, db, "scholarships", ("SELECT * FROM scholarships ORDER BY id DESC", []))
 
 @router.post("/scholarships")
-def create_scholarship(scholarship: ScholarshipCreate, db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
+def create_scholarship(scholarship: ScholarshipCreate, current_user: dict = Depends(require_admin)):
     """Create a new scholarship record"""
     try:
-        cursor = db.cursor()
-        cursor.execute(
+        sch_id, _ = db_writer().execute(
             """INSERT INTO scholarships 
             (name, country, provider, min_gpa, max_age, nationality_requirement, 
              coverage, amount, deadline, description, required_documents, website)
@@ -262,17 +228,18 @@ def create_scholarship(scholarship: ScholarshipCreate, db: sqlite3.Connection =
                 scholarship.required_documents, scholarship.website
             )
         )
-        db.commit()
-        return {"success": True, "id": cursor.lastrowid}
+        catalog_version.bump([])
+        return {"success": True, "id": sch_id}
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail="A scholarship with this name and provider already exists")
     except Exception as e:
         logger.error(f"Error creating scholarship: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/scholarships/{sch_id}")
-def update_scholarship(sch_id: int, scholarship: ScholarshipUpdate, db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
+def update_scholarship(sch_id: int, scholarship: ScholarshipUpdate, current_user: dict = Depends(require_admin)):
     """Update an existing scholarship record"""
     try:
-        cursor = db.cursor()
         update_data = scholarship.model_dump(exclude_unset=True)
         if not update_data:
             return {"success": True}
@@ -288,21 +255,48 @@ def update_scholarship(sch_id: int, scholarship: ScholarshipUpdate, db: sqlite3.
         
         values.append(sch_id)
         query = f"UPDATE scholarships SET {', '.join(fields)} WHERE id = ?"
-        cursor.execute(query, values)
-        db.commit()
+        db_writer().execute(query, values)
+        catalog_version.bump([])
         return {"success": True}
     except Exception as e:
         logger.error(f"Error updating scholarship: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/scholarships/{sch_id}")
-def delete_scholarship(sch_id: int, db: sqlite3.Connection = Depends(get_db), current_user: dict = Depends(require_admin)):
+def delete_scholarship(sch_id: int, current_user: dict = Depends(require_admin)):
     """Soft delete (toggle active) a scholarship"""
     try:
-        cursor = db.cursor()
-        cursor.execute("UPDATE scholarships SET is_active = 1 - is_active WHERE id = ?", (sch_id,))
-        db.commit()
+        db_writer().execute("UPDATE scholarships SET is_active = 1 - is_active WHERE id = ?", (sch_id,))
+        catalog_version.bump([])
         return {"success": True}
     except Exception as e:
         logger.error(f"Error deleting scholarship: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/import/{kind}")
+def import_catalog(
+    kind: str,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(require_admin)
+):
+    """Bulk import universities, programs or scholarships from a CSV or JSONL upload"""
+    if kind not in IMPORTERS:
+        raise HTTPException(status_code=400, detail=f"Unknown import kind: {kind}")
+    
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    if ext not in (".csv", ".jsonl", ".ndjson"):
+        raise HTTPException(status_code=400, detail="Only .csv and .jsonl files are supported")
+    
+    try:
+        # Read the spooled upload line by line instead of loading it into memory
+        stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+        # Request connections see the catalog read-only; the import gets its own writable one
+        db = connect(catalog="rw")
+        try:
+            report = run_import(db, kind, stream, fmt="csv" if ext == ".csv" else "jsonl")
+        finally:
+            db.close()
+        return {"success": True, **report.to_dict()}
+    except Exception as e:
+        logger.error(f"Error importing {kind}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -5,14 +5,17 @@ from typing import Optional, List
 from services.application_service import ApplicationService
 from services.notification_service import get_user_notifications, get_unread_count, mark_notification_read, mark_all_read
 from sqlite import get_db
+from async_db import db_pool
+from db_writer import db_writer, execute_statement
+from services.archive_service import restore_rows
 from config import settings
 import os
 import shutil
+import asyncio
 from datetime import datetime
 import logging
 from fastapi import Depends , status ,Security
 
-logging.basicConfig(level=logging.INFO)
 
 logger = logging.getLogger(__name__)
 
@@ -36,15 +39,16 @@ class ApplicationStatusUpdate(BaseModel):
 # ============= Application Endpoints =============
 
 @router.post("/create")
-def create_application(request: ApplicationCreateRequest,db:sqlite3.Connection=Depends(get_db)):
+def create_application(request: ApplicationCreateRequest):
     """Create a new application in Draft status"""
-    result = ApplicationService.create_application(
+    # The duplicate check and the insert share the write transaction
+    result = db_writer().write(lambda db: ApplicationService.create_application(
         user_id=request.user_id,
         university_id=request.university_id,
         major_id=request.major_id,
         notes=request.notes,
         db=db
-    )
+    ))
     
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -88,17 +92,23 @@ def get_user_applications(user_id: int, status: Optional[str] = None,db:sqlite3.
     }
 
 
+def _save_upload(source, file_path: str):
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+
 @router.post("/{application_id}/upload")
 async def upload_document(
     application_id: int,
     document_type: str = Form(...),
-    file: UploadFile = File(...),
-    db:sqlite3.Connection=Depends(get_db)
+    file: UploadFile = File(...)
 ):
     """Upload a document for an application"""
     
     # Validate application exists
-    app_details = ApplicationService.get_application_details(application_id,db=db)
+    app_details = await db_pool().run(
+        lambda conn: ApplicationService.get_application_details(application_id, db=conn)
+    )
     if not app_details:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -117,23 +127,17 @@ async def upload_document(
         logger.info("unique name generated from the model")
         file_path = os.path.join(settings.UPLOAD_DIR, filename)
         
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Save to database
-        conn = db
-        cursor = conn.cursor()
+        # Save file (off the event loop, like the database work)
+        await asyncio.to_thread(_save_upload, file.file, file_path)
         
-        cursor.execute("""
+        # Save to database; an archived application moves back to the hot tables first
+        if app_details["archived"]:
+            await db_writer().run(restore_rows, "applications", [application_id])
+        doc_id, _ = await db_writer().run(execute_statement, """
             INSERT INTO application_documents (application_id, document_type, file_path, file_name)
             VALUES (?, ?, ?, ?)
         """, (application_id, document_type, file_path, filename))
         
-        doc_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
         logger.info(f"Document uploaded: {filename} for application {application_id}")
         
         return {
@@ -153,9 +157,9 @@ async def upload_document(
 
 
 @router.post("/{application_id}/submit")
-def submit_application(application_id: int,db:sqlite3.Connection=Depends(get_db)):
+def submit_application(application_id: int):
     """Submit an application (change status from Draft to Submitted)"""
-    result = ApplicationService.submit_application(application_id,db=db)
+    result = db_writer().write(ApplicationService.submit_application, application_id)
     
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -164,14 +168,14 @@ def submit_application(application_id: int,db:sqlite3.Connection=Depends(get_db)
 
 
 @router.patch("/{application_id}/status")
-def update_application_status(application_id: int, update: ApplicationStatusUpdate,db:sqlite3.Connection=Depends(get_db)):
+def update_application_status(application_id: int, update: ApplicationStatusUpdate):
     """Update application status (Admin only)"""
-    result = ApplicationService.update_application_status(
+    result = db_writer().write(lambda db: ApplicationService.update_application_status(
         application_id=application_id,
         new_status=update.status,
         admin_notes=update.admin_notes,
         db=db
-    )
+    ))
     
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -183,9 +187,9 @@ def update_application_status(application_id: int, update: ApplicationStatusUpda
 
 
 @router.delete("/{application_id}")
-def delete_application(application_id: int, user_id: int,db:sqlite3.Connection=Depends(get_db)):
+def delete_application(application_id: int, user_id: int):
     """Delete a draft application"""
-    result = ApplicationService.delete_application(application_id, user_id,db=db)
+    result = db_writer().write(lambda db: ApplicationService.delete_application(application_id, user_id, db=db))
     
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -222,9 +226,7 @@ def get_notifications(user_id: int, unread_only: bool = False):
 @router.post("/notifications/{notification_id}/read")
 def mark_notification_as_read(notification_id: int, user_id: int):
     """Mark a notification as read"""
-    conn = get_db()
-    success = mark_notification_read(conn, notification_id, user_id)
-    conn.close()
+    success = db_writer().write(mark_notification_read, notification_id, user_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Notification not found")
@@ -236,9 +238,7 @@ def mark_notification_as_read(notification_id: int, user_id: int):
 @router.post("/notifications/user/{user_id}/read-all")
 def mark_all_notifications_read(user_id: int):
     """Mark all notifications as read for a user"""
-    conn = get_db()
-    count = mark_all_read(conn, user_id)
-    conn.close()
+    count = db_writer().write(mark_all_read, user_id)
     
     return {
         "success": True,
@@ -4,8 +4,10 @@ from models.assessment import SubmitAssessment, AssessmentResultResponse, Recomm
 from services import ai_service
 from middleware.auth_middleware import get_current_active_user
 from sqlite import get_db
+from async_db import db_pool
 import sqlite3
 import json
+import asyncio
 from datetime import datetime
 import logging
 from pydantic import BaseModel
@@ -18,6 +20,7 @@ from test_api import QuestionGenerateRequest
 
 vector=VectorStore()
 router = APIRouter(prefix="/assessment", tags=["Assessment"])
+logger = logging.getLogger(__name__)
 
 class AssessmentRequest(BaseModel):
     test_type: str
@@ -89,15 +92,14 @@ async def recommanded_major(request: Request):
     )
 
     
-    user_traits = User_built_prompt(user_data)
-    print(user_traits)
-    print(f"user_traits from Q&A pairs:{user_traits}")
+    # LLM and embedding calls block; keep them off the event loop
+    user_traits = await asyncio.to_thread(User_built_prompt, user_data)
+    logger.debug("user_traits from Q&A pairs: %s", user_traits)
 
-    conn = sqlite3.connect("/Users/swarajsolanke/Smart_assistant_chatbot/university_recommander/University.db")
-    major_data = fetch_majors(conn)
+    major_data = await db_pool().run(fetch_majors)
 
    
-    recommendations = recommend_majors(user_traits, major_data)
+    recommendations = await asyncio.to_thread(recommend_majors, user_traits, major_data)
 
   
     formatted = []
@@ -205,14 +207,7 @@ async def genarate_question(request:QuestionGenerateRequest):
 #         "total_count": len(recommendations)
 #     }
 
-@router.get("/results/{result_id}")
-async def get_assessment_results(
-    result_id: int,
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
-):
-    """Get specific assessment results"""
-    user_id = current_user["user_id"]
+def _assessment_results(db: sqlite3.Connection, result_id: int, user_id: int):
     cursor = db.cursor()
     
     # Get assessment result
@@ -223,18 +218,17 @@ async def get_assessment_results(
         (result_id, user_id)
     )
     result = cursor.fetchone()
-    print(f"result:{result}")
     if not result:
-        raise HTTPException(status_code=404, detail="Assessment not found")
+        return None
     
-    # Get recommendations
+    # Get recommendations (stored per user, not per result)
     cursor.execute(
         """SELECT major_name, match_score, explanation, difficulty_level, career_paths,
                   estimated_cost, study_duration, roadmap
            FROM major_recommendations
            WHERE user_id = ?
            ORDER BY match_score DESC""",
-        (result_id,)
+        (user_id,)
     )
     recommendations = []
     for row in cursor.fetchall():
@@ -248,7 +242,7 @@ async def get_assessment_results(
             "study_duration": row[6],
             "roadmap": json.loads(row[7]) if row[7] else []
         })
-    print(f"recommandadtion list:{recommendations}")
+    logger.debug("recommendations for result %s: %s", result_id, recommendations)
     return {
         "result_id": result[0],
         "personality_type": result[1],
@@ -256,17 +250,24 @@ async def get_assessment_results(
         "strengths": json.loads(result[3]) if result[3] else [],
         "weaknesses": json.loads(result[4]) if result[4] else [],
        # "insights": result[5],
-        "completed_at": result[6],
+        "completed_at": result[5],
         "recommendations": recommendations
     }
 
-@router.get("/my-results")
-async def get_my_assessments(
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+
+@router.get("/results/{result_id}")
+async def get_assessment_results(
+    result_id: int,
+    current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all assessment results for current user"""
-    user_id = current_user["user_id"]
+    """Get specific assessment results"""
+    results = await db_pool().run(_assessment_results, result_id, current_user["user_id"])
+    if results is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    return results
+
+
+def _my_assessments(db: sqlite3.Connection, user_id: int):
     cursor = db.cursor()
     
     cursor.execute(
@@ -285,5 +286,13 @@ async def get_my_assessments(
             "personality_type": row[2],
             "completed_at": row[3]
         })
-    
+    return results
+
+
+@router.get("/my-results")
+async def get_my_assessments(
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get all assessment results for current user"""
+    results = await db_pool().run(_my_assessments, current_user["user_id"])
     return {"results": results, "total_count": len(results)}
@@ -1,21 +1,24 @@
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from models.user import (
-    OTPRequest, OTPVerify, UserRegister, UserLogin,
+    OTPRequest, OTPVerify, UserRegister, UserLogin, TokenRefresh,
     TokenResponse, UserWithProfile, StudentProfileCreate,StudentAcademicUpdate
 )
 from services import auth_service, otp_service, notification_service
 from sqlite import get_db
+from db_writer import db_writer
+from password_pool import password_pool, PasswordPoolBusy
 from middleware.auth_middleware import get_current_active_user
 import sqlite3
+from typing import Optional
 from logger import logger 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/send-otp", status_code=status.HTTP_200_OK)
-def send_otp(request: OTPRequest, db: sqlite3.Connection = Depends(get_db)):
+def send_otp(request: OTPRequest):
     """Send OTP to phone number"""
-    otp_code, success = otp_service.create_otp(db, request.phone)
+    otp_code, success = otp_service.create_otp(request.phone)
     
     if not success:
         raise HTTPException(
@@ -33,7 +36,7 @@ def send_otp(request: OTPRequest, db: sqlite3.Connection = Depends(get_db)):
 def verify_otp(request: OTPVerify, db: sqlite3.Connection = Depends(get_db)):
     """Verify OTP and login/register user"""
     # Verify OTP
-    is_valid = otp_service.verify_otp(db, request.phone, request.otp_code)
+    is_valid = db_writer().write(otp_service.verify_otp, request.phone, request.otp_code)
     
     if not is_valid:
         raise HTTPException(
@@ -46,7 +49,7 @@ def verify_otp(request: OTPVerify, db: sqlite3.Connection = Depends(get_db)):
     
     if not user:
         # Create new user
-        user_id = auth_service.create_user(db, request.phone, None, None, "phone")
+        user_id = db_writer().write(auth_service.create_user, request.phone, None, None, "phone")
         if not user_id:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -56,21 +59,49 @@ def verify_otp(request: OTPVerify, db: sqlite3.Connection = Depends(get_db)):
         user_id = user["id"]
     
     # Generate tokens
-    tokens = auth_service.create_tokens_for_user(user_id, None)
+    tokens = db_writer().write(auth_service.create_tokens_for_user, user_id, None)
     
     return TokenResponse(**tokens)
 
+def _create_profile_and_welcome(db: sqlite3.Connection, user_id: int, full_name: Optional[str]):
+    # Create profile if full_name provided
+    if full_name:
+        db.execute(
+            "INSERT INTO student_profiles (user_id, full_name) VALUES (?, ?)",
+            (user_id, full_name)
+        )
+    # Send welcome notification (commits both)
+    notification_service.create_notification(
+        db, user_id,
+        "Welcome to University Recommendation Platform!",
+        "Complete your profile and take the assessment to get personalized university recommendations.",
+        "success",
+        "/profile"
+    )
+
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, please retry",
+        headers={"Retry-After": "1"}
+    )
+
 @router.post("/register", response_model=TokenResponse)
-def register(request: UserRegister, db: sqlite3.Connection = Depends(get_db)):
+async def register(request: UserRegister):
     if request.auth_provider == "email" and (not request.email or not request.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email and password required for email registration"
         )
     
-    # Create user
-    user_id = auth_service.create_user(
-        db, request.phone, request.email, request.password, request.auth_provider, is_admin=request.is_admin
+    # Hash before queueing (bcrypt is too slow to run on the writer thread), on the bounded pool
+    try:
+        password_hash = await password_pool().hash_async(request.password) if request.password else None
+    except PasswordPoolBusy:
+        raise _hashing_busy()
+    user_id = await db_writer().run(
+        auth_service.create_user, request.phone, request.email, None, request.auth_provider,
+        is_admin=request.is_admin, password_hash=password_hash
     )
 
     
@@ -80,31 +111,15 @@ def register(request: UserRegister, db: sqlite3.Connection = Depends(get_db)):
             detail="User with this email or phone already exists"
         )
     
-    # Create profile if full_name provided
-    if request.full_name:
-        cursor = db.cursor()
-        cursor.execute(
-            "INSERT INTO student_profiles (user_id, full_name) VALUES (?, ?)",
-            (user_id, request.full_name)
-        )
-        db.commit()
-        cursor.close()
-    # Send welcome notification
-    notification_service.create_notification(
-        db, user_id,
-        "Welcome to University Recommendation Platform!",
-        "Complete your profile and take the assessment to get personalized university recommendations.",
-        "success",
-        "/profile"
-    )
+    await db_writer().run(_create_profile_and_welcome, user_id, request.full_name)
     
     # Generate tokens
-    tokens = auth_service.create_tokens_for_user(user_id, request.email)
+    tokens = await db_writer().run(auth_service.create_tokens_for_user, user_id, request.email)
     
     return TokenResponse(**tokens)
 
 @router.post("/login", response_model=TokenResponse)
-def login(request: UserLogin, db: sqlite3.Connection = Depends(get_db)):
+async def login(request: UserLogin):
     """Login with email/password"""
     if not request.email or not request.password:
         raise HTTPException(
@@ -112,7 +127,10 @@ def login(request: UserLogin, db: sqlite3.Connection = Depends(get_db)):
             detail="Email and password required"
         )
     
-    user = auth_service.authenticate_user(db, request.email, request.password)
+    try:
+        user = await auth_service.authenticate_user(request.email, request.password)
+    except PasswordPoolBusy:
+        raise _hashing_busy()
     
     if not user:
         raise HTTPException(
@@ -120,7 +138,21 @@ def login(request: UserLogin, db: sqlite3.Connection = Depends(get_db)):
             detail="Invalid email or password"
         )
     
-    tokens = auth_service.create_tokens_for_user(user["id"], user["email"])
+    tokens = await db_writer().run(auth_service.create_tokens_for_user, user["id"], user["email"])
+    
+    return TokenResponse(**tokens)
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(request: TokenRefresh):
+    """Exchange a refresh token for a new token pair (each refresh token works once)"""
+    tokens = db_writer().write(auth_service.rotate_refresh_token, request.refresh_token)
+    
+    if not tokens:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return TokenResponse(**tokens)
 
@@ -186,14 +218,7 @@ def get_current_user_info(
         "profile": profile_data
     }
 
-@router.post("/profile/create")
-def create_profile(
-    profile: StudentProfileCreate,
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
-):
-    """Create or update student profile"""
-    user_id = current_user["user_id"]
+def _save_profile(db: sqlite3.Connection, user_id: int, profile: StudentProfileCreate):
     cursor = db.cursor()
     
     # Check if profile exists
@@ -223,24 +248,31 @@ def create_profile(
         )
     
     db.commit()
+
+@router.post("/profile/create")
+def create_profile(
+    profile: StudentProfileCreate,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Create or update student profile"""
+    db_writer().write(_save_profile, current_user["user_id"], profile)
     
     return {"message": "Profile updated successfully"}
 
 @router.post("/logout")
 def logout(current_user: dict = Depends(get_current_active_user)):
-    """Logout user (client should discard tokens)"""
+    """Logout user: revokes the session's access and refresh tokens"""
+    db_writer().write(auth_service.revoke_current_session, current_user)
     return {"message": "Logged out successfully"}
 
 @router.post("/profile/academic")
 def update_academic_profile(
     profile: StudentAcademicUpdate,
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+    current_user: dict = Depends(get_current_active_user)
 ):
     user_id = current_user["user_id"]
-    cursor = db.cursor()
 
-    cursor.execute("""
+    db_writer().execute("""
         UPDATE student_profiles 
         SET gpa=?, budget=?, preferred_country=?, preferred_major=?, 
             learning_style=?, career_goal=?
@@ -255,5 +287,4 @@ def update_academic_profile(
         user_id
     ))
 
-    db.commit()
     return {"message": "Academic profile updated"}
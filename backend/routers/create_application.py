@@ -2,7 +2,6 @@ from fastapi import APIRouter
 from datetime import datetime
 from sqlite import get_db
 import logging
-logging.basicConfig(level=logging.INFO)
 logger=logging.getLogger(__name__)
 
 
@@ -32,4 +31,4 @@ def create_application(user_id:int,university_id:int,major_id:int):
             "status":"Draft"
         }
     except Exception as e:
-        print(e)
\ No newline at end of file
+        logger.error(f"Error creating application: {e}")
\ No newline at end of file
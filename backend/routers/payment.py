@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends, Form
 from typing import List, Optional, Dict
 from middleware.auth_middleware import get_current_active_user
 from sqlite import get_db
+from db_writer import db_writer
+from services.payment_rollups import adjust_rollup
 import sqlite3
 from datetime import datetime, timedelta
 import logging
@@ -29,39 +31,46 @@ def get_premium_features(db: sqlite3.Connection = Depends(get_db)):
         })
     return {"features": features}
 
+def _record_payment(db: sqlite3.Connection, user_id: int, feature_id: int, method: str, transaction_id: str):
+    """Write job: returns the feature name, or None if the feature doesn't exist"""
+    cursor = db.cursor()
+    
+    # Get feature details
+    cursor.execute("SELECT feature_name, price, duration_days FROM premium_features WHERE id = ?", (feature_id,))
+    feature = cursor.fetchone()
+    if not feature:
+        return None
+        
+    name, price, duration = feature
+    
+    # Create payment record
+    cursor.execute(
+        """INSERT INTO payments (user_id, feature_id, amount, payment_method, transaction_id, status, completed_at)
+        VALUES (?, ?, ?, ?, ?, 'Completed', CURRENT_TIMESTAMP)""",
+        (user_id, feature_id, price, method, transaction_id)
+    )
+    adjust_rollup(cursor, cursor.lastrowid, 1)
+    
+    # Activate premium status for user
+    # In a real app, you might have a user_features table. 
+    # For simplicity, we'll just update the is_premium flag in users table.
+    cursor.execute("UPDATE users SET is_premium = 1 WHERE id = ?", (user_id,))
+    
+    db.commit()
+    return name
+
 @router.post("/checkout")
 def create_payment(
     feature_id: int = Form(...),
     method: str = Form(...), # KNET, ApplePay, Card
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """Process a mock payment and activate the feature"""
     try:
-        cursor = db.cursor()
-        
-        # Get feature details
-        cursor.execute("SELECT feature_name, price, duration_days FROM premium_features WHERE id = ?", (feature_id,))
-        feature = cursor.fetchone()
-        if not feature:
-            raise HTTPException(status_code=404, detail="Feature not found")
-            
-        name, price, duration = feature
         transaction_id = str(uuid.uuid4())
-        
-        # Create payment record
-        cursor.execute(
-            """INSERT INTO payments (user_id, feature_id, amount, payment_method, transaction_id, status, completed_at)
-            VALUES (?, ?, ?, ?, ?, 'Completed', CURRENT_TIMESTAMP)""",
-            (current_user["user_id"], feature_id, price, method, transaction_id)
-        )
-        
-        # Activate premium status for user
-        # In a real app, you might have a user_features table. 
-        # For simplicity, we'll just update the is_premium flag in users table.
-        cursor.execute("UPDATE users SET is_premium = 1 WHERE id = ?", (current_user["user_id"],))
-        
-        db.commit()
+        name = db_writer().write(_record_payment, current_user["user_id"], feature_id, method, transaction_id)
+        if name is None:
+            raise HTTPException(status_code=404, detail="Feature not found")
         
         return {
             "success": True,
@@ -1,23 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Form, Request
 from typing import List, Optional
 from services.scholarship_service import ScholarshipService
 from middleware.auth_middleware import get_current_active_user
 from sqlite import get_db
+from db_writer import db_writer, execute_statement
+from services.catalog_cache import catalog_response, with_connection
 import sqlite3
 import os
 import shutil
+import asyncio
 from config import settings
 
 router = APIRouter(prefix="/api/scholarships", tags=["Scholarships"])
 
 @router.get("/")
 def list_scholarships(
+    request: Request,
     country: Optional[str] = Query(None),
-    min_amount: Optional[int] = Query(None),
-    db: sqlite3.Connection = Depends(get_db)
+    min_amount: Optional[int] = Query(None)
 ):
-    scholarships = ScholarshipService.get_all_scholarships(country, min_amount,db=db)
-    return {"scholarships": scholarships}
+    return catalog_response(
+        request,
+        ("scholarships.list", country, min_amount),
+        with_connection(lambda db: {"scholarships": ScholarshipService.get_all_scholarships(country, min_amount, db=db)})
+    )
 
 @router.get("/{scholarship_id}")
 def get_scholarship(scholarship_id: int,db: sqlite3.Connection = Depends(get_db)):
@@ -40,22 +46,27 @@ def check_eligibility(
 @router.post("/{scholarship_id}/apply")
 def apply_scholarship(
     scholarship_id: int,
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """Create a draft scholarship application"""
-    result = ScholarshipService.create_scholarship_application(current_user["user_id"], scholarship_id,db=db)
+    result = db_writer().write(lambda db: ScholarshipService.create_scholarship_application(
+        current_user["user_id"], scholarship_id, db=db
+    ))
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
+def _save_upload(source, file_path: str):
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+
 @router.post("/{application_id}/upload")
 async def upload_scholarship_doc(
     application_id: int,
     document_type: str = Form(...),
     file: UploadFile = File(...),
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """Upload documents for a scholarship application"""
     try:
@@ -64,16 +75,14 @@ async def upload_scholarship_doc(
         os.makedirs(upload_dir, exist_ok=True)
         
         file_path = os.path.join(upload_dir, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await asyncio.to_thread(_save_upload, file.file, file_path)
             
-        cursor = db.cursor()
-        cursor.execute(
+        await db_writer().run(
+            execute_statement,
             """INSERT INTO scholarship_documents (scholarship_app_id, document_type, file_path, file_name)
             VALUES (?, ?, ?, ?)""",
             (application_id, document_type, f"/static/storage/scholarship/{application_id}/{file.filename}", file.filename)
         )
-        db.commit()
         
         return {"success": True, "file_name": file.filename}
     except Exception as e:
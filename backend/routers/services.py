@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Form
+from fastapi import APIRouter, HTTPException, Depends, Query, Form, Request
 from typing import List, Optional, Dict
 from middleware.auth_middleware import get_current_active_user
 from sqlite import get_db
+from db_writer import db_writer
+from services.catalog_cache import catalog_response, with_connection
 import sqlite3
 import logging
 
@@ -11,10 +13,14 @@ router = APIRouter(prefix="/api/services", tags=["Student Services"])
 
 @router.get("/offers")
 def get_offers(
-    category: Optional[str] = Query(None),
-    db: sqlite3.Connection = Depends(get_db)
+    request: Request,
+    category: Optional[str] = Query(None)
 ):
     """Fetch all active partner offers"""
+    return catalog_response(request, ("services.offers", category), with_connection(lambda db: _list_offers(db, category)))
+
+
+def _list_offers(db: sqlite3.Connection, category: Optional[str]):
     cursor = db.cursor()
     query = """
         SELECT o.id, o.title, o.description, o.discount_percentage, o.image_url, 
@@ -45,6 +51,20 @@ def get_offers(
         })
     return {"offers": offers}
 
+def _insert_lead(db, user_id: int, offer_id: int, student_name: str, student_email: str,
+                 student_phone: str, message: Optional[str]) -> bool:
+    """Write job: record the lead against the offer's partner; False if the offer is gone"""
+    partner_result = db.execute("SELECT partner_id FROM service_offers WHERE id = ?", (offer_id,)).fetchone()
+    if not partner_result:
+        return False
+    db.execute(
+        """INSERT INTO service_leads (user_id, partner_id, offer_id, student_name, student_email, student_phone, message)
+        VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (user_id, partner_result[0], offer_id, student_name, student_email, student_phone, message)
+    )
+    db.commit()
+    return True
+
 @router.post("/lead")
 def create_lead(
     offer_id: int = Form(...),
@@ -52,31 +72,21 @@ def create_lead(
     student_email: str = Form(...),
     student_phone: str = Form(...),
     message: Optional[str] = Form(None),
-    current_user: dict = Depends(get_current_active_user),
-    db: sqlite3.Connection = Depends(get_db)
+    current_user: dict = Depends(get_current_active_user)
 ):
     """Capture a student lead for a partner offer"""
     try:
-        cursor = db.cursor()
-        
-        # Get partner_id from offer
-        cursor.execute("SELECT partner_id FROM service_offers WHERE id = ?", (offer_id,))
-        partner_result = cursor.fetchone()
-        if not partner_result:
-            raise HTTPException(status_code=404, detail="Offer not found")
-        partner_id = partner_result[0]
-        
-        cursor.execute(
-            """INSERT INTO service_leads (user_id, partner_id, offer_id, student_name, student_email, student_phone, message)
-            VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (current_user["user_id"], partner_id, offer_id, student_name, student_email, student_phone, message)
+        created = db_writer().write(
+            _insert_lead, current_user["user_id"], offer_id,
+            student_name, student_email, student_phone, message
         )
-        db.commit()
-        
-        return {"success": True, "message": "Your interest has been shared with our partner!"}
     except Exception as e:
         logger.error(f"Error creating lead: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    if not created:
+        raise HTTPException(status_code=404, detail="Offer not found")
+
+    return {"success": True, "message": "Your interest has been shared with our partner!"}
 
 @router.get("/my-leads")
 def get_my_leads(
@@ -1,5 +1,7 @@
 from fastapi import APIRouter
 from sqlite import get_db
+import logging
+logger=logging.getLogger(__name__)
 
 
 router=APIRouter(prefix="/submit")
@@ -12,7 +14,7 @@ def submit_application(application_id:int):
     cursor.execute("""
 UPDATE applications
 SET status="Submitted",last_updated=CURRENT_TIMESTAMP WHERE id=? """,(application_id,))
-    print("application submitted sucessfully")
+    logger.info("application %s submitted", application_id)
     conn.commit()
     conn.close()
 
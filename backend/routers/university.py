@@ -1,100 +1,65 @@
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from models.university import (
-    UniversitySearchFilter, UniversitySearchResponse, UniversityBasic,
+    UniversitySearchFilter, UniversitySearchResponse,
     UniversityRecommendationRequest, UniversityRecommendation, RecommendationResponse,
-    ComparisonRequest
+    ComparisonRequest, UniversityBatchRequest
 )
 from services import ai_service
+from services.scoring_service import get_scoring_engine
+from services.query_builders import university_search_count_query, university_search_query, university_media_query
+from services.catalog_cache import catalog_response
+from services.catalog_snapshot import CatalogSnapshot, University as SnapshotUniversity, get_catalog_snapshot
 from middleware.auth_middleware import get_current_active_user, get_optional_user
 from sqlite import get_db
+from utils.responses import FastJSONResponse
 import sqlite3
-from typing import List, Optional
+from typing import Dict, List, Optional
 import logging
-logging.basicConfig(level=logging.INFO)
 logger=logging.getLogger(__name__)
 
 
 router = APIRouter(prefix="/api/universities", tags=["Universities"])
 
 @router.get("/list")
-def list_universities(db: sqlite3.Connection = Depends(get_db)):
+def list_universities(request: Request):
+    """All active universities; served from the catalog cache with an ETag"""
+    return catalog_response(request, ("universities.list",), _list_universities)
 
-    cursor = db.cursor()
-    
-    cursor.execute("""
-        SELECT id, name, country, city, tuition_fee, min_gpa, scholarship_available, ranking
-        FROM universities 
-        WHERE is_active = 1
-    """)
-    
+
+def _list_universities():
     universities = []
-    seen_ids=set()
-    for row in cursor.fetchall():
-        if row[0] not in seen_ids:
-            seen_ids.add(row[0])
-            print(f"unique rows only:{seen_ids}")
-            universities.append({
-                "id": row[0],
-                "name": row[1],
-                "country": row[2],
-                "city": row[3],
-                "tuition_fee": row[4],
-                "min_gpa": row[5],
-                "scholarship_available": bool(row[6]),
-                "ranking": row[7]
-            })
-    logger.info("Fetched active universities", len(universities))
+    for uni in get_catalog_snapshot().active:
+        universities.append({
+            "id": uni.id,
+            "name": uni.name,
+            "country": uni.country,
+            "city": uni.city,
+            "tuition_fee": uni.tuition_fee,
+            "min_gpa": uni.min_gpa,
+            "scholarship_available": bool(uni.scholarship_available),
+            "ranking": uni.ranking
+        })
+    logger.debug("fetched %d active universities", len(universities))
     return {"universities": universities}
 
 @router.get("/{university_id}/majors")
-def get_university_majors(
-    university_id: int,
-    db: sqlite3.Connection = Depends(get_db)
-):
+def get_university_majors(university_id: int):
     """Get all majors offered by a specific university"""
-    cursor = db.cursor()
-    
-    # First check if university exists
-    cursor.execute("SELECT id FROM universities WHERE id = ? AND is_active = 1", (university_id,))
-    if not cursor.fetchone():
+    snapshot = get_catalog_snapshot()
+    if snapshot.get(university_id) is None:
         raise HTTPException(status_code=404, detail="University not found")
     
-    # Get majors from university_majors table
-    cursor.execute("""
-        SELECT id, major_name
-        FROM university_majors
-        WHERE university_id = ?
-        ORDER BY major_name ASC
-    """, (university_id,))
-
-
-    
+    # (university_id, major_name) is unique, so every row is a distinct major
     majors = []
-    seen = set()   # track unique majors
-
-    for row in cursor.fetchall():
-        major_id = row[0]
-        major_name = row[1]
-
-        if major_name not in seen:   # ensure uniqueness
-            seen.add(major_name)
-            majors.append({
-                "id": row[0],
-                "major_id": row[0],
-                "major_name": major_name,
-                "name": major_name
-            })
-    # majors = []
-    # for row in cursor.fetchall():
-    #     majors.append({
-    #         "id": row[0],
-    #         "major_id": row[0],
-    #         "name": row[1],
-    #         "major_name": row[1]
-    #     })
-    print(f"reterived major from university id :{majors}")
-    # logger.info("university major for university",len(majors),majors)
+    for um in snapshot.majors_of.get(university_id, ()):
+        majors.append({
+            "id": um.id,
+            "major_id": um.id,
+            "major_name": um.major_name,
+            "name": um.major_name
+        })
+    logger.debug("retrieved %d majors for university %s", len(majors), university_id)
     return {"majors": majors}
 
 @router.get("/search", response_model=UniversitySearchResponse)
@@ -113,97 +78,123 @@ def search_universities(
     db: sqlite3.Connection = Depends(get_db),
     current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """Advanced university search with filters"""
+    """
+    Advanced university search with filters. Rows go straight into the
+    encoded body; response_model only documents the shape.
+    """
     cursor = db.cursor()
     
-    # Build query
-    query = "SELECT DISTINCT u.id, u.name, u.country, u.city, u.tuition_fee, u.min_gpa, u.scholarship_available, u.ranking FROM universities u"
-    where_clauses = ["u.is_active = 1"]
-    params = []
-    
-    if major:
-        query += " JOIN university_majors um ON u.id = um.university_id JOIN majors m ON um.major_id = m.id"
-        where_clauses.append("m.name LIKE ?")
-        params.append(f"%{major}%")
-    
-    if country:
-        where_clauses.append("u.country = ?")
-        params.append(country)
-    
-    if min_tuition is not None:
-        where_clauses.append("u.tuition_fee >= ?")
-        params.append(min_tuition)
-    
-    if max_tuition is not None:
-        where_clauses.append("u.tuition_fee <= ?")
-        params.append(max_tuition)
-    
-    if min_gpa is not None:
-        where_clauses.append("u.min_gpa >= ?")
-        params.append(min_gpa)
-    
-    if max_gpa is not None:
-        where_clauses.append("u.min_gpa <= ?")
-        params.append(max_gpa)
-    
-    if language:
-        where_clauses.append("u.language LIKE ?")
-        params.append(f"%{language}%")
-    
-    if scholarship_track is True:
-        where_clauses.append("u.scholarship_available = 1")
-    
-    if search_query:
-        where_clauses.append("(u.name LIKE ? OR u.country LIKE ? OR u.city LIKE ?)")
-        params.extend([f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"])
-    
-    if where_clauses:
-        query += " WHERE " + " AND ".join(where_clauses)
+    filters = dict(
+        major=major, country=country,
+        min_tuition=min_tuition, max_tuition=max_tuition,
+        min_gpa=min_gpa, max_gpa=max_gpa,
+        language=language, scholarship_track=scholarship_track,
+        search_query=search_query
+    )
     
     # Count total
-    count_query = query.replace(
-        "SELECT DISTINCT u.id, u.name, u.country, u.city, u.tuition_fee, u.min_gpa, u.scholarship_available, u.ranking",
-        "SELECT COUNT(DISTINCT u.id)"
-    )
-    cursor.execute(count_query, params)
+    cursor.execute(*university_search_count_query(**filters))
     total_count = cursor.fetchone()[0]
     
-    # Add pagination
-    offset = (page - 1) * page_size
-    query += " ORDER BY u.ranking ASC, u.name ASC LIMIT ? OFFSET ?"
-    params.extend([page_size, offset])
-    
-    cursor.execute(query, params)
+    cursor.execute(*university_search_query(page=page, page_size=page_size, **filters))
     universities = []
     
     for row in cursor.fetchall():
-        universities.append(UniversityBasic(
-            id=row[0],
-            name=row[1],
-            country=row[2],
-            city=row[3],
-            tuition_fee=row[4],
-            min_gpa=row[5],
-            scholarship_available=bool(row[6]),
-            ranking=row[7]
-        ))
+        universities.append({
+            "id": row[0],
+            "name": row[1],
+            "country": row[2],
+            "city": row[3],
+            "tuition_fee": row[4],
+            "min_gpa": row[5],
+            "scholarship_available": bool(row[6]),
+            "ranking": row[7]
+        })
     
     total_pages = (total_count + page_size - 1) // page_size
     
-    return UniversitySearchResponse(
-        universities=universities,
-        total_count=total_count,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages,
-        filters_applied={
+    return FastJSONResponse({
+        "universities": universities,
+        "total_count": total_count,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "filters_applied": {
             "country": country,
             "major": major,
             "scholarship_track": scholarship_track
         }
-    )
+    })
+
+
+
+
+def _media_by_university(db: sqlite3.Connection, university_ids: List[int]) -> Dict[int, List[dict]]:
+    """Media for many universities with a single IN query"""
+    media: Dict[int, List[dict]] = {uid: [] for uid in university_ids}
+    if not university_ids:
+        return media
+    cursor = db.cursor()
+    cursor.execute(*university_media_query(university_ids))
+    for r in cursor.fetchall():
+        media[r[0]].append({"id": r[1], "media_type": r[2], "media_url": r[3], "caption": r[4]})
+    return media
 
 
+def _university_detail(uni: SnapshotUniversity, snapshot: CatalogSnapshot, media: Optional[List[dict]]) -> dict:
+    majors = []
+    for um in snapshot.majors_of.get(uni.id, ()):
+        # Category, difficulty etc. live in the majors table, matched by name
+        major = snapshot.catalog_major(um.major_name)
+        majors.append({
+            "id": um.id,
+            "name": um.major_name,
+            "category": major.category if major else None,
+            "difficulty": major.difficulty if major else None,
+            "career_paths": major.career_paths if major else None,
+            "average_cost": major.average_cost if major else None
+        })
+
+    detail = {
+        "id": uni.id,
+        "name": uni.name,
+        "country": uni.country,
+        "city": uni.city,
+        "tuition_fee": uni.tuition_fee,
+        "min_gpa": uni.min_gpa,
+        "language": uni.language,
+        "scholarship_available": bool(uni.scholarship_available),
+        "overview": uni.overview,
+        "duration": uni.duration,
+        "accommodation_info": uni.accommodation_info,
+        "website": uni.website,
+        "ranking": uni.ranking,
+        "acceptance_rate": uni.acceptance_rate,
+        "majors": majors
+    }
+    if media is not None:
+        detail["media"] = media
+    return detail
+
+
+@router.post("/batch")
+def get_universities_batch(
+    request: UniversityBatchRequest,
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Details, majors and (optionally) media for up to 50 universities in one round trip"""
+    snapshot = get_catalog_snapshot()
+    universities, missing = snapshot.get_many(request.university_ids)
+    ids = [uni.id for uni in universities]
+    media = _media_by_university(db, ids) if request.include_media else {}
+
+    return {
+        "universities": [
+            _university_detail(uni, snapshot, media.get(uni.id) if request.include_media else None)
+            for uni in universities
+        ],
+        "missing": missing
+    }
 
 
 @router.get("/{university_id}")
@@ -212,148 +203,66 @@ def get_university_detail(
     db: sqlite3.Connection = Depends(get_db)
 ):
     """Get detailed university information"""
-    cursor = db.cursor()
-    
-    cursor.execute(
-        """SELECT id, name, country, city, tuition_fee, min_gpa, language, scholarship_available,
-                  overview, duration, accommodation_info, website, ranking, acceptance_rate
-           FROM universities WHERE id = ? AND is_active = 1""",
-        (university_id,)
-    )
-    uni = cursor.fetchone()
-    
+    snapshot = get_catalog_snapshot()
+    uni = snapshot.get(university_id)
     if not uni:
         raise HTTPException(status_code=404, detail="University not found")
     
-    # Get media
-    cursor.execute(
-        "SELECT id, media_type, media_url, caption FROM university_media WHERE university_id = ? ORDER BY display_order",
-        (university_id,)
-    )
-    media = [{"id": r[0], "media_type": r[1], "media_url": r[2], "caption": r[3]} for r in cursor.fetchall()]
-    print(f"media :{media}")
-    # Get majors
-    cursor.execute(
-        """SELECT m.id, m.name, m.category, m.difficulty, m.career_paths, m.average_cost
-           FROM majors m
-           JOIN university_majors um ON m.id = um.major_id
-           WHERE um.university_id = ?""",
-        (university_id,)
+    media = _media_by_university(db, [university_id])
+    return _university_detail(uni, snapshot, media[university_id])
+
+@router.post("/recommend", response_model=RecommendationResponse)
+def get_recommendations(
+    request: UniversityRecommendationRequest,
+    current_user: dict = Depends(get_current_active_user),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Get AI-based university recommendations (top-k from the cached score ranking)"""
+    recommendations = get_scoring_engine().recommend(
+        db,
+        user_id=int(current_user["user_id"]),
+        preferred_major=request.preferred_major,
+        max_results=request.max_results
     )
-    majors = [{"id": r[0], "name": r[1], "category": r[2], "difficulty": r[3], 
-               "career_paths": r[4], "average_cost": r[5]} for r in cursor.fetchall()]
     
-    return {
-        "id": uni[0],
-        "name": uni[1],
-        "country": uni[2],
-        "city": uni[3],
-        "tuition_fee": uni[4],
-        "min_gpa": uni[5],
-        "language": uni[6],
-        "scholarship_available": bool(uni[7]),
-        "overview": uni[8],
-        "duration": uni[9],
-        "accommodation_info": uni[10],
-        "website": uni[11],
-        "ranking": uni[12],
-        "acceptance_rate": uni[13],
-        "media": media,
-        "majors": majors
-    }
+    return RecommendationResponse(
+        recommendations=recommendations,
+        criteria_used={
+            "gpa": True,
+            "budget": True,
+            "scholarship": True,
+            "assessment": False,
+            "country_preference": True
+        }
+    )
+
+COMPARE_FIELDS = (
+    "country", "tuition_fee", "min_gpa", "scholarship_available",
+    "ranking", "acceptance_rate", "duration"
+)
 
-# @router.post("/recommend", response_model=RecommendationResponse)
-# def get_recommendations(
-#     request: UniversityRecommendationRequest,
-#     current_user: dict = Depends(get_current_active_user),
-#     db: sqlite3.Connection = Depends(get_db)
-# ):
-#     """Get AI-based university recommendations"""
-#     user_id = current_user["user_id"]
-    
-#     # Get assessment results
-#     cursor = db.cursor()
-#     cursor.execute(
-#         """SELECT personality_type, scores, strengths
-#            FROM assessment_results
-#            WHERE user_id = ?
-#            ORDER BY completed_at DESC
-#            LIMIT 1""",
-#         (user_id,)
-#     )
-#     assessment = cursor.fetchone()
-    
-#     assessment_results = {}
-#     if assessment:
-#         import json
-#         assessment_results = {
-#             "personality_type": assessment[0],
-#             "scores": json.loads(assessment[1]) if assessment[1] else {},
-#             "strengths": json.loads(assessment[2]) if assessment[2] else []
-#         }
-    
-#     # Get recommendations
-#     recommendations = ai_service.recommend_universities(
-#         user_id=user_id,
-#         preferred_major=request.preferred_major or "",
-#         assessment_results=assessment_results,
-#         max_results=request.max_results
-#     )
-    
-#     return RecommendationResponse(
-#         recommendations=recommendations,
-#         criteria_used={
-#             "gpa": True,
-#             "budget": True,
-#             "scholarship": True,
-#             "assessment": bool(assessment),
-#             "country_preference": True
-#         }
-#     )
 
 @router.post("/compare")
-def compare_universities(
-    request: ComparisonRequest,
-    db: sqlite3.Connection = Depends(get_db)
-):
-    """Compare 2-3 universities"""
-    if len(request.university_ids) < 2 or len(request.university_ids) > 3:
-        raise HTTPException(status_code=400, detail="Please select 2 or 3 universities to compare")
+def compare_universities(request: ComparisonRequest):
+    """Compare 2-10 universities; one column of values per criterion"""
+    snapshot = get_catalog_snapshot()
+    universities, missing = snapshot.get_many(request.university_ids, active_only=False)
     
-    cursor = db.cursor()
-    universities = []
-    
-    for uni_id in request.university_ids:
-        cursor.execute(
-            """SELECT id, name, country, tuition_fee, min_gpa, scholarship_available,
-                      ranking, acceptance_rate, duration
-               FROM universities WHERE id = ?""",
-            (uni_id,)
-        )
-        uni = cursor.fetchone()
-        if uni:
-            universities.append({
-                "id": uni[0],
-                "name": uni[1],
-                "country": uni[2],
-                "tuition_fee": uni[3],
-                "min_gpa": uni[4],
-                "scholarship_available": bool(uni[5]),
-                "ranking": uni[6],
-                "acceptance_rate": uni[7],
-                "duration": uni[8]
-            })
+    columns = {field: [getattr(uni, field) for uni in universities] for field in COMPARE_FIELDS}
+    columns["scholarship_available"] = [bool(v) for v in columns["scholarship_available"]]
     
     # Create comparison table
     comparison_table = {
-        "Tuition Fee": [u["tuition_fee"] for u in universities],
-        "Min GPA": [u["min_gpa"] for u in universities],
-        "Scholarship": [u["scholarship_available"] for u in universities],
-        "Ranking": [u["ranking"] for u in universities],
-        "Acceptance Rate": [u["acceptance_rate"] for u in universities]
+        "Tuition Fee": columns["tuition_fee"],
+        "Min GPA": columns["min_gpa"],
+        "Scholarship": columns["scholarship_available"],
+        "Ranking": columns["ranking"],
+        "Acceptance Rate": columns["acceptance_rate"]
     }
     
     return {
-        "universities": universities,
-        "comparison_table": comparison_table
+        "universities": [{"id": uni.id, "name": uni.name} for uni in universities],
+        "columns": columns,
+        "comparison_table": comparison_table,
+        "missing": missing
     }
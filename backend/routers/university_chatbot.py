@@ -1,14 +1,17 @@
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from services.university_rag_service import detect_intent, get_rag_service, normalize
 from middleware.auth_middleware import get_current_active_user, get_optional_user
+from services.catalog_cache import catalog_response
+from services.facet_service import get_facet_service
+from utils.responses import FastJSONResponse
 import sqlite3
 import uuid
+import asyncio
 from datetime import datetime
 import logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chatbot/university", tags=["University Chatbot"])
@@ -43,7 +46,7 @@ async def chat_with_bot(
    
     try:
         session_id = request.session_id or str(uuid.uuid4())
-        print(f"session_id:{session_id}")
+        logger.debug("session_id: %s", session_id)
         
         if session_id not in chat_sessions:
             chat_sessions[session_id] = {
@@ -54,13 +57,12 @@ async def chat_with_bot(
         
        
         rag_service = get_rag_service()
-        print(f"rag servicee is being called")
         
        
         filters = request.filters or {}
         
         intent=detect_intent(request.message)
-        print(intent)
+        logger.debug("intent: %s", intent)
         if intent:
             ai_response=(
                 "Hello! I can help you find universities based on your GPA, "
@@ -87,20 +89,23 @@ async def chat_with_bot(
 
             
         normalize_query=normalize(request.message)
-        print(f"normalize query:{normalize_query}")
+        logger.debug("normalized query: %s", normalize_query)
         
-        universities = rag_service.search_universities(
+        # Chroma and the LLM are blocking clients; run them off the event loop
+        universities = await asyncio.to_thread(
+            rag_service.search_universities,
             query=normalize_query,
             filters=filters,
             n_results=2
         )
-        print(f"universities :{universities}")
+        logger.debug("retrieved universities: %s", universities)
         
        
         conversation_history = chat_sessions[session_id]["messages"]
         
        
-        ai_response = rag_service.generate_response(
+        ai_response = await asyncio.to_thread(
+            rag_service.generate_response,
             user_message=normalize_query,
             context_universities=universities,
             conversation_history=conversation_history
@@ -144,14 +149,31 @@ async def compare_universities(request: ComparisonRequest):
 
 
 @router.get("/filters")
-async def get_filter_options():
+def get_filter_options(request: Request):
+    """Filter option lists and ranges, plus unfiltered facet counts"""
     try:
-        rag_service = get_rag_service()
-        print(F"rag_service callled:{rag_service}")
-        return rag_service.get_filter_options()
+        return catalog_response(request, ("chatbot.filters",), get_facet_service().filter_options)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching filters: {str(e)}")
+
+
+@router.get("/facets")
+def get_facet_counts(
+    country: Optional[str] = Query(None),
+    major: Optional[str] = Query(None),
+    max_tuition: Optional[float] = Query(None),
+    min_gpa: Optional[float] = Query(None),
+    scholarship_track: Optional[bool] = Query(None)
+):
+    """Facet counts for the current filter selection (each facet ignores its own filter)"""
+    try:
+        return get_facet_service().counts(dict(
+            country=country, major=major, max_tuition=max_tuition,
+            min_gpa=min_gpa, scholarship_track=scholarship_track
+        ))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching facets: {str(e)}")
     
 
 @router.post("/query", response_model=ChatResponse)
@@ -162,7 +184,7 @@ async def query_universities(
     
     try:
         session_id = request.session_id or str(uuid.uuid4())
-        print(f"session_id:{session_id}")
+        logger.debug("session_id: %s", session_id)
         if session_id not in chat_sessions:
             chat_sessions[session_id] = {
                 "messages": [],
@@ -173,7 +195,7 @@ async def query_universities(
         rag_service = get_rag_service()
         filters = request.filters or {}
         intent=detect_intent(request.message)
-        print(intent)
+        logger.debug("intent: %s", intent)
         if intent:
             ai_response=(
                 "Hello! I can help you find universities based on your GPA, "
@@ -201,11 +223,10 @@ async def query_universities(
 
         normalize_query = normalize(request.message)
         conversation_history = chat_sessions[session_id]["messages"]
-        print(f"conversation_his")
 
         
         # Process filtered query
-        result = rag_service.query_with_filters(normalize_query, filters, conversation_history)
+        result = await asyncio.to_thread(rag_service.query_with_filters, normalize_query, filters, conversation_history)
         
         # Update session
         chat_sessions[session_id]["messages"].append({
@@ -226,8 +247,7 @@ async def query_universities(
             session_id=session_id
         )
     except Exception as e:
-        import traceback
-        print(f"Error in query_universities: {traceback.format_exc()}")
+        logger.exception("Error in query_universities")
         raise HTTPException(status_code=500, detail=str(e))
     
 
@@ -252,7 +272,8 @@ async def get_session(session_id: str):
     if session_id not in chat_sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return chat_sessions[session_id]
+    # Plain dicts/strings/datetimes: encode directly instead of walking them with jsonable_encoder
+    return FastJSONResponse(chat_sessions[session_id])
 
 
 @router.delete("/session/{session_id}")
@@ -274,7 +295,7 @@ async def reingest_universities():
             name=rag_service.collection_name,
             metadata={"description": "University information for RAG"}
         )
-        rag_service._ingest_universities()
+        await asyncio.to_thread(rag_service._ingest_universities)
         
         return {"message": "Universities re-ingested successfully"}
     
@@ -6,7 +6,6 @@ from sqlite import get_db
 from datetime import datetime
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger=logging.getLogger(__name__)
 router = APIRouter(prefix="/upload")
 
@@ -24,14 +23,12 @@ router = APIRouter(prefix="/upload")
 @router.post("/pdf-upload")
 def upload(application_id:int, document_type:str,file: UploadFile=File(...)):
     file_path=os.path.join(settings.UPLOAD_DIR, file.filename)
-    print(f"file_path:{file_path}")
+    logger.debug("file_path: %s", file_path)
     with open(file_path,"wb") as f:
         shutil.copyfileobj(file.file,f)
-    print("execute")
     try:
         conn=get_db()
         cursor=conn.cursor()
-        print(cursor)
         cursor.execute("""
     INSERT INTO application_documents(application_id,document_type,file_path,file_name)
     VALUES(?,?,?,?)
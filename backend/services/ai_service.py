@@ -12,14 +12,18 @@ from fastapi.responses import HTMLResponse,FileResponse
 import uvicorn
 from fastapi import Depends
 from contextlib import contextmanager
+from services.scoring_service import get_scoring_engine
+from sqlite import connect
+from utils import metrics
 
 
 app=FastAPI()
+logger = logging.getLogger(__name__)
 
 #defining the get_db_function
 @contextmanager
 def get_db_connection():
-    conn=sqlite3.connect("University.db",check_same_thread=False,timeout=10.0)
+    conn=connect(settings.DATABASE_NAME,check_same_thread=False,timeout=10.0)
     conn.row_factory=sqlite3.Row
     try:
         yield conn
@@ -41,8 +45,8 @@ def get_ollama_model():
         )
         return model
     except Exception as e:
-        print(f"  Error initializing Ollama: {e}")
-        print(f"Make sure Ollama is running and model '{settings.OLLAMA_MODEL}' is pulled")
+        logger.error("Error initializing Ollama: %s. Make sure Ollama is running and model '%s' is pulled",
+                     e, settings.OLLAMA_MODEL)
         return None
 
 @app.post("/evaluate")
@@ -58,7 +62,6 @@ def evaluate_assessment(test_type: str, answers: List[Dict]) -> Dict[str, Any]:
         
         return fallback_assessment_evaluation(test_type, answers)
     
-    print(f"prompt is getting called using ollama model")
     prompt = f"""You are an expert educational Expert evaluating a student's {test_type} assessment.
 
 The student has completed the following questions and answers:
@@ -92,19 +95,15 @@ Respond in JSON format:
         ]
         
        
-        response = model.invoke(messages)
-        response1=model.stream(response)
-        for response in response1:
-            print("response generated by streaming the output",response)
-       
+        with metrics.timed("llm"):
+            response = model.invoke(messages)
 
-        print(f"response of the model:{response}")
+        logger.debug("assessment evaluation response: %s", response)
         result = json.loads(response.content)
-        print(f"result of the model after loading into json object")
         return result
         
     except Exception as e:
-        print(f"Error in AI evaluation: {e}")
+        logger.error("Error in AI evaluation: %s", e)
         return fallback_assessment_evaluation(test_type, answers)
 
 @app.get("/recommander",response_model=None)
@@ -113,7 +112,6 @@ def recommend_majors(user_id: int, db: sqlite3.Connection=Depends(get_db_connect
     Recommend 3-7 majors based on assessment results, GPA, and preferences
     """
     model = get_ollama_model()
-    print(f"ollama model is being callled for the recommander_majors")
     # Get user profile
     cursor = db.cursor()
     cursor.execute(
@@ -122,7 +120,7 @@ def recommend_majors(user_id: int, db: sqlite3.Connection=Depends(get_db_connect
         (user_id,)
     )
     profile = cursor.fetchone()
-    print(f"profile:{profile}")
+    logger.debug("profile for user %s: %s", user_id, profile)
     if not profile:
         return []
     
@@ -183,13 +181,14 @@ Respond in JSON format:
             HumanMessage(content=prompt)
         ]
         
-        response = model.invoke(messages)
-        print(f"response generated from the model:{response}")
+        with metrics.timed("llm"):
+            response = model.invoke(messages)
+        logger.debug("major recommendation response: %s", response)
         result = json.loads(response.content)
         return result.get("recommendations", [])
         
     except Exception as e:
-        print(f"Error in AI major recommendation: {e}")
+        logger.error("Error in AI major recommendation: %s", e)
         return fallback_major_recommendations(majors, assessment_results, gpa, preferred_major)
 
 @app.get("/university",response_model=None)
@@ -199,109 +198,17 @@ def recommend_universities(
     assessment_results: str="{}",
     max_results: int = 10,
 ) -> List[Dict]:
-    with sqlite3.connect("University.db", check_same_thread=False,timeout=10.0) as db:
-        db.row_factory=sqlite3.Row
-        cursor = db.cursor()
-        print(f"cursor:{cursor}")
-    
-        # Get user profile
-        cursor.execute(
-            """SELECT gpa, budget, preferred_country FROM student_profiles WHERE user_id = ?""",
-            (user_id,)
-        )
-        profile = cursor.fetchone()
-        print(f"profile data is fetch sucessfully")
-        if not profile:
-            return []
-        
-        gpa, budget, preferred_country = profile
-        
-        # Get universities offering the preferred major
-        cursor.execute(
-            """SELECT DISTINCT u.id, u.name, u.country, u.tuition_fee, u.min_gpa, 
-                    u.scholarship_available, u.success_weight, u.acceptance_rate
-            FROM universities u
-            JOIN university_majors um ON u.id = um.university_id
-            JOIN majors m ON um.major_id = m.id
-            WHERE m.name LIKE ? AND u.is_active = 1
-            ORDER BY u.success_weight DESC""",
-            (f"%{preferred_major}%",)
-        )
-        universities = cursor.fetchall()
+    """Top-k university recommendations served from the vectorized scoring engine's cache"""
+    if preferred_major == "{}":
+        preferred_major = None
+    with get_db_connection() as db:
         logging.info("university recommander function is getting called")
-        # Calculate recommendation scores
-        recommendations = []
-        
-        for uni in universities:
-            print(f"univerisity:",uni)
-            uni_id, name, country, tuition, min_gpa, has_scholarship, success_weight, acceptance_rate = uni
-            
-            # Calculate match score
-            score = 0.0
-            reasons = []
-            pros = []
-            cons = []
-            
-            # GPA match (30%)
-            if gpa <= min_gpa:
-                gpa_score = min(1.0, (gpa - min_gpa) / (4.0 - min_gpa)) if min_gpa < 4.0 else 1.0
-                score += gpa_score * 0.3
-                if gpa >= min_gpa + 0.3:
-                    pros.append(f"Your GPA ({gpa}) exceeds requirements ({min_gpa})")
-                    reasons.append("Strong academic match based on GPA")
-            else:
-                cons.append(f"GPA requirement ({min_gpa}) is higher than yours ({gpa})")
-                continue  # Skip if GPA doesn't meet minimum
-            
-            # Budget match (25%)
-            if tuition <= budget:
-                budget_score = 1.0 - (tuition / budget) * 0.5
-                score += budget_score * 0.25
-                pros.append(f"Tuition (${tuition}) is within your budget (${budget})")
-                reasons.append("Affordable tuition within budget")
-            else:
-                if has_scholarship:
-                    score += 0.15  # Partial credit if scholarships available
-                    pros.append("Scholarship opportunities available")
-                    cons.append(f"Tuition (${tuition}) exceeds budget, but scholarships may help")
-                else:
-                    cons.append(f"Tuition (${tuition}) exceeds budget (${budget})")
-            
-            # Scholarship availability (20%)
-            if has_scholarship:
-                score += 0.2
-                reasons.append("Scholarship opportunities available")
-            
-            # Country preference (10%)
-            if preferred_country and country.lower() == preferred_country.lower():
-                score += 0.1
-                reasons.append(f"Located in your preferred country ({country})")
-                pros.append(f"Located in {country} as preferred")
-            
-            # Success weight (15%)
-            score += (success_weight - 1.0) * 0.15
-            if success_weight > 1.1:
-                reasons.append("Strong success history with past students")
-                pros.append("High success rate with previous applicants")
-            
-            if score > 0.3:  # Only recommend if score is reasonable
-                recommendations.append({
-                    "id": uni_id,
-                    "name": name,
-                    "country": country,
-                    "tuition_fee": tuition,
-                    "min_gpa": min_gpa,
-                    "scholarship_available": bool(has_scholarship),
-                    "recommendation_score": round(score, 2),
-                    "reasons": reasons,
-                    "pros": pros,
-                    "cons": cons
-                })
-
-        
-    # Sort by score and return top N
-    recommendations.sort(key=lambda x: x["recommendation_score"], reverse=True)
-    return recommendations[:max_results]
+        return get_scoring_engine().recommend(
+            db,
+            user_id=user_id,
+            preferred_major=preferred_major,
+            max_results=max_results
+        )
 
 # Fallback functions when Ollama is not available
 logging.warning("fallback mechanism is being called when there is no model available")
@@ -361,7 +268,6 @@ def fallback_major_recommendations(majors, assessment_results, gpa, preferred_ma
                 "Work on capstone project or thesis"
             ]
         })
-    print(f"fallback major recommandation function is being called")
     return recommendations
 
 logging.info("sucessfully executed the endpoints")
@@ -1,5 +1,5 @@
 
-from sqlite import get_db
+from sqlite import get_db, has_archive
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 import logging
@@ -7,7 +7,7 @@ import sqlite3
 from sqlite import get_db
 from fastapi import Depends
 from services.notification_service import NotificationService
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from services.archive_service import restore_rows
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +27,7 @@ class ApplicationService:
             """, (user_id, university_id, major_id))
             
             existing = cursor.fetchone()
-            print(f"existing application check:{existing}")
+            logger.debug("existing application check: %s", existing)
             if existing:
                 app_id, status = existing
                 if status != 'Draft':
@@ -49,7 +49,6 @@ class ApplicationService:
             db.close()
             
             logger.info(f"Application {app_id} created for user {user_id}")
-            print(f"application create with the id:{app_id}")
             return {
                 "application_id": app_id,
                 "status": "Draft",
@@ -67,36 +66,40 @@ class ApplicationService:
             
             cursor = db.cursor()
             
-            # Get application info
-            cursor.execute("""
-                SELECT 
-                    a.id, a.user_id, a.university_id, a.major_id, a.status,
-                    a.application_date, a.last_updated, a.notes, a.admin_notes,
-                    u.name as university_name, u.country, u.city,
-                    m.major_name as major_name
-                FROM applications a
-                JOIN universities u ON a.university_id = u.id
-                JOIN university_majors m ON a.major_id = m.id
-                WHERE a.id = ?
-            """, (application_id,))
-            
-            app = cursor.fetchone()
-            print(f"Application details fetched: {app}")
+            # Get application info; finalized applications past retention are in the archive store
+            app = None
+            for schema in ("main", "archive"):
+                if schema == "archive" and not has_archive(db):
+                    break
+                cursor.execute(f"""
+                    SELECT 
+                        a.id, a.user_id, a.university_id, a.major_id, a.status,
+                        a.application_date, a.last_updated, a.notes, a.admin_notes,
+                        u.name as university_name, u.country, u.city,
+                        m.major_name as major_name
+                    FROM {schema}.applications a
+                    JOIN universities u ON a.university_id = u.id
+                    JOIN university_majors m ON a.major_id = m.id
+                    WHERE a.id = ?
+                """, (application_id,))
+                app = cursor.fetchone()
+                if app:
+                    break
+            
+            logger.debug("application details fetched: %s", app)
             if not app:
-                db.close()
                 return None
             
             # Get uploaded documents
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT id, document_type, file_name, file_path, uploaded_at, is_verified
-                FROM application_documents
+                FROM {schema}.application_documents
                 WHERE application_id = ?
                 ORDER BY uploaded_at DESC
             """, (application_id,))
             
             documents = cursor.fetchall()
-            db.close()
-            print(f"documents detailes fetched:{documents}")
+            logger.debug("documents fetched for application %s: %d", application_id, len(documents))
             return {
                 "id": app[0],
                 "user_id": app[1],
@@ -111,6 +114,7 @@ class ApplicationService:
                 "country": app[10],
                 "city": app[11],
                 "major_name": app[12],
+                "archived": schema == "archive",
                 "documents": [
                     {
                         "id": doc[0],
@@ -139,7 +143,7 @@ class ApplicationService:
                     a.id, a.status, a.application_date, a.last_updated,
                     u.name as university_name, u.country,
                     m.major_name as major_name
-                FROM applications a
+                FROM {schema}.applications a
                 JOIN universities u ON a.university_id = u.id
                 JOIN university_majors m ON a.major_id = m.id
                 WHERE a.user_id = ?
@@ -151,17 +155,19 @@ class ApplicationService:
                 query += " AND a.status = ?"
                 params.append(status_filter)
             
-            print(f"Executing query: {query}, params: {params}")
             query += " ORDER BY a.last_updated DESC"
             
-            cursor.execute(query, params)
-            applications = cursor.fetchall()
-            print(f"fetched application:{applications}")
+            # The user's history includes applications moved to the archive store
+            applications = []
+            for schema in (["main", "archive"] if has_archive(db) else ["main"]):
+                cursor.execute(query.format(schema=schema), params)
+                applications += [(schema, app) for app in cursor.fetchall()]
+            applications.sort(key=lambda item: item[1][3] or "", reverse=True)
             # Get document count for each application
             result = []
-            for app in applications:
-                cursor.execute("""
-                    SELECT COUNT(*) FROM application_documents
+            for schema, app in applications:
+                cursor.execute(f"""
+                    SELECT COUNT(*) FROM {schema}.application_documents
                     WHERE application_id = ?
                 """, (app[0],))
                 doc_count = cursor.fetchone()[0]
@@ -179,7 +185,7 @@ class ApplicationService:
             
         
             db.close()
-            print(f"Returning user applications: {len(result)} applications and their details:{result}")
+            logger.debug("returning %d applications for user %s", len(result), user_id)
             return result
             
         except Exception as e:
@@ -311,6 +317,10 @@ class ApplicationService:
             # Get user_id
             cursor.execute("SELECT user_id FROM applications WHERE id = ?", (application_id,))
             result = cursor.fetchone()
+            if not result and restore_rows(db, "applications", [application_id]):
+                # Archived: bring it back into the hot tables before changing it
+                cursor.execute("SELECT user_id FROM applications WHERE id = ?", (application_id,))
+                result = cursor.fetchone()
             
             if not result:
                 db.close()
@@ -0,0 +1,282 @@
+# services/archive_service.py - Moves cold rows from the hot tables into the archive store
+"""
+Read notifications, expired OTPs, idle chat sessions and finalized
+applications are kept forever but almost never read. Once they pass their
+retention (ARCHIVE_*_DAYS) they are moved into the same-named tables of the
+archive store (ARCHIVE_DATABASE_NAME, attached as "archive"), so the hot
+tables and their indexes stay small enough to stay in the page cache.
+Children move with their parent: documents with their application,
+messages with their chat session.
+
+Rows move ARCHIVE_BATCH_SIZE at a time through the writer thread, each
+batch as two write jobs:
+
+1. copy: pick a batch of cold ids and copy the rows into the archive;
+2. move: re-check that the rows are still cold, copy them again (picking
+   up anything written in between), then delete them from the hot tables.
+   Rows that stopped being cold (e.g. a status change) lose their copy.
+
+A commit spanning two WAL databases is not atomic, so the copy is committed
+on its own first: a crash never leaves a row only in the transaction that
+deleted it. A crash between the two jobs leaves rows in both stores, and
+the next run moves them again (copies are INSERT OR REPLACE).
+
+Reads that must see old rows (the admin application list and stats,
+application details and history) query main and archive explicitly.
+Writing to an archived application moves it back first (restore_rows).
+
+    python -m services.archive_service run [--max-batches N]
+    python -m services.archive_service status
+"""
+import time
+import json
+import sqlite3
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from config import settings
+from db_writer import db_writer
+from sqlite import ARCHIVE_SCHEMA, archive_database, connect, has_archive
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_ROWS = metrics.REGISTRY.register(metrics.Counter(
+    "archive_rows_total", "Rows moved from the hot tables into the archive store", labels=("table",)))
+
+
+class ArchivePolicy(NamedTuple):
+    table: str
+    setting: str  # settings attribute holding the retention in days
+    where: str  # selects the cold rows of `table`; "?" is the cutoff
+    local_time: bool = False  # cutoff column written from Python's local clock, not CURRENT_TIMESTAMP (UTC)
+    key: str = "id"  # parent column the children reference
+    children: Tuple[Tuple[str, str], ...] = ()  # (table, column holding the parent key)
+
+    def cutoff(self) -> Optional[str]:
+        """Timestamp before which rows are cold, or None when archiving is off for the table"""
+        days = getattr(settings, self.setting)
+        if days <= 0:
+            return None
+        if self.local_time:
+            return str(datetime.now() - timedelta(days=days))  # as sqlite3 stores a datetime
+        return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+POLICIES = (
+    ArchivePolicy("notifications", "ARCHIVE_NOTIFICATIONS_DAYS", "is_read = 1 AND created_at < ?"),
+    ArchivePolicy("otp_verification", "ARCHIVE_OTP_DAYS", "expires_at < ?", local_time=True),
+    ArchivePolicy(
+        "chat_sessions", "ARCHIVE_CHAT_DAYS", "last_activity < ?",
+        key="session_id", children=(("chat_messages", "session_id"),),
+    ),
+    ArchivePolicy(
+        "applications", "ARCHIVE_APPLICATIONS_DAYS", "status IN ('Final Offer', 'Rejected') AND last_updated < ?",
+        children=(("application_documents", "application_id"),),
+    ),
+)
+_POLICY = {policy.table: policy for policy in POLICIES}
+
+
+def _marks(ids: Sequence[int]) -> str:
+    return ",".join("?" for _ in ids)
+
+
+def _copy(conn: sqlite3.Connection, source: str, target: str, table: str, where: str, params: Sequence):
+    # The hot table's columns: ensure_archive_schema keeps the archive copy a superset
+    columns = ", ".join(f'"{row[1]}"' for row in conn.execute(f'PRAGMA main.table_info("{table}")').fetchall())
+    conn.execute(
+        f'INSERT OR REPLACE INTO {target}."{table}" ({columns}) SELECT {columns} FROM {source}."{table}" WHERE {where}',
+        params
+    )
+
+
+def _copy_rows(conn: sqlite3.Connection, policy: ArchivePolicy, ids: Sequence[int], source: str, target: str):
+    marks = _marks(ids)
+    for child, column in policy.children:
+        _copy(conn, source, target, child,
+              f"{column} IN (SELECT {policy.key} FROM {source}.{policy.table} WHERE id IN ({marks}))", ids)
+    _copy(conn, source, target, policy.table, f"id IN ({marks})", ids)
+
+
+def _delete_rows(conn: sqlite3.Connection, policy: ArchivePolicy, ids: Sequence[int], schema: str):
+    marks = _marks(ids)
+    # Children first: they are found through the parent rows
+    for child, column in policy.children:
+        conn.execute(
+            f"DELETE FROM {schema}.{child} WHERE {column} IN "
+            f"(SELECT {policy.key} FROM {schema}.{policy.table} WHERE id IN ({marks}))", ids
+        )
+    conn.execute(f"DELETE FROM {schema}.{policy.table} WHERE id IN ({marks})", ids)
+
+
+def _copy_batch(conn: sqlite3.Connection, policy: ArchivePolicy, cutoff: str, limit: int) -> List[int]:
+    """Write job: copy up to `limit` cold rows into the archive; returns their ids"""
+    ids = [row[0] for row in conn.execute(
+        f"SELECT id FROM main.{policy.table} WHERE {policy.where} LIMIT ?", (cutoff, limit)
+    ).fetchall()]
+    if ids:
+        _copy_rows(conn, policy, ids, "main", ARCHIVE_SCHEMA)
+        conn.commit()
+    return ids
+
+
+def _move_batch(conn: sqlite3.Connection, policy: ArchivePolicy, cutoff: str, ids: List[int]) -> int:
+    """Write job: delete the copied rows that are still cold from the hot tables"""
+    marks = _marks(ids)
+    moving = [row[0] for row in conn.execute(
+        f"SELECT id FROM main.{policy.table} WHERE id IN ({marks}) AND {policy.where}", (*ids, cutoff)
+    ).fetchall()]
+    stale = sorted(set(ids) - set(moving))
+    if stale:
+        # Updated (or already moved by another worker) since the copy: keep main as the only copy
+        hot = [row[0] for row in conn.execute(
+            f"SELECT id FROM main.{policy.table} WHERE id IN ({_marks(stale)})", stale
+        ).fetchall()]
+        if hot:
+            _delete_rows(conn, policy, hot, ARCHIVE_SCHEMA)
+    if moving:
+        _copy_rows(conn, policy, moving, "main", ARCHIVE_SCHEMA)
+        _delete_rows(conn, policy, moving, "main")
+    conn.commit()
+    return len(moving)
+
+
+def restore_rows(conn: sqlite3.Connection, table: str, ids: Sequence[int]) -> int:
+    """Write job: move archived rows (and their children) back into the hot tables"""
+    policy = _POLICY[table]
+    if not ids or not has_archive(conn):
+        return 0
+    archived = [row[0] for row in conn.execute(
+        f"SELECT id FROM {ARCHIVE_SCHEMA}.{table} WHERE id IN ({_marks(ids)})", list(ids)
+    ).fetchall()]
+    if archived:
+        _copy_rows(conn, policy, archived, ARCHIVE_SCHEMA, "main")
+        _delete_rows(conn, policy, archived, ARCHIVE_SCHEMA)
+        conn.commit()
+        logger.info(f"Restored {len(archived)} rows of {table} from the archive")
+    return len(archived)
+
+
+def archive_table(policy: ArchivePolicy, batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> int:
+    """Move the table's cold rows into the archive, batch by batch; returns rows moved"""
+    cutoff = policy.cutoff()
+    if cutoff is None:
+        return 0
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    writer = db_writer()
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = writer.write(_copy_batch, policy, cutoff, batch_size)
+        if not ids:
+            break
+        count = writer.write(_move_batch, policy, cutoff, ids)
+        ARCHIVED_ROWS.inc((policy.table,), count)
+        moved += count
+        batches += 1
+        if len(ids) < batch_size:
+            break
+        time.sleep(settings.ARCHIVE_BATCH_PAUSE_MS / 1000)
+    return moved
+
+
+def run_archival(max_batches: Optional[int] = None) -> Dict[str, int]:
+    """One archival pass over every table; returns rows moved per table"""
+    if archive_database() is None:
+        logger.info("Archival skipped: ARCHIVE_DATABASE_NAME is not set")
+        return {}
+    started = time.perf_counter()
+    moved = {}
+    for policy in POLICIES:
+        try:
+            moved[policy.table] = archive_table(policy, max_batches=max_batches)
+        except Exception as e:
+            logger.error(f"Archiving {policy.table} failed: {e}")
+    if any(moved.values()):
+        logger.info(f"Archived {moved} in {time.perf_counter() - started:.1f}s")
+    return moved
+
+
+def archive_status() -> Dict[str, Dict[str, int]]:
+    """Hot and archived row counts for every archived table"""
+    conn = connect()
+    try:
+        archived = has_archive(conn)
+        status = {}
+        for policy in POLICIES:
+            for table in (policy.table, *(child for child, _ in policy.children)):
+                status[table] = {
+                    "hot": conn.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0],
+                    "archived": conn.execute(f"SELECT COUNT(*) FROM {ARCHIVE_SCHEMA}.{table}").fetchone()[0]
+                    if archived else 0,
+                }
+        return status
+    finally:
+        conn.close()
+
+
+# ============= Schedule =============
+
+class ArchiveScheduler:
+    """Runs an archival pass every ARCHIVE_INTERVAL_MINUTES"""
+
+    def __init__(self, interval_minutes: int):
+        self.interval = interval_minutes * 60
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="archive-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # Wait one interval first so startup isn't competing with the first pass
+        while not self._stop.wait(self.interval):
+            try:
+                run_archival()
+            except Exception as e:
+                logger.error(f"Scheduled archival failed: {e}")
+
+
+_scheduler: Optional[ArchiveScheduler] = None
+
+
+def start_archive_scheduler():
+    global _scheduler
+    if _scheduler is None and settings.ARCHIVE_INTERVAL_MINUTES > 0 and archive_database():
+        _scheduler = ArchiveScheduler(settings.ARCHIVE_INTERVAL_MINUTES)
+        _scheduler.start()
+
+
+def stop_archive_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_writer import close_db_writer
+    from migrations import apply_migrations
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Move cold rows into the archive store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run")
+    run.add_argument("--max-batches", type=int, default=None, help="per table")
+    commands.add_parser("status")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        apply_migrations()  # creates the archive tables on first use
+        try:
+            result = run_archival(args.max_batches)
+        finally:
+            close_db_writer()
+    else:
+        result = archive_status()
+    print(json.dumps(result, indent=2))
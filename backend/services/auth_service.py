@@ -1,22 +1,26 @@
 # services/auth_service.py - Authentication and JWT service
-from jose import jwt
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from jose import jwt, JWTError
+from datetime import datetime, timedelta, timezone
 from config import settings
 from typing import Optional
 import sqlite3
 from logger import logger 
+from async_db import db_pool
+from db_writer import db_writer, execute_statement
+from password_pool import password_pool
+from services.token_revocation import (
+    consume_refresh_token, new_token_id, revoke, revoke_session, store_refresh_token
+)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing runs on the bounded bcrypt pool (password_pool.py); async handlers await it directly
 
 def hash_password(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return password_pool().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool().verify(plain_password, hashed_password)[0]
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -28,25 +32,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire, "type": "access"})
+    to_encode.setdefault("jti", new_token_id())
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def create_refresh_token(data: dict):
+def create_refresh_token(data: dict, expire: Optional[datetime] = None):
     """Create JWT refresh token"""
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = expire or datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.setdefault("jti", new_token_id())
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def create_tokens_for_user(user_id: int, email: Optional[str] = None):
-    """Create both access and refresh tokens for a user"""
-    token_data = {"sub": str(user_id)}
+def create_tokens_for_user(db: sqlite3.Connection, user_id: int, email: Optional[str] = None,
+                           family: Optional[str] = None):
+    """
+    Write job: access and refresh tokens for a user, in session `family`
+    (a new session by default). The refresh token is stored for rotation.
+    """
+    family = family or new_token_id()
+    token_data = {"sub": str(user_id), "fam": family}
     if email:
         token_data["email"] = email
     
     access_token = create_access_token(token_data)
-    refresh_token = create_refresh_token(token_data)
+    refresh_jti = new_token_id()
+    refresh_expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    refresh_token = create_refresh_token({**token_data, "jti": refresh_jti}, refresh_expire)
+    store_refresh_token(db, refresh_jti, user_id, family, refresh_expire)
+    db.commit()
     
     return {
         "access_token": access_token,
@@ -55,35 +70,83 @@ def create_tokens_for_user(user_id: int, email: Optional[str] = None):
         "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
 
-def authenticate_user(db: sqlite3.Connection, email: str, password: str):
-    """Authenticate a user by email and password"""
-    cursor = db.cursor()
-    cursor.execute(
+def rotate_refresh_token(db: sqlite3.Connection, refresh_token: str) -> Optional[dict]:
+    """
+    Write job: swap a refresh token for a new token pair in the same session.
+    None if the token is invalid, expired or already used; reusing a token
+    revokes its whole session.
+    """
+    try:
+        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    
+    # Refresh tokens issued before rotation have no jti/session: those users sign in again
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fam"):
+        return None
+    
+    user_id = int(payload["sub"])
+    family = consume_refresh_token(db, payload["jti"], user_id)
+    if family is None:
+        return None
+    
+    active = db.execute("SELECT is_active FROM users WHERE id = ?", (user_id,)).fetchone()
+    if not active or not active[0]:
+        return None
+    
+    return create_tokens_for_user(db, user_id, payload.get("email"), family)
+
+def revoke_current_session(db: sqlite3.Connection, current_user: dict):
+    """Write job: log out the session of the presented access token"""
+    user_id = int(current_user["user_id"])
+    if current_user.get("fam"):
+        revoke_session(db, current_user["fam"], user_id)
+    elif current_user.get("jti"):
+        revoke(db, current_user["jti"], user_id, datetime.fromtimestamp(current_user["exp"], timezone.utc))
+    # Tokens from before sessions carry neither and simply run out (ACCESS_TOKEN_EXPIRE_MINUTES)
+    db.commit()
+
+async def authenticate_user(email: str, password: str):
+    """Authenticate a user by email and password, rehashing it if PASSWORD_HASH_ROUNDS changed"""
+    user = await db_pool().fetchone(
         "SELECT id, email, password_hash, is_active FROM users WHERE email = ?",
         (email,)
     )
-    user = cursor.fetchone()
     
     if not user:
         return None
     
     user_id, user_email, password_hash, is_active = user
     
-    if not is_active:
+    if not is_active or not password_hash:
         return None
     
-    if password_hash and verify_password(password, password_hash):
-        return {"id": user_id, "email": user_email}
+    valid, new_hash = await password_pool().verify_async(password, password_hash)
+    if not valid:
+        return None
     
-    return None
+    if new_hash:
+        # Only if the password wasn't changed meanwhile; a failed rehash just waits for the next login
+        try:
+            await db_writer().run(
+                execute_statement,
+                "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+                (new_hash, user_id, password_hash)
+            )
+        except Exception as e:
+            logger.warning(f"Rehashing the password of user {user_id} failed: {e}")
+    
+    return {"id": user_id, "email": user_email}
 
 def create_user(db: sqlite3.Connection, phone: Optional[str], email: Optional[str], 
-                password: Optional[str], auth_provider: str = "email", is_admin: bool = False) -> Optional[int]:
-    """Create a new user"""
+                password: Optional[str], auth_provider: str = "email", is_admin: bool = False,
+                password_hash: Optional[str] = None) -> Optional[int]:
+    """Create a new user (pass password_hash instead of password when hashed ahead of a write job)"""
     cursor = db.cursor()
     
     # Hash password if provided
-    password_hash = hash_password(password) if password else None
+    if password:
+        password_hash = hash_password(password)
     
     try:
         cursor.execute(
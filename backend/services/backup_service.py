@@ -0,0 +1,371 @@
+# services/backup_service.py - Online snapshots of the SQLite stores and the Chroma directory
+"""
+A snapshot is a directory under BACKUP_DIR holding a consistent copy of
+the transactional database, the catalog and archive databases when they
+are in use, and the Chroma persist directory, plus a manifest.json
+describing them.
+
+Databases are copied with SQLite's online backup API, BACKUP_STEP_PAGES at
+a time with a short pause between steps. The source connection holds one
+read transaction for the whole copy: in WAL mode writers keep committing
+meanwhile, and the copy is not restarted each time they do (without that
+pin, a busy database can keep a backup running indefinitely).
+
+Files that haven't changed since the previous snapshot (a catalog nobody
+edited, Chroma segments) are hard-linked instead of copied. A snapshot is
+built in "<name>.partial" and renamed when complete; only complete ones
+count towards BACKUP_KEEP.
+
+    python -m services.backup_service create
+    python -m services.backup_service list
+    python -m services.backup_service restore snapshot-20260101T000000
+
+Restore replaces the live files, so run it with the application stopped.
+"""
+import os
+import json
+import time
+import shutil
+import sqlite3
+import threading
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from config import settings
+from sqlite import archive_database, catalog_database, database_uri
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "snapshot-"
+PARTIAL_SUFFIX = ".partial"
+MANIFEST = "manifest.json"
+CHROMA_DIR = "chroma"
+STALE_PARTIAL_SECONDS = 24 * 3600
+SQLITE_SIDE_FILES = ("-wal", "-shm", "-journal")
+
+
+def _stores() -> Dict[str, str]:
+    """Store name -> live database path"""
+    stores = {"main": settings.DATABASE_NAME}
+    catalog = catalog_database()
+    if catalog:
+        stores["catalog"] = catalog
+    archive = archive_database()
+    if archive and os.path.exists(archive):
+        # Copied after main: a row archived in between is then in both copies
+        # (the next archival run settles it), never in neither
+        stores["archive"] = archive
+    return stores
+
+
+def _signature(path: str) -> List[int]:
+    """Size and mtime of a file (and its WAL): unchanged means no new commits"""
+    sig = []
+    for p in (path, path + "-wal"):
+        try:
+            st = os.stat(p)
+            sig += [st.st_size, st.st_mtime_ns]
+        except FileNotFoundError:
+            sig += [0, 0]
+    return sig
+
+
+def backup_sqlite(src_path: str, dest_path: str) -> Dict[str, Any]:
+    """Paged online copy of one database, consistent as of the moment it starts"""
+    pause = settings.BACKUP_STEP_SLEEP_MS / 1000
+    steps = 0
+
+    def progress(status, remaining, total):
+        nonlocal steps
+        steps += 1
+        if remaining and pause:
+            time.sleep(pause)
+
+    started = time.perf_counter()
+    src = sqlite3.connect(database_uri(src_path, mode="ro"), uri=True, isolation_level=None, timeout=10)
+    dest = sqlite3.connect(dest_path)
+    try:
+        # Pin one WAL snapshot; writers don't wait on readers
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        src.backup(dest, pages=settings.BACKUP_STEP_PAGES, progress=progress)
+        src.execute("COMMIT")
+        check = dest.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        src.close()
+        dest.close()
+    if check != "ok":
+        raise RuntimeError(f"Backup of {src_path} failed quick_check: {check}")
+    return {
+        "size": os.path.getsize(dest_path),
+        "steps": steps,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _link_or_copy(src: str, dest: str):
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def _backup_chroma(chroma_path: str, dest_root: str, previous: Optional[Tuple[str, Dict]]) -> Dict[str, Any]:
+    files = {}
+    prev_dir, prev_files = previous if previous else (None, {})
+    for dirpath, _, filenames in os.walk(chroma_path):
+        rel_dir = os.path.relpath(dirpath, chroma_path)
+        os.makedirs(os.path.join(dest_root, rel_dir), exist_ok=True)
+        for filename in filenames:
+            if filename.endswith(SQLITE_SIDE_FILES):
+                continue  # folded into the database copy
+            rel = os.path.normpath(os.path.join(rel_dir, filename))
+            src, dest = os.path.join(chroma_path, rel), os.path.join(dest_root, rel)
+            sig = _signature(src)
+            prev = prev_files.get(rel)
+            if prev and prev["signature"] == sig and os.path.exists(os.path.join(prev_dir, rel)):
+                _link_or_copy(os.path.join(prev_dir, rel), dest)
+                files[rel] = {**prev, "linked": True}
+            elif filename.endswith(".sqlite3"):
+                files[rel] = {"signature": sig, **backup_sqlite(src, dest)}
+            else:
+                shutil.copy2(src, dest)
+                files[rel] = {"signature": sig, "size": os.path.getsize(dest)}
+    return files
+
+
+# ============= Snapshots =============
+
+def list_snapshots(root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Completed snapshots, oldest first"""
+    root = root or settings.BACKUP_DIR
+    if not os.path.isdir(root):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if not name.startswith(SNAPSHOT_PREFIX) or name.endswith(PARTIAL_SUFFIX):
+            continue
+        try:
+            with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        snapshots.append({"name": name, "path": path, **manifest})
+    return snapshots
+
+
+def create_snapshot(at: Optional[datetime] = None, include_chroma: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Take a snapshot named after `at` (now by default). Returns its manifest,
+    or None if a snapshot with that name exists or is being taken by another
+    process, which is how scheduled runs in several workers collapse into one.
+    """
+    root = settings.BACKUP_DIR
+    os.makedirs(root, exist_ok=True)
+    at = at or datetime.now(timezone.utc)
+    name = SNAPSHOT_PREFIX + at.strftime("%Y%m%dT%H%M%S")
+    final = os.path.join(root, name)
+    partial = final + PARTIAL_SUFFIX
+    if os.path.exists(final):
+        return None
+    try:
+        os.mkdir(partial)
+    except FileExistsError:
+        return None
+
+    started = time.perf_counter()
+    previous = list_snapshots(root)
+    previous = previous[-1] if previous else None
+    try:
+        manifest: Dict[str, Any] = {"created_at": at.isoformat(timespec="seconds"), "stores": {}}
+        for store, path in _stores().items():
+            filename = store + ".db"
+            sig = _signature(path)
+            prev = previous["stores"].get(store) if previous else None
+            if prev and prev["signature"] == sig and os.path.exists(os.path.join(previous["path"], filename)):
+                _link_or_copy(os.path.join(previous["path"], filename), os.path.join(partial, filename))
+                manifest["stores"][store] = {**prev, "source": path, "linked": True}
+                continue
+            info = backup_sqlite(path, os.path.join(partial, filename))
+            manifest["stores"][store] = {"file": filename, "source": path, "signature": sig, **info}
+
+        if include_chroma and os.path.isdir(settings.CHROMA_DB_PATH):
+            prev_chroma = None
+            if previous and previous.get("chroma"):
+                prev_chroma = (os.path.join(previous["path"], CHROMA_DIR), previous["chroma"]["files"])
+            files = _backup_chroma(settings.CHROMA_DB_PATH, os.path.join(partial, CHROMA_DIR), prev_chroma)
+            manifest["chroma"] = {"source": settings.CHROMA_DB_PATH, "files": files}
+
+        manifest["seconds"] = round(time.perf_counter() - started, 3)
+        with open(os.path.join(partial, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(partial, final)
+    except Exception:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+
+    logger.info(f"Backup {name} written in {manifest['seconds']:.1f}s")
+    prune_snapshots()
+    return {"name": name, "path": final, **manifest}
+
+
+def prune_snapshots(keep: Optional[int] = None) -> List[str]:
+    """Delete all but the newest `keep` snapshots, and partial ones left by crashed runs"""
+    root = settings.BACKUP_DIR
+    keep = settings.BACKUP_KEEP if keep is None else keep
+    removed = [s["name"] for s in list_snapshots(root)[:-keep]] if keep > 0 else []
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if name.endswith(PARTIAL_SUFFIX) and time.time() - os.path.getmtime(path) > STALE_PARTIAL_SECONDS:
+                removed.append(name)
+    for name in removed:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    if removed:
+        logger.info(f"Pruned backups: {', '.join(removed)}")
+    return removed
+
+
+# ============= Restore =============
+
+def _move_aside(path: str, suffix: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    aside = path + suffix
+    os.replace(path, aside)
+    return aside
+
+
+def _restore_sqlite(backup_path: str, target: str, suffix: str) -> Optional[str]:
+    if os.path.exists(target):
+        # Fold the WAL into the file so the copy kept aside is complete
+        conn = sqlite3.connect(target)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+    aside = _move_aside(target, suffix)
+    for side in SQLITE_SIDE_FILES:
+        # A stale WAL next to the restored file would be replayed into it
+        if os.path.exists(target + side):
+            os.remove(target + side)
+    tmp = target + ".restoring"
+    shutil.copy2(backup_path, tmp)
+    os.replace(tmp, target)
+    return aside
+
+
+def restore_snapshot(name: str, include_chroma: bool = True) -> Dict[str, Any]:
+    """
+    Put a snapshot back in place of the live databases (and Chroma directory).
+    The files it replaces are kept next to them with a .pre-restore suffix.
+    """
+    path = name if os.path.isdir(name) else os.path.join(settings.BACKUP_DIR, name)
+    with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    stores = _stores()
+    missing = [store for store in manifest["stores"] if store not in stores]
+    if missing:
+        raise RuntimeError(f"Snapshot has stores this configuration doesn't use: {missing}")
+    for store, info in manifest["stores"].items():
+        conn = sqlite3.connect(database_uri(os.path.join(path, info["file"]), mode="ro"), uri=True)
+        try:
+            check = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+        if check != "ok":
+            raise RuntimeError(f"{store} backup is damaged: {check}")
+
+    suffix = ".pre-restore-" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    restored = {}
+    for store, info in manifest["stores"].items():
+        restored[store] = {
+            "target": stores[store],
+            "previous": _restore_sqlite(os.path.join(path, info["file"]), stores[store], suffix),
+        }
+    if include_chroma and manifest.get("chroma"):
+        target = settings.CHROMA_DB_PATH
+        previous = _move_aside(target, suffix)
+        shutil.copytree(os.path.join(path, CHROMA_DIR), target)
+        restored["chroma"] = {"target": target, "previous": previous}
+
+    logger.info(f"Restored {os.path.basename(path)}: {restored}")
+    return restored
+
+
+# ============= Schedule =============
+
+class BackupScheduler:
+    """Takes a snapshot at every BACKUP_INTERVAL_MINUTES boundary"""
+
+    def __init__(self, interval_minutes: int):
+        self.interval = interval_minutes * 60
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="backup-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            now = time.time()
+            slot = now - now % self.interval
+            # Name the snapshot after its slot so every worker process picks the same name
+            at = datetime.fromtimestamp(slot, timezone.utc)
+            name = SNAPSHOT_PREFIX + at.strftime("%Y%m%dT%H%M%S")
+            if not os.path.exists(os.path.join(settings.BACKUP_DIR, name)):
+                try:
+                    create_snapshot(at)
+                except Exception as e:
+                    logger.error(f"Scheduled backup failed: {e}")
+            if self._stop.wait(slot + self.interval - time.time()):
+                return
+
+
+_scheduler: Optional[BackupScheduler] = None
+
+
+def start_backup_scheduler():
+    global _scheduler
+    if _scheduler is None and settings.BACKUP_INTERVAL_MINUTES > 0:
+        _scheduler = BackupScheduler(settings.BACKUP_INTERVAL_MINUTES)
+        _scheduler.start()
+
+
+def stop_backup_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Snapshot and restore the platform databases")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create")
+    create.add_argument("--no-chroma", action="store_true")
+    commands.add_parser("list")
+    prune = commands.add_parser("prune")
+    prune.add_argument("--keep", type=int, default=None)
+    restore = commands.add_parser("restore", help="run with the application stopped")
+    restore.add_argument("snapshot")
+    restore.add_argument("--no-chroma", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        result = create_snapshot(include_chroma=not args.no_chroma)
+    elif args.command == "list":
+        result = [{k: s[k] for k in ("name", "created_at")} for s in list_snapshots()]
+    elif args.command == "prune":
+        result = prune_snapshots(args.keep)
+    else:
+        result = restore_snapshot(args.snapshot, include_chroma=not args.no_chroma)
+    print(json.dumps(result, indent=2, default=str))
@@ -0,0 +1,148 @@
+# services/catalog_cache.py - Serialized, ETag-tagged responses for catalog endpoints
+"""
+Catalog reads (university list, filter options, offers, scholarships) are
+served from serialized bodies cached per catalog version. A hit touches
+neither SQLite nor the JSON encoder, and a matching If-None-Match gets a
+bodyless 304.
+
+The ETag is a hash of the body rather than the version number, so every
+worker process produces the same tag for the same data. Versions are
+process-local: a write on another worker is picked up when the entry's
+CATALOG_CACHE_TTL expires.
+"""
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+from fastapi import Request, Response
+from config import settings
+from sqlite import connect_catalog
+from services import catalog_version
+from utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+# Keys are client-controlled (query filters), so build locks are striped, not per key
+BUILD_LOCK_STRIPES = 64
+
+
+class CachedBody:
+    __slots__ = ("version", "body", "etag", "created")
+
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.created = time.monotonic()
+
+
+def serialize(data: Any) -> bytes:
+    """Same encoding as the app's default FastJSONResponse"""
+    return dumps(data)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+class CatalogResponseCache:
+    def __init__(self, ttl: float, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One builder per key at a time, so a miss under load queries once
+        self._build_locks: List[threading.Lock] = [threading.Lock() for _ in range(BUILD_LOCK_STRIPES)]
+        catalog_version.subscribe(self._on_catalog_change)
+
+    def _on_catalog_change(self, version: int, university_ids):
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _fresh(self, key: Hashable, version: int) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version or time.monotonic() - entry.created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> CachedBody:
+        version = catalog_version.current_version()
+        entry = self._fresh(key, version)
+        if entry is not None:
+            return entry
+
+        with self._build_locks[hash(key) % len(self._build_locks)]:
+            entry = self._fresh(key, version)
+            if entry is not None:
+                return entry
+
+            entry = CachedBody(version, serialize(build()))
+
+            with self._lock:
+                # A write during the build bumped the version; serve but don't keep it
+                if catalog_version.current_version() == version:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            logger.debug("catalog cache miss for %s (version %s)", key, version)
+            return entry
+
+
+_cache: Optional[CatalogResponseCache] = None
+
+
+def get_catalog_cache() -> CatalogResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = CatalogResponseCache(ttl=settings.CATALOG_CACHE_TTL)
+    return _cache
+
+
+def with_connection(build: Callable[[sqlite3.Connection], Any]) -> Callable[[], Any]:
+    """Adapt a builder that queries the catalog store; the connection is only opened on a miss"""
+    def run():
+        conn = connect_catalog()
+        conn.row_factory = sqlite3.Row
+        try:
+            return build(conn)
+        finally:
+            conn.close()
+    return run
+
+
+def catalog_response(
+    request: Request,
+    key: Tuple[Hashable, ...],
+    build: Callable[[], Any],
+) -> Response:
+    """
+    Cached JSON response for a catalog read. `key` must include every query
+    parameter that changes the result; `build` only runs on a miss.
+    """
+    entry = get_catalog_cache().get_or_build(key, build)
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={settings.CATALOG_MAX_AGE}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,407 @@
+# services/catalog_import.py - Streaming bulk importer for the university catalog
+import csv
+import io
+import json
+import sqlite3
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from models.university import UniversityBase
+from models.scholarship import ScholarshipCreate
+from services import catalog_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+UNIVERSITY_COLUMNS = [
+    "name", "country", "city", "tuition_fee", "min_gpa", "language", "scholarship_available",
+    "overview", "duration", "accommodation_info", "website", "ranking", "acceptance_rate"
+]
+
+SCHOLARSHIP_COLUMNS = [
+    "name", "country", "provider", "min_gpa", "max_age", "nationality_requirement", "coverage",
+    "amount", "deadline", "description", "required_documents", "website"
+]
+
+
+@dataclass
+class ImportReport:
+    """Outcome of one import run; errors carry the 1-based source line number"""
+    kind: str
+    processed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    university_ids: set = field(default_factory=set)
+    vector_sync: Optional[Dict[str, Any]] = None
+
+    def add_error(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "vector_sync": self.vector_sync,
+        }
+
+
+# ============= Record readers =============
+
+def iter_records(stream: Iterable[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (line_number, record) pairs from a CSV or JSONL text stream without
+    loading the whole file. Malformed JSON lines are yielded as (line, None).
+    """
+    fmt = fmt.lower()
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt in ("jsonl", "ndjson"):
+        for line_num, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield line_num, None
+                continue
+            yield line_num, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _clean(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip whitespace and turn empty CSV cells into None so optional fields validate"""
+    cleaned = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        key = key.strip()
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                value = None
+        cleaned[key] = value
+    return cleaned
+
+
+def _split_majors(value: Any) -> Optional[List[str]]:
+    """Majors arrive as a JSON list or a ';' / '|' separated CSV cell"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.replace("|", ";").split(";")
+    majors = []
+    seen = set()
+    for major in value:
+        major = str(major).strip()
+        if major and major.lower() not in seen:
+            seen.add(major.lower())
+            majors.append(major)
+    return majors
+
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+    return str(e)
+
+
+# ============= Importer =============
+
+class CatalogImporter:
+    """
+    Bulk upserts universities, programs (university majors) and scholarships.
+
+    Existing natural keys are loaded once up front, so each batch is one
+    transaction: an INSERT per new row (SQLite assigns its id) and
+    executemany for the rest. Vector store and cache
+    invalidation happen once, after the last batch.
+    """
+
+    def __init__(self, db: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    # ---------- natural key maps ----------
+
+    def _university_keys(self) -> Dict[Tuple[str, str], int]:
+        cursor = self.db.execute("SELECT id, name, country FROM universities")
+        return {
+            ((name or "").lower(), (country or "").lower()): uni_id
+            for uni_id, name, country in cursor.fetchall()
+        }
+
+    def _scholarship_keys(self) -> Dict[Tuple[str, str], int]:
+        cursor = self.db.execute("SELECT id, name, provider FROM scholarships")
+        return {
+            ((name or "").lower(), (provider or "").lower()): sch_id
+            for sch_id, name, provider in cursor.fetchall()
+        }
+
+    def _upsert(self, table: str, columns: List[str], keys: Dict[Tuple[str, str], int],
+                items, report: ImportReport) -> List[int]:
+        """
+        Update rows whose natural key is known, insert the others and record
+        the id SQLite gave them in `keys`. Returns each item's id, in order.
+        """
+        cursor = self.db.cursor()
+        insert_sql = f"""INSERT INTO {table} ({', '.join(columns)})
+            VALUES ({', '.join('?' for _ in columns)}) RETURNING id"""
+        ids, updates = [], []
+        for key, values in items:
+            row_id = keys.get(key)
+            if row_id is None:
+                # SQLite picks the id, so writes between batches can't collide with ours
+                row_id = cursor.execute(insert_sql, [values[c] for c in columns]).fetchone()[0]
+                keys[key] = row_id
+                report.inserted += 1
+            else:
+                updates.append((*(values[c] for c in columns), row_id))
+            ids.append(row_id)
+        if updates:
+            cursor.executemany(
+                f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                updates
+            )
+            report.updated += len(updates)
+        return ids
+
+    # ---------- batching ----------
+
+    def _run_batches(self, records, report: ImportReport, prepare, flush, discard):
+        """
+        Validate records with `prepare`, writing every `batch_size` rows with
+        `flush`. `discard` forgets what `prepare` and `flush` recorded for a
+        batch that rolled back, so later records don't take its rows as existing.
+        """
+        batch = []
+        for line_num, record in records:
+            report.processed += 1
+            if record is None:
+                report.add_error(line_num, "Malformed record")
+                continue
+            try:
+                item = prepare(_clean(record))
+            except (ValidationError, ValueError) as e:
+                report.add_error(line_num, _error_message(e))
+                continue
+            if item is None:
+                report.skipped += 1
+                continue
+            batch.append((line_num, item))
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report, flush, discard)
+                batch = []
+        if batch:
+            self._flush(batch, report, flush, discard)
+
+    def _flush(self, batch, report: ImportReport, flush, discard):
+        items = [item for _, item in batch]
+        counts = report.inserted, report.updated
+        try:
+            flush(items, report)
+            self.db.commit()
+        except sqlite3.Error as e:
+            self.db.rollback()
+            report.inserted, report.updated = counts
+            discard(items)
+            logger.error(f"Import batch ending at line {batch[-1][0]} failed: {e}")
+            for line_num, _ in batch:
+                report.add_error(line_num, f"Database error: {e}")
+
+    # ---------- universities ----------
+
+    def import_universities(self, records) -> ImportReport:
+        report = ImportReport(kind="universities")
+        keys = self._university_keys()
+
+        def prepare(record):
+            university = UniversityBase(**record)
+            values = university.model_dump()
+            values["scholarship_available"] = 1 if university.scholarship_available else 0
+            key = (university.name.lower(), university.country.lower())
+            return key, values, _split_majors(record.get("majors"))
+
+        def discard(items):
+            # Ids handed out by the rolled-back batch no longer exist
+            keys.clear()
+            keys.update(self._university_keys())
+
+        def flush(items, report):
+            ids = self._upsert("universities", UNIVERSITY_COLUMNS, keys,
+                               [(key, values) for key, values, _ in items], report)
+
+            # A majors column is the university's program list. Existing rows keep
+            # their ids (applications point at them); unlisted ones go unless applied to.
+            with_majors = {
+                uni_id: json.dumps(majors)
+                for uni_id, (_, _, majors) in zip(ids, items) if majors is not None
+            }
+            if with_majors:
+                self.db.executemany(
+                    """DELETE FROM university_majors
+                    WHERE university_id = ?
+                      AND lower(major_name) NOT IN (SELECT lower(value) FROM json_each(?))
+                      AND id NOT IN (SELECT major_id FROM applications WHERE major_id IS NOT NULL)""",
+                    [(uni_id, majors) for uni_id, majors in with_majors.items()]
+                )
+                self.db.executemany(
+                    """INSERT OR IGNORE INTO university_majors (university_id, major_name)
+                    SELECT ?1, value FROM json_each(?2)
+                    WHERE lower(value) NOT IN (
+                        SELECT lower(major_name) FROM university_majors WHERE university_id = ?1
+                    )""",
+                    [(uni_id, majors) for uni_id, majors in with_majors.items()]
+                )
+
+            report.university_ids.update(ids)
+
+        self._run_batches(records, report, prepare, flush, discard)
+        return report
+
+    # ---------- programs ----------
+
+    def import_programs(self, records) -> ImportReport:
+        """
+        Add programs as (university_name, country, major_name) rows.
+        Programs already linked to the university are skipped.
+        """
+        report = ImportReport(kind="programs")
+        keys = self._university_keys()
+        cursor = self.db.execute("SELECT university_id, major_name FROM university_majors")
+        existing = {(uni_id, (major or "").lower()) for uni_id, major in cursor.fetchall()}
+
+        def prepare(record):
+            name = record.get("university_name") or record.get("university")
+            country = record.get("country")
+            major = record.get("major_name") or record.get("major")
+            if not name or not country or not major:
+                raise ValueError("university_name, country and major_name are required")
+            uni_id = keys.get((str(name).lower(), str(country).lower()))
+            if uni_id is None:
+                raise ValueError(f"Unknown university: {name} ({country})")
+            key = (uni_id, str(major).lower())
+            if key in existing:
+                return None
+            existing.add(key)
+            return uni_id, str(major)
+
+        def discard(items):
+            existing.difference_update((uni_id, major.lower()) for uni_id, major in items)
+
+        def flush(items, report):
+            self.db.executemany(
+                "INSERT INTO university_majors (university_id, major_name) VALUES (?, ?)",
+                items
+            )
+            report.inserted += len(items)
+            report.university_ids.update(uni_id for uni_id, _ in items)
+
+        self._run_batches(records, report, prepare, flush, discard)
+        return report
+
+    # ---------- scholarships ----------
+
+    def import_scholarships(self, records) -> ImportReport:
+        report = ImportReport(kind="scholarships")
+        keys = self._scholarship_keys()
+
+        def prepare(record):
+            scholarship = ScholarshipCreate(**record)
+            return (scholarship.name.lower(), scholarship.provider.lower()), scholarship.model_dump()
+
+        def discard(items):
+            keys.clear()
+            keys.update(self._scholarship_keys())
+
+        def flush(items, report):
+            self._upsert("scholarships", SCHOLARSHIP_COLUMNS, keys, items, report)
+
+        self._run_batches(records, report, prepare, flush, discard)
+        return report
+
+
+IMPORTERS = {
+    "universities": CatalogImporter.import_universities,
+    "programs": CatalogImporter.import_programs,
+    "scholarships": CatalogImporter.import_scholarships,
+}
+
+
+def run_import(
+    db: sqlite3.Connection,
+    kind: str,
+    stream: Iterable[str],
+    fmt: str = "csv",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sync_vectors: bool = True
+) -> ImportReport:
+    """Import one catalog file, then re-sync touched universities once"""
+    if kind not in IMPORTERS:
+        raise ValueError(f"Unknown import kind: {kind}")
+
+    importer = CatalogImporter(db, batch_size=batch_size)
+    report = IMPORTERS[kind](importer, iter_records(stream, fmt))
+    logger.info(
+        f"Catalog import ({kind}): {report.inserted} inserted, {report.updated} updated, "
+        f"{report.skipped} skipped, {report.failed} failed"
+    )
+
+    if report.inserted or report.updated:
+        if sync_vectors and report.university_ids:
+            try:
+                from services.university_rag_service import get_rag_service
+                report.vector_sync = get_rag_service().sync_universities(sorted(report.university_ids))
+            except Exception as e:
+                logger.error(f"Vector re-sync after import failed: {e}")
+                report.vector_sync = {"error": str(e)}
+        catalog_version.bump(sorted(report.university_ids) if kind != "scholarships" else [])
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from config import settings
+
+    parser = argparse.ArgumentParser(description="Bulk import catalog data from CSV or JSONL")
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--format", dest="fmt", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--db", default=settings.DATABASE_NAME)
+    parser.add_argument("--no-vector-sync", action="store_true")
+    args = parser.parse_args()
+
+    fmt = args.fmt or ("jsonl" if os.path.splitext(args.path)[1].lower() in (".jsonl", ".ndjson") else "csv")
+    from sqlite import open_stores
+    conn = open_stores(args.db)
+    try:
+        with io.open(args.path, "r", encoding="utf-8", newline="") as stream:
+            result = run_import(
+                conn, args.kind, stream, fmt=fmt,
+                batch_size=args.batch_size, sync_vectors=not args.no_vector_sync
+            )
+    finally:
+        conn.close()
+    print(json.dumps(result.to_dict(), indent=2))
@@ -0,0 +1,282 @@
+# services/catalog_snapshot.py - Immutable in-memory copy of the university catalog
+"""
+Universities, majors and university_majors are loaded into one read-only
+CatalogSnapshot with the lookups the read endpoints need: by id, by
+country, by major (ids kept in tuition order) and a tuition-sorted array
+for range filters. Readers grab `get_catalog_snapshot()` once per request
+and never touch SQLite.
+
+A catalog write builds a complete new snapshot and replaces the reference
+in one assignment, so a reader sees either the old catalog or the new one,
+never a mix. The catalog version is per process, so a snapshot older than
+CATALOG_SNAPSHOT_TTL is also rebuilt, in a background thread, while the
+current one keeps serving.
+"""
+import sqlite3
+import threading
+import time
+import bisect
+import logging
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from config import settings
+from sqlite import connect_catalog
+from services import catalog_version
+
+logger = logging.getLogger(__name__)
+
+
+class University(NamedTuple):
+    id: int
+    name: str
+    country: Optional[str]
+    city: Optional[str]
+    tuition_fee: Optional[int]
+    min_gpa: Optional[float]
+    language: Optional[str]
+    scholarship_available: int
+    success_weight: Optional[float]
+    overview: Optional[str]
+    duration: Optional[str]
+    accommodation_info: Optional[str]
+    website: Optional[str]
+    ranking: Optional[int]
+    acceptance_rate: Optional[float]
+    is_active: int
+
+
+class UniversityMajor(NamedTuple):
+    id: int
+    university_id: int
+    major_name: str
+
+
+class Major(NamedTuple):
+    id: int
+    name: str
+    category: Optional[str]
+    difficulty: Optional[str]
+    career_paths: Optional[str]
+    average_cost: Optional[int]
+
+
+UNIVERSITY_COLUMNS = ", ".join(University._fields)
+MAJOR_COLUMNS = ", ".join(Major._fields)
+
+
+def _major_key(name: str) -> str:
+    # Same normalisation as the chatbot's major filter (LOWER(TRIM(major_name)))
+    return name.strip().lower()
+
+
+def _tuition_order(uni: University) -> Tuple:
+    # ORDER BY tuition_fee ASC: SQLite sorts NULLs first
+    return (uni.tuition_fee is not None, uni.tuition_fee or 0, uni.id)
+
+
+class CatalogSnapshot:
+    """One consistent, read-only view of the catalog tables"""
+
+    def __init__(
+        self,
+        version: int,
+        universities: List[University],
+        university_majors: List[UniversityMajor],
+        majors: List[Major],
+    ):
+        self.version = version
+        self.built_at = time.monotonic()
+
+        self.by_id: Mapping[int, University] = MappingProxyType({u.id: u for u in universities})
+        active = sorted((u for u in universities if u.is_active), key=lambda u: u.id)
+        self.active: Tuple[University, ...] = tuple(active)
+
+        by_tuition = sorted(active, key=_tuition_order)
+        self.by_tuition: Tuple[University, ...] = tuple(by_tuition)
+        # Parallel key array for bisecting on a tuition ceiling
+        self._tuition_keys: Tuple[Tuple, ...] = tuple(_tuition_order(u) for u in by_tuition)
+
+        majors_of: Dict[int, List[UniversityMajor]] = {}
+        for um in university_majors:
+            if um.major_name:
+                majors_of.setdefault(um.university_id, []).append(um)
+        self.majors_of: Mapping[int, Tuple[UniversityMajor, ...]] = MappingProxyType({
+            uid: tuple(sorted(ums, key=lambda um: um.major_name)) for uid, ums in majors_of.items()
+        })
+
+        by_country: Dict[str, List[University]] = {}
+        by_major: Dict[str, List[University]] = {}
+        for uni in by_tuition:
+            if uni.country:
+                by_country.setdefault(uni.country, []).append(uni)
+            for key in {_major_key(um.major_name) for um in self.majors_of.get(uni.id, ())}:
+                by_major.setdefault(key, []).append(uni)
+        self.by_country: Mapping[str, Tuple[University, ...]] = MappingProxyType(
+            {c: tuple(us) for c, us in by_country.items()})
+        self.by_major: Mapping[str, Tuple[University, ...]] = MappingProxyType(
+            {k: tuple(us) for k, us in by_major.items()})
+        self._major_ids: Mapping[str, frozenset] = MappingProxyType(
+            {k: frozenset(u.id for u in us) for k, us in by_major.items()})
+
+        self.majors: Mapping[int, Major] = MappingProxyType({m.id: m for m in majors})
+        majors_by_name: Dict[str, Major] = {}
+        for m in sorted(majors, key=lambda m: m.id):
+            if m.name:
+                majors_by_name.setdefault(_major_key(m.name), m)
+        self.majors_by_name: Mapping[str, Major] = MappingProxyType(majors_by_name)
+
+    def __len__(self):
+        return len(self.active)
+
+    @classmethod
+    def load(cls, db: sqlite3.Connection, version: int) -> "CatalogSnapshot":
+        db.row_factory = None
+        universities = [University(*row) for row in db.execute(f"SELECT {UNIVERSITY_COLUMNS} FROM universities")]
+        university_majors = [
+            UniversityMajor(*row) for row in db.execute("SELECT id, university_id, major_name FROM university_majors")
+        ]
+        majors = [Major(*row) for row in db.execute(f"SELECT {MAJOR_COLUMNS} FROM majors")]
+        return cls(version, universities, university_majors, majors)
+
+    def get(self, university_id: int, active_only: bool = True) -> Optional[University]:
+        uni = self.by_id.get(university_id)
+        if uni is None or (active_only and not uni.is_active):
+            return None
+        return uni
+
+    def get_many(self, university_ids: List[int], active_only: bool = True) -> Tuple[List[University], List[int]]:
+        """Universities for the given ids in request order (duplicates dropped), plus the ids not found"""
+        found, missing = [], []
+        for uid in dict.fromkeys(university_ids):
+            uni = self.get(uid, active_only)
+            if uni is None:
+                missing.append(uid)
+            else:
+                found.append(uni)
+        return found, missing
+
+    def catalog_major(self, major_name: str) -> Optional[Major]:
+        """The majors-table entry (category, difficulty, ...) for a university_majors name"""
+        return self.majors_by_name.get(_major_key(major_name))
+
+    def major_names(self, university_id: int) -> List[str]:
+        return [um.major_name for um in self.majors_of.get(university_id, ())]
+
+    def filter_universities(self, filters: Dict[str, Any], limit: int = 20) -> List[University]:
+        """
+        In-memory equivalent of query_builders.filtered_universities_query:
+        every filter narrows the result, cheapest tuition first.
+        """
+        country = filters.get("country")
+        major = _major_key(filters["major"]) if filters.get("major") else None
+        max_tuition = filters.get("max_tuition") if (filters.get("max_tuition") or 0) > 0 else None
+        min_gpa = filters.get("min_gpa") if (filters.get("min_gpa") or 0) > 0 else None
+        scholarship = bool(filters.get("scholarship_track"))
+
+        # Every candidate list is in tuition order; walk the shortest one.
+        # The full list's length under a ceiling comes from a bisect.
+        walk: Tuple[University, ...] = self.by_tuition
+        walk_len = len(walk)
+        if max_tuition is not None:
+            walk_len = bisect.bisect_right(self._tuition_keys, (True, max_tuition, float("inf")))
+        for candidates in (
+            self.by_country.get(country, ()) if country else None,
+            self.by_major.get(major, ()) if major else None,
+        ):
+            if candidates is not None and len(candidates) < walk_len:
+                walk, walk_len = candidates, len(candidates)
+        major_ids = self._major_ids.get(major, frozenset()) if major else None
+
+        result: List[University] = []
+        for uni in walk:
+            if max_tuition is not None and (uni.tuition_fee is None or uni.tuition_fee > max_tuition):
+                if uni.tuition_fee is not None:
+                    break  # nothing later in tuition order can pass
+                continue
+            if country and uni.country != country:
+                continue
+            if major_ids is not None and uni.id not in major_ids:
+                continue
+            if min_gpa is not None and (uni.min_gpa is None or uni.min_gpa > min_gpa):
+                continue
+            if scholarship and not uni.scholarship_available:
+                continue
+            result.append(uni)
+            if len(result) >= limit:
+                break
+        return result
+
+
+class CatalogSnapshotService:
+    """Owns the current snapshot and swaps in a rebuilt one after catalog writes"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._build_lock = threading.Lock()
+        self._refreshing = False
+        catalog_version.subscribe(self._on_catalog_change)
+
+    def _on_catalog_change(self, version: int, university_ids: Optional[List[int]]):
+        if university_ids is not None and not university_ids:
+            return  # scholarship-only change
+        if self._snapshot is not None:
+            self.rebuild()
+
+    def _load(self) -> CatalogSnapshot:
+        version = catalog_version.current_version()
+        conn = connect_catalog()
+        try:
+            snapshot = CatalogSnapshot.load(conn, version)
+        finally:
+            conn.close()
+        logger.info(f"Catalog snapshot v{version} loaded: {len(snapshot)} active universities")
+        return snapshot
+
+    def rebuild(self) -> CatalogSnapshot:
+        with self._build_lock:
+            # Readers keep the old snapshot until this single assignment
+            self._snapshot = self._load()
+            return self._snapshot
+
+    def _refresh_in_background(self):
+        with self._build_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.error(f"Catalog snapshot refresh failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="catalog-snapshot-refresh", daemon=True).start()
+
+    def current(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._build_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                snapshot = self._snapshot
+        elif time.monotonic() - snapshot.built_at > self.ttl:
+            self._refresh_in_background()
+        return snapshot
+
+
+_service: Optional[CatalogSnapshotService] = None
+
+
+def get_snapshot_service() -> CatalogSnapshotService:
+    global _service
+    if _service is None:
+        _service = CatalogSnapshotService(ttl=settings.CATALOG_SNAPSHOT_TTL)
+    return _service
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """The current catalog snapshot (built on first use)"""
+    return get_snapshot_service().current()
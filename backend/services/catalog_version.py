@@ -0,0 +1,44 @@
+# services/catalog_version.py - Process-wide catalog version counter
+import threading
+import logging
+from typing import Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_version = 0
+_listeners: List[Callable[[int, Optional[List[int]]], None]] = []
+
+
+def current_version() -> int:
+    """Return the current catalog version"""
+    return _version
+
+
+def subscribe(listener: Callable[[int, Optional[List[int]]], None]):
+    """
+    Register a callback invoked after every catalog change.
+    The callback receives the new version and the changed university ids
+    (None when the change is not limited to specific universities).
+    """
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def bump(university_ids: Optional[Iterable[int]] = None) -> int:
+    """Record a catalog write (universities, majors, scholarships, partners) and notify caches"""
+    global _version
+    changed = list(university_ids) if university_ids is not None else None
+    with _lock:
+        _version += 1
+        version = _version
+        listeners = list(_listeners)
+
+    for listener in listeners:
+        try:
+            listener(version, changed)
+        except Exception as e:
+            logger.error(f"Catalog listener {listener} failed: {e}")
+
+    return version
@@ -0,0 +1,345 @@
+# services/facet_service.py - In-memory filter facets for the chatbot filter panel
+"""
+Every active university gets a slot; each facet value (country, major,
+scholarship, tuition/GPA histogram bucket) keeps a Python int used as a
+bitset over those slots. Counts for a selection are ANDs and popcounts,
+so the filter panel can ask for fresh numbers on every click.
+
+Counts follow the usual multi-facet convention: a facet's counts apply
+every selected filter except its own, so picking a country still shows
+how many universities each other country would give.
+
+Catalog bumps naming university ids patch just those slots; a bump without
+ids (or a value outside the histogram edges) rebuilds on the next read.
+"""
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlite import connect_catalog
+from services import catalog_version
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_BUCKETS = 20
+
+
+def _mask_from_slots(slots: Iterable[int], size: int) -> int:
+    """Bitset with the given slots set, built without per-bit big-int shifts"""
+    buf = bytearray((size + 7) // 8)
+    for slot in slots:
+        buf[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _major_key(name: str) -> str:
+    # Same normalisation as the chatbot's major filter (LOWER(TRIM(major_name)))
+    return name.strip().lower()
+
+
+class Histogram:
+    """Fixed-width buckets over [lo, hi] with one bitset per bucket"""
+
+    def __init__(self, values: List[Optional[float]], buckets: int = HISTOGRAM_BUCKETS):
+        present = [v for v in values if v is not None]
+        self.lo = min(present) if present else 0.0
+        self.hi = max(present) if present else 0.0
+        self.size = buckets
+        self.width = (self.hi - self.lo) / buckets or 1.0
+        self.members: List[set] = [set() for _ in range(buckets)]
+        for slot, value in enumerate(values):
+            if value is not None:
+                self.members[self.bucket(value)].add(slot)
+        self.masks = [_mask_from_slots(m, len(values)) for m in self.members]
+
+    def covers(self, value: Optional[float]) -> bool:
+        return value is None or self.lo <= value <= self.hi
+
+    def bucket(self, value: float) -> int:
+        return min(int((value - self.lo) / self.width), self.size - 1)
+
+    def add(self, slot: int, value: Optional[float]):
+        if value is not None:
+            b = self.bucket(value)
+            self.members[b].add(slot)
+            self.masks[b] |= 1 << slot
+
+    def remove(self, slot: int, value: Optional[float]):
+        if value is not None:
+            b = self.bucket(value)
+            self.members[b].discard(slot)
+            self.masks[b] &= ~(1 << slot)
+
+    def at_most(self, limit: float, values: List[Optional[float]], size: int) -> int:
+        """Slots whose value is <= limit (NULLs never match, as in SQL)"""
+        if limit >= self.hi:
+            mask = 0
+            for m in self.masks:
+                mask |= m
+            return mask
+        if limit < self.lo:
+            return 0
+        b = self.bucket(limit)
+        mask = 0
+        for m in self.masks[:b]:
+            mask |= m
+        # The bucket containing the limit is split value by value
+        return mask | _mask_from_slots((s for s in self.members[b] if values[s] <= limit), size)
+
+    def counts(self, base: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "min": round(self.lo + i * self.width, 2),
+                "max": round(self.lo + (i + 1) * self.width, 2),
+                "count": (m & base).bit_count(),
+            }
+            for i, m in enumerate(self.masks)
+        ]
+
+
+class FacetIndex:
+    """Bitsets for one catalog state; mutated in place by incremental updates"""
+
+    def __init__(self, rows: List[sqlite3.Row], majors: Dict[int, List[str]]):
+        self.ids: List[int] = [row["id"] for row in rows]
+        self.slot_of: Dict[int, int] = {uid: slot for slot, uid in enumerate(self.ids)}
+        self.country: List[Optional[str]] = [row["country"] for row in rows]
+        self.majors: List[List[str]] = [majors.get(uid, []) for uid in self.ids]
+        self.tuition: List[Optional[float]] = [row["tuition_fee"] for row in rows]
+        self.gpa: List[Optional[float]] = [row["min_gpa"] for row in rows]
+        size = len(self.ids)
+
+        self.active = _mask_from_slots(range(size), size)
+        self.scholarship = _mask_from_slots((s for s, row in enumerate(rows) if row["scholarship_available"]), size)
+
+        country_slots: Dict[str, List[int]] = {}
+        major_slots: Dict[str, List[int]] = {}
+        self.major_names: Dict[str, str] = {}
+        for slot in range(size):
+            if self.country[slot]:
+                country_slots.setdefault(self.country[slot], []).append(slot)
+            for name in self.majors[slot]:
+                key = _major_key(name)
+                self.major_names.setdefault(key, name.strip())
+                major_slots.setdefault(key, []).append(slot)
+        self.by_country = {c: _mask_from_slots(s, size) for c, s in country_slots.items()}
+        self.by_major = {k: _mask_from_slots(s, size) for k, s in major_slots.items()}
+
+        self.tuition_hist = Histogram(self.tuition)
+        self.gpa_hist = Histogram(self.gpa)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    # ----- incremental updates -----
+
+    def _clear_slot(self, slot: int):
+        bit = 1 << slot
+        self.active &= ~bit
+        self.scholarship &= ~bit
+        country = self.country[slot]
+        if country in self.by_country:
+            self.by_country[country] &= ~bit
+            if not self.by_country[country]:
+                del self.by_country[country]
+        for name in self.majors[slot]:
+            key = _major_key(name)
+            if key in self.by_major:
+                self.by_major[key] &= ~bit
+                if not self.by_major[key]:
+                    del self.by_major[key]
+                    self.major_names.pop(key, None)
+        self.tuition_hist.remove(slot, self.tuition[slot])
+        self.gpa_hist.remove(slot, self.gpa[slot])
+        self.country[slot] = None
+        self.majors[slot] = []
+        self.tuition[slot] = None
+        self.gpa[slot] = None
+
+    def update(self, university_ids: List[int], rows: Dict[int, sqlite3.Row], majors: Dict[int, List[str]]) -> bool:
+        """
+        Re-index the given universities from fresh rows (missing or inactive
+        rows are removed). Returns False when a value falls outside the
+        histogram edges and the index has to be rebuilt instead.
+        """
+        for uid in university_ids:
+            row = rows.get(uid)
+            if row is not None and row["is_active"] and not (
+                self.tuition_hist.covers(row["tuition_fee"]) and self.gpa_hist.covers(row["min_gpa"])
+            ):
+                return False
+
+        for uid in university_ids:
+            slot = self.slot_of.get(uid)
+            if slot is not None:
+                self._clear_slot(slot)
+            row = rows.get(uid)
+            if row is None or not row["is_active"]:
+                continue
+            if slot is None:
+                slot = len(self.ids)
+                self.ids.append(uid)
+                self.slot_of[uid] = slot
+                self.country.append(None)
+                self.majors.append([])
+                self.tuition.append(None)
+                self.gpa.append(None)
+
+            bit = 1 << slot
+            self.active |= bit
+            if row["scholarship_available"]:
+                self.scholarship |= bit
+            self.country[slot] = row["country"]
+            if row["country"]:
+                self.by_country[row["country"]] = self.by_country.get(row["country"], 0) | bit
+            self.majors[slot] = majors.get(uid, [])
+            for name in self.majors[slot]:
+                key = _major_key(name)
+                self.major_names.setdefault(key, name.strip())
+                self.by_major[key] = self.by_major.get(key, 0) | bit
+            self.tuition[slot] = row["tuition_fee"]
+            self.gpa[slot] = row["min_gpa"]
+            self.tuition_hist.add(slot, row["tuition_fee"])
+            self.gpa_hist.add(slot, row["min_gpa"])
+        return True
+
+    # ----- queries -----
+
+    def selection_masks(self, selection: Dict[str, Any]) -> Dict[str, int]:
+        """One bitset per active filter, keyed by facet name"""
+        masks: Dict[str, int] = {}
+        if selection.get("country"):
+            masks["country"] = self.by_country.get(selection["country"], 0)
+        if selection.get("major"):
+            masks["major"] = self.by_major.get(_major_key(selection["major"]), 0)
+        if selection.get("scholarship_track"):
+            masks["scholarship"] = self.scholarship
+        if selection.get("max_tuition") and selection["max_tuition"] > 0:
+            masks["tuition"] = self.tuition_hist.at_most(selection["max_tuition"], self.tuition, self.size)
+        if selection.get("min_gpa") and selection["min_gpa"] > 0:
+            # The student's GPA must meet the university's minimum
+            masks["gpa"] = self.gpa_hist.at_most(selection["min_gpa"], self.gpa, self.size)
+        return masks
+
+    def counts(self, selection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        masks = self.selection_masks(selection or {})
+
+        def base_without(facet: Optional[str]) -> int:
+            base = self.active
+            for name, mask in masks.items():
+                if name != facet:
+                    base &= mask
+            return base
+
+        country_base = base_without("country")
+        major_base = base_without("major")
+        return {
+            "total": base_without(None).bit_count(),
+            "countries": [
+                {"value": c, "count": (self.by_country[c] & country_base).bit_count()}
+                for c in sorted(self.by_country)
+            ],
+            "majors": [
+                {"value": self.major_names[k], "count": (self.by_major[k] & major_base).bit_count()}
+                for k in sorted(self.by_major, key=lambda k: self.major_names[k])
+            ],
+            "scholarship": (self.scholarship & base_without("scholarship")).bit_count(),
+            "tuition": self.tuition_hist.counts(base_without("tuition")),
+            "gpa": self.gpa_hist.counts(base_without("gpa")),
+        }
+
+    def value_range(self, values: List[Optional[float]]) -> Dict[str, Optional[float]]:
+        present = [v for v in values if v is not None]
+        return {"min": min(present) if present else None, "max": max(present) if present else None}
+
+    def filter_options(self) -> Dict[str, Any]:
+        """Payload of /chatbot/university/filters: option lists, ranges and unfiltered counts"""
+        return {
+            "countries": sorted(self.by_country),
+            "majors": sorted(self.major_names.values()),
+            "tuition_range": self.value_range(self.tuition),
+            "gpa_range": self.value_range(self.gpa),
+            "facets": self.counts(),
+        }
+
+
+FACET_COLUMNS = "id, country, tuition_fee, min_gpa, scholarship_available, is_active"
+
+
+def _load(db: sqlite3.Connection, university_ids: Optional[List[int]] = None) -> Tuple[List[sqlite3.Row], Dict[int, List[str]]]:
+    db.row_factory = sqlite3.Row
+    if university_ids is None:
+        rows = db.execute(f"SELECT {FACET_COLUMNS} FROM universities WHERE is_active = 1 ORDER BY id").fetchall()
+        # Rows of inactive universities are simply never looked up
+        major_rows = db.execute("SELECT university_id, major_name FROM university_majors").fetchall()
+    else:
+        placeholders = ",".join("?" for _ in university_ids)
+        rows = db.execute(f"SELECT {FACET_COLUMNS} FROM universities WHERE id IN ({placeholders})", university_ids).fetchall()
+        major_rows = db.execute(
+            f"SELECT university_id, major_name FROM university_majors WHERE university_id IN ({placeholders})",
+            university_ids
+        ).fetchall()
+
+    majors: Dict[int, List[str]] = {}
+    for uid, name in major_rows:
+        if name and name.strip():
+            majors.setdefault(uid, []).append(name)
+    return rows, majors
+
+
+class FacetService:
+    def __init__(self):
+        self._index: Optional[FacetIndex] = None
+        self._lock = threading.Lock()
+        catalog_version.subscribe(self._on_catalog_change)
+
+    def _on_catalog_change(self, version: int, university_ids: Optional[List[int]]):
+        if university_ids is not None and not university_ids:
+            return  # scholarship-only change; no university facet moved
+        with self._lock:
+            if self._index is None:
+                return
+            if university_ids is None:
+                self._index = None
+                return
+            conn = connect_catalog()
+            try:
+                rows, majors = _load(conn, list(university_ids))
+            finally:
+                conn.close()
+            if not self._index.update(list(university_ids), {row["id"]: row for row in rows}, majors):
+                self._index = None
+                logger.info("Facet histogram range changed; rebuilding on next read")
+
+    def _current(self, db: Optional[sqlite3.Connection] = None) -> FacetIndex:
+        """The index, built on first use (opens a connection only if none is given)"""
+        if self._index is None:
+            conn = db if db is not None else connect_catalog()
+            try:
+                rows, majors = _load(conn)
+            finally:
+                if db is None:
+                    conn.close()
+            index = FacetIndex(rows, majors)
+            self._index = index
+            logger.info(f"Built filter facets for {index.size} universities")
+        return self._index
+
+    def filter_options(self, db: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        with self._lock:
+            return self._current(db).filter_options()
+
+    def counts(self, selection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self._lock:
+            return self._current().counts(selection)
+
+
+_facet_service: Optional[FacetService] = None
+
+
+def get_facet_service() -> FacetService:
+    global _facet_service
+    if _facet_service is None:
+        _facet_service = FacetService()
+    return _facet_service
@@ -1,7 +1,25 @@
 import sqlite3
 from datetime import datetime
 from typing import Optional
+import logging
 
+logger = logging.getLogger(__name__)
+
+
+def _adjust_unread_count(cursor: sqlite3.Cursor, user_id: int, delta: int):
+    """Apply a delta to the cached unread counter, seeding it on first use"""
+    cursor.execute(
+        "UPDATE notification_counters SET unread_count = MAX(unread_count + ?, 0) WHERE user_id = ?",
+        (delta, user_id)
+    )
+    if cursor.rowcount == 0:
+        # No counter yet: seed it from the notifications table, which already
+        # reflects the change being applied.
+        cursor.execute(
+            """INSERT OR REPLACE INTO notification_counters (user_id, unread_count)
+            SELECT ?, COUNT(*) FROM notifications WHERE user_id = ? AND is_read = 0""",
+            (user_id, user_id)
+        )
 
 def create_notification(
     db: sqlite3.Connection,
@@ -19,10 +37,11 @@ def create_notification(
         VALUES (?, ?, ?, ?, 0, ?)""",
         (user_id, title, message, notification_type, link)
     )
+    notification_id = cursor.lastrowid
+    _adjust_unread_count(cursor, user_id, 1)
     db.commit()
     
-    notification_id = cursor.lastrowid
-    print(f" Created notification #{notification_id} for user {user_id}: {title}")
+    logger.debug("Created notification #%s for user %s: %s", notification_id, user_id, title)
     
     return notification_id
 
@@ -125,6 +144,19 @@ def notify_document_uploaded(
         link="/profile/documents"
     )
 
+def user_notifications_query(user_id: int, is_read: Optional[bool] = None, limit: int = 50):
+    """(sql, params) for a user's newest notifications"""
+    query = "SELECT id, title, message, type, is_read, link, created_at FROM notifications WHERE user_id = ?"
+    params = [user_id]
+    
+    # Inline the literal so the planner can pick the partial unread index
+    if is_read is not None:
+        query += " AND is_read = 1" if is_read else " AND is_read = 0"
+    
+    query += " ORDER BY created_at DESC LIMIT ?"
+    params.append(limit)
+    return query, params
+
 def get_user_notifications(
     db: sqlite3.Connection,
     user_id: int,
@@ -133,17 +165,7 @@ def get_user_notifications(
 ):
     """Get notifications for a user"""
     cursor = db.cursor()
-    
-    query = "SELECT id, title, message, type, is_read, link, created_at FROM notifications WHERE user_id = ?"
-    params = [user_id]
-    
-    if is_read is not None:
-        query += " AND is_read = ?"
-        params.append(1 if is_read else 0)
-    
-    query += " ORDER BY created_at DESC LIMIT ?"
-    params.append(limit)
-    
+    query, params = user_notifications_query(user_id, is_read, limit)
     cursor.execute(query, tuple(params))
     
     notifications = []
@@ -164,11 +186,20 @@ def mark_notification_read(db: sqlite3.Connection, notification_id: int, user_id
     """Mark a notification as read"""
     cursor = db.cursor()
     cursor.execute(
-        "UPDATE notifications SET is_read = 1 WHERE id = ? AND user_id = ?",
+        "UPDATE notifications SET is_read = 1 WHERE id = ? AND user_id = ? AND is_read = 0",
         (notification_id, user_id)
     )
-    db.commit()
-    return cursor.rowcount > 0
+    if cursor.rowcount > 0:
+        _adjust_unread_count(cursor, user_id, -1)
+        db.commit()
+        return True
+    
+    # Already read notifications still count as found
+    cursor.execute(
+        "SELECT 1 FROM notifications WHERE id = ? AND user_id = ?",
+        (notification_id, user_id)
+    )
+    return cursor.fetchone() is not None
 
 def mark_all_read(db: sqlite3.Connection, user_id: int) -> int:
     """Mark all notifications as read for a user"""
@@ -177,12 +208,28 @@ def mark_all_read(db: sqlite3.Connection, user_id: int) -> int:
         "UPDATE notifications SET is_read = 1 WHERE user_id = ? AND is_read = 0",
         (user_id,)
     )
+    marked = cursor.rowcount
+    cursor.execute(
+        """INSERT INTO notification_counters (user_id, unread_count) VALUES (?, 0)
+        ON CONFLICT(user_id) DO UPDATE SET unread_count = 0""",
+        (user_id,)
+    )
     db.commit()
-    return cursor.rowcount
+    return marked
 
 def get_unread_count(db: sqlite3.Connection, user_id: int) -> int:
-    """Get count of unread notifications"""
+    """Get count of unread notifications from the cached per-user counter"""
     cursor = db.cursor()
+    cursor.execute(
+        "SELECT unread_count FROM notification_counters WHERE user_id = ?",
+        (user_id,)
+    )
+    row = cursor.fetchone()
+    if row is not None:
+        return row[0]
+    
+    # No counter yet: count directly (served by the partial unread index). Reads
+    # don't write; the next create or mark-read seeds it via _adjust_unread_count.
     cursor.execute(
         "SELECT COUNT(*) FROM notifications WHERE user_id = ? AND is_read = 0",
         (user_id,)
@@ -4,6 +4,10 @@ import string
 from datetime import datetime, timedelta
 from config import settings
 import sqlite3
+import logging
+from db_writer import db_writer
+
+logger = logging.getLogger(__name__)
 
 def generate_otp(length: int = 6) -> str:
     """Generate a random OTP code"""
@@ -13,11 +17,10 @@ def send_otp(phone: str, otp_code: str) -> bool:
     """
     Send OTP via SMS
     In production, integrate with Twilio or similar service
-    For now, just print to console (simulated)
+    For now, just log it (simulated)
     """
     if settings.SMS_PROVIDER == "simulated":
-        print(f"📱 [SIMULATED SMS] Sending OTP to {phone}: {otp_code}")
-        print(f"   (In production, this would use {settings.SMS_PROVIDER})")
+        logger.info("[SIMULATED SMS] Sending OTP to %s: %s", phone, otp_code)
         return True
     elif settings.SMS_PROVIDER == "twilio":
         # TODO: Integrate Twilio
@@ -29,19 +32,35 @@ def send_otp(phone: str, otp_code: str) -> bool:
         #     to=phone
         # )
         # return message.sid is not None
-        print(f"Twilio integration not yet configured. OTP: {otp_code}")
+        logger.warning("Twilio integration not yet configured. OTP: %s", otp_code)
         return True
     else:
-        print(f"Unknown SMS provider: {settings.SMS_PROVIDER}")
+        logger.error("Unknown SMS provider: %s", settings.SMS_PROVIDER)
         return False
 
-def create_otp(db: sqlite3.Connection, phone: str) -> tuple[str, bool]:
+def _store_otp(db: sqlite3.Connection, phone: str, otp_code: str, expires_at: datetime):
+    """Write job: replace the phone's pending OTP"""
+    cursor = db.cursor()
+    
+    # Delete any existing OTPs for this phone
+    cursor.execute(
+        "DELETE FROM otp_verification WHERE phone = ? AND is_verified = 0",
+        (phone,)
+    )
+    
+    # Insert new OTP
+    cursor.execute(
+        """INSERT INTO otp_verification (phone, otp_code, expires_at, is_verified)
+           VALUES (?, ?, ?, 0)""",
+        (phone, otp_code, expires_at)
+    )
+    db.commit()
+
+def create_otp(phone: str) -> tuple[str, bool]:
     """
     Create and store OTP for a phone number
     Returns (otp_code, success)
     """
-    cursor = db.cursor()
-    
     # Generate OTP
     otp_code = generate_otp(settings.OTP_LENGTH)
     
@@ -49,27 +68,15 @@ def create_otp(db: sqlite3.Connection, phone: str) -> tuple[str, bool]:
     expires_at = datetime.now() + timedelta(minutes=settings.OTP_EXPIRY_MINUTES)
     
     try:
-        # Delete any existing OTPs for this phone
-        cursor.execute(
-            "DELETE FROM otp_verification WHERE phone = ? AND is_verified = 0",
-            (phone,)
-        )
-        
-        # Insert new OTP
-        cursor.execute(
-            """INSERT INTO otp_verification (phone, otp_code, expires_at, is_verified)
-               VALUES (?, ?, ?, 0)""",
-            (phone, otp_code, expires_at)
-        )
-        db.commit()
+        db_writer().write(_store_otp, phone, otp_code, expires_at)
         
-        # Send OTP
+        # Send OTP (after the commit; the writer thread never waits on the SMS provider)
         send_result = send_otp(phone, otp_code)
         
         return otp_code, send_result
         
     except Exception as e:
-        print(f"Error creating OTP: {e}")
+        logger.error("Error creating OTP: %s", e)
         return None, False
 
 def verify_otp(db: sqlite3.Connection, phone: str, otp_code: str) -> bool:
@@ -91,25 +98,25 @@ def verify_otp(db: sqlite3.Connection, phone: str, otp_code: str) -> bool:
     result = cursor.fetchone()
     
     if not result:
-        print(f"No OTP found for phone: {phone}")
+        logger.info("No OTP found for phone: %s", phone)
         return False
     
     otp_id, stored_otp, expires_at, is_verified = result
     
     # Check if already verified
     if is_verified:
-        print(f"OTP already used for phone: {phone}")
+        logger.info("OTP already used for phone: %s", phone)
         return False
     
     # Check if expired
     expires_at_dt = datetime.fromisoformat(expires_at)
     if datetime.now() > expires_at_dt:
-        print(f"OTP expired for phone: {phone}")
+        logger.info("OTP expired for phone: %s", phone)
         return False
     
     # Verify code
     if stored_otp != otp_code:
-        print(f"Invalid OTP code for phone: {phone}")
+        logger.info("Invalid OTP code for phone: %s", phone)
         return False
     
     # Mark as verified
@@ -119,7 +126,7 @@ def verify_otp(db: sqlite3.Connection, phone: str, otp_code: str) -> bool:
     )
     db.commit()
     
-    print(f"✅ OTP verified successfully for phone: {phone}")
+    logger.info("OTP verified for phone: %s", phone)
     return True
 
 def cleanup_expired_otps(db: sqlite3.Connection):
@@ -131,5 +138,5 @@ def cleanup_expired_otps(db: sqlite3.Connection):
     )
     deleted = cursor.rowcount
     db.commit()
-    print(f"Cleaned up {deleted} expired/used OTPs")
+    logger.info("Cleaned up %s expired/used OTPs", deleted)
     return deleted
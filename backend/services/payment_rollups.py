@@ -0,0 +1,198 @@
+# services/payment_rollups.py - Daily payment totals kept in step with payments
+"""
+payment_rollups (migration 0007) holds one row per (day, feature, payment
+method, status) with the number and sum of the payments in it, so revenue
+and conversion over any date range read a few rows per day instead of
+every payment. day is when the payment reached its status: completed_at,
+or created_at while it is Pending.
+
+Every write that inserts a payment or changes its status, amount or dates
+moves it between rows in the same transaction:
+
+    adjust_rollup(cursor, payment_id, -1)   # before the UPDATE
+    cursor.execute("UPDATE payments SET status = ... WHERE id = ?", ...)
+    adjust_rollup(cursor, payment_id, +1)   # after it
+
+A payment written some other way (by hand, an old process) makes the
+rollups drift; reconcile finds and repairs the affected days:
+
+    python -m services.payment_rollups backfill [--since YYYY-MM-DD]
+    python -m services.payment_rollups reconcile [--since YYYY-MM-DD] [--repair]
+"""
+import json
+import sqlite3
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from services.query_builders import payment_rollups_query
+
+logger = logging.getLogger(__name__)
+
+# Converted: the payment went from Pending to Completed (and may since have been refunded)
+CONVERTED_STATUSES = ("Completed", "Refunded")
+
+# The rollup row a payment belongs to; NULLs become 0/'' since they are part of the key
+_DAY = "date(COALESCE(completed_at, created_at))"
+_BUCKET = f"{_DAY}, COALESCE(feature_id, 0), COALESCE(payment_method, ''), COALESCE(status, 'Pending')"
+_KEY = "day, feature_id, payment_method, status"
+_ADD = (
+    f"ON CONFLICT({_KEY}) DO UPDATE SET "
+    "payments = payments + excluded.payments, amount = amount + excluded.amount"
+)
+_TOLERANCE = 0.005  # REAL sums drift in the last digits after many +/- updates
+
+
+def adjust_rollup(cursor, payment_id: int, sign: int):
+    """Add (+1) or remove (-1) the payment's current row in payments from its rollup"""
+    cursor.execute(
+        f"""INSERT INTO payment_rollups ({_KEY}, payments, amount)
+        SELECT {_BUCKET}, ?, ? * COALESCE(amount, 0) FROM payments WHERE id = ? {_ADD}""",
+        (sign, sign, payment_id)
+    )
+
+
+def _since_clause(since: Optional[str]) -> Tuple[str, List[Any]]:
+    if since is None:
+        return "", []
+    return f"WHERE {_DAY} >= ?", [since]
+
+
+def rebuild_rollups(conn: sqlite3.Connection, since: Optional[str] = None) -> int:
+    """
+    Recompute the rollups from payments (from day `since` on, or all);
+    returns rows written. Doesn't commit: backfill() runs it as a write job.
+    """
+    where, params = _since_clause(since)
+    conn.execute("DELETE FROM payment_rollups" + (" WHERE day >= ?" if since else ""), params)
+    cursor = conn.execute(
+        f"""INSERT INTO payment_rollups ({_KEY}, payments, amount)
+        SELECT {_BUCKET}, COUNT(*), SUM(COALESCE(amount, 0)) FROM payments {where}
+        GROUP BY 1, 2, 3, 4""",
+        params
+    )
+    return cursor.rowcount
+
+
+def backfill(conn: sqlite3.Connection, since: Optional[str] = None) -> int:
+    """Write job: rebuild_rollups and commit"""
+    rows = rebuild_rollups(conn, since)
+    conn.commit()
+    logger.info(f"Rebuilt payment rollups{f' from {since}' if since else ''}: {rows} rows")
+    return rows
+
+
+def _expected(conn: sqlite3.Connection, since: Optional[str]) -> Dict[tuple, Tuple[int, float]]:
+    where, params = _since_clause(since)
+    rows = conn.execute(
+        f"SELECT {_BUCKET}, COUNT(*), SUM(COALESCE(amount, 0)) FROM payments {where} GROUP BY 1, 2, 3, 4",
+        params
+    )
+    return {tuple(row[:4]): (row[4], row[5]) for row in rows}
+
+
+def _stored(conn: sqlite3.Connection, since: Optional[str]) -> Dict[tuple, Tuple[int, float]]:
+    rows = conn.execute(
+        f"SELECT {_KEY}, payments, amount FROM payment_rollups" + (" WHERE day >= ?" if since else ""),
+        [since] if since else []
+    )
+    # Rows emptied by status changes stay behind at zero
+    return {tuple(row[:4]): (row[4], row[5]) for row in rows if row[4] or abs(row[5]) > _TOLERANCE}
+
+
+def reconcile(conn: sqlite3.Connection, since: Optional[str] = None, repair: bool = False) -> List[Dict[str, Any]]:
+    """
+    Compare the rollups with payments (from day `since` on); returns the rows
+    that differ, and with repair=True rebuilds the days they fall on (as a
+    write job)
+    """
+    expected, stored = _expected(conn, since), _stored(conn, since)
+    drift = []
+    for key in sorted(expected.keys() | stored.keys()):
+        want, have = expected.get(key, (0, 0.0)), stored.get(key, (0, 0.0))
+        if want[0] != have[0] or abs(want[1] - have[1]) > _TOLERANCE:
+            drift.append({
+                "day": key[0], "feature_id": key[1], "payment_method": key[2], "status": key[3],
+                "payments": want[0], "rollup_payments": have[0],
+                "amount": want[1], "rollup_amount": have[1],
+            })
+    if drift and repair:
+        for day in sorted({row["day"] for row in drift}):
+            conn.execute("DELETE FROM payment_rollups WHERE day = ?", (day,))
+            conn.execute(
+                f"""INSERT INTO payment_rollups ({_KEY}, payments, amount)
+                SELECT {_BUCKET}, COUNT(*), SUM(COALESCE(amount, 0)) FROM payments
+                WHERE {_DAY} = ? GROUP BY 1, 2, 3, 4""",
+                (day,)
+            )
+        conn.commit()
+        logger.warning(f"Repaired payment rollups for {len({row['day'] for row in drift})} days")
+    return drift
+
+
+_GROUPS = (("by_day", "day"), ("by_feature", "feature"), ("by_method", "method"))
+
+
+def _totals() -> Dict[str, Any]:
+    return {"payments": 0, "revenue": 0.0, "by_status": {}}
+
+
+def _finish(totals: Dict[str, Any]) -> Dict[str, Any]:
+    converted = sum(totals["by_status"].get(status, 0) for status in CONVERTED_STATUSES)
+    totals["revenue"] = round(totals["revenue"], 3)  # KWD has three decimals
+    totals["conversion_rate"] = round(converted / totals["payments"], 4) if totals["payments"] else 0.0
+    return totals
+
+
+def payment_summary(db: sqlite3.Connection, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Revenue (Completed amounts), payment counts by status and Pending ->
+    Completed conversion for the days start..end (inclusive, YYYY-MM-DD),
+    overall and per day, feature and payment method
+    """
+    overall = _totals()
+    groups: Dict[str, Dict[Any, Dict[str, Any]]] = {name: {} for name, _ in _GROUPS}
+    for day, feature_id, feature, method, status, payments, amount in db.execute(*payment_rollups_query(start, end)):
+        if not payments:
+            continue
+        keys = (day, feature or feature_id, method)
+        for totals in (overall, *(groups[name].setdefault(key, _totals()) for (name, _), key in zip(_GROUPS, keys))):
+            totals["payments"] += payments
+            totals["by_status"][status] = totals["by_status"].get(status, 0) + payments
+            if status == "Completed":
+                totals["revenue"] += amount
+    result = {"start": start, "end": end, **_finish(overall)}
+    for name, label in _GROUPS:
+        result[name] = [{label: key, **_finish(totals)} for key, totals in groups[name].items()]
+    return result
+
+
+def total_revenue(db: sqlite3.Connection) -> float:
+    row = db.execute("SELECT SUM(amount) FROM payment_rollups WHERE status = 'Completed'").fetchone()
+    return round(row[0] or 0, 3)
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_writer import db_writer, close_db_writer
+    from migrations import apply_migrations
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Rebuild or check the payment rollups")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill_cmd = commands.add_parser("backfill")
+    backfill_cmd.add_argument("--since", default=None, help="first day to rebuild (YYYY-MM-DD); default all")
+    reconcile_cmd = commands.add_parser("reconcile")
+    reconcile_cmd.add_argument("--since", default=None, help="first day to check (YYYY-MM-DD); default all")
+    reconcile_cmd.add_argument("--repair", action="store_true", help="rebuild the days that differ")
+    args = parser.parse_args()
+
+    apply_migrations()
+    try:
+        if args.command == "backfill":
+            result: Any = {"rollup_rows": db_writer().write(backfill, args.since)}
+        else:
+            result = db_writer().write(reconcile, args.since, args.repair)
+    finally:
+        close_db_writer()
+    print(json.dumps(result, indent=2))
+    if args.command == "reconcile" and result and not args.repair:
+        raise SystemExit(1)
@@ -4,7 +4,11 @@ from datetime import datetime, timedelta
 from typing import Optional
 import random
 import string
+import logging
 from config import settings
+from services.payment_rollups import adjust_rollup
+
+logger = logging.getLogger(__name__)
 
 def generate_transaction_id() -> str:
     """Generate a unique transaction ID"""
@@ -39,9 +43,9 @@ def initiate_payment(
            VALUES (?, ?, ?, ?, ?, ?)""",
         (user_id, feature_id, price, "KWD", payment_method, "Pending")
     )
-    db.commit()
-    
     payment_id = cursor.lastrowid
+    adjust_rollup(cursor, payment_id, 1)
+    db.commit()
     
     # Generate payment URL based on method
     if settings.PAYMENT_MODE == "simulated":
@@ -89,13 +93,15 @@ def simulate_payment(
     transaction_id = generate_transaction_id()
     new_status = "Completed" if success else "Failed"
     
-    # Update payment status
+    # Update payment status, moving it from the Pending rollup to the new one
+    adjust_rollup(cursor, payment_id, -1)
     cursor.execute(
         """UPDATE payments 
            SET status = ?, transaction_id = ?, completed_at = ?
            WHERE id = ?""",
         (new_status, transaction_id, datetime.now(), payment_id)
     )
+    adjust_rollup(cursor, payment_id, 1)
     
     if success:
         # Activate premium feature
@@ -174,7 +180,7 @@ def activate_premium_feature(
     )
     db.commit()
     
-    print(f"✅ Activated {feature_name} for user {user_id} (duration: {duration_days} days)")
+    logger.info("Activated %s for user %s (duration: %s days)", feature_name, user_id, duration_days)
     
     # In production, store feature expiration and specific feature access
     # For now, just mark user as premium
@@ -293,13 +299,15 @@ def refund_payment(
     
     # Update payment status
     refund_transaction_id = generate_transaction_id()
+    adjust_rollup(cursor, payment_id, -1)
     cursor.execute(
         "UPDATE payments SET status = 'Refunded', transaction_id = ? WHERE id = ?",
         (refund_transaction_id, payment_id)
     )
+    adjust_rollup(cursor, payment_id, 1)
     db.commit()
     
-    print(f"Refunded ${refund_amt} for payment #{payment_id}. Reason: {reason}")
+    logger.info("Refunded $%s for payment #%s. Reason: %s", refund_amt, payment_id, reason)
     
     return {
         "payment_id": payment_id,
@@ -0,0 +1,275 @@
+# services/query_builders.py - SQL for hot read paths
+"""
+Each builder returns (sql, params) so routers and perf/query_plan_check.py
+run exactly the same statements. Keep filters sargable: no functions on
+indexed columns and no OR chains across unrelated columns.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+Query = Tuple[str, List[Any]]
+
+UNIVERSITY_SEARCH_COLUMNS = (
+    "u.id, u.name, u.country, u.city, u.tuition_fee, u.min_gpa, u.scholarship_available, u.ranking"
+)
+
+
+def _university_search_where(
+    major: Optional[str] = None,
+    country: Optional[str] = None,
+    min_tuition: Optional[int] = None,
+    max_tuition: Optional[int] = None,
+    min_gpa: Optional[float] = None,
+    max_gpa: Optional[float] = None,
+    language: Optional[str] = None,
+    scholarship_track: Optional[bool] = None,
+    search_query: Optional[str] = None,
+) -> Query:
+    where_clauses = ["u.is_active = 1"]
+    params: List[Any] = []
+
+    if major:
+        # EXISTS instead of JOIN + DISTINCT: one probe of the (university_id, major_name) index per university
+        where_clauses.append(
+            "EXISTS (SELECT 1 FROM university_majors um WHERE um.university_id = u.id AND um.major_name LIKE ?)"
+        )
+        params.append(f"%{major}%")
+
+    if country:
+        where_clauses.append("u.country = ?")
+        params.append(country)
+
+    if min_tuition is not None:
+        where_clauses.append("u.tuition_fee >= ?")
+        params.append(min_tuition)
+
+    if max_tuition is not None:
+        where_clauses.append("u.tuition_fee <= ?")
+        params.append(max_tuition)
+
+    if min_gpa is not None:
+        where_clauses.append("u.min_gpa >= ?")
+        params.append(min_gpa)
+
+    if max_gpa is not None:
+        where_clauses.append("u.min_gpa <= ?")
+        params.append(max_gpa)
+
+    if language:
+        where_clauses.append("u.language LIKE ?")
+        params.append(f"%{language}%")
+
+    if scholarship_track is True:
+        where_clauses.append("u.scholarship_available = 1")
+
+    if search_query:
+        where_clauses.append("(u.name LIKE ? OR u.country LIKE ? OR u.city LIKE ?)")
+        params.extend([f"%{search_query}%"] * 3)
+
+    return " WHERE " + " AND ".join(where_clauses), params
+
+
+def university_search_count_query(**filters) -> Query:
+    where, params = _university_search_where(**filters)
+    return "SELECT COUNT(*) FROM universities u" + where, params
+
+
+def university_search_query(page: int = 1, page_size: int = 20, **filters) -> Query:
+    where, params = _university_search_where(**filters)
+    sql = (
+        f"SELECT {UNIVERSITY_SEARCH_COLUMNS} FROM universities u" + where
+        + " ORDER BY u.ranking ASC, u.name ASC LIMIT ? OFFSET ?"
+    )
+    return sql, params + [page_size, (page - 1) * page_size]
+
+
+def filtered_universities_query(filters: Dict[str, Any], limit: int = 20) -> Query:
+    """Chatbot sidebar filters; every filter narrows the result"""
+    sql = """
+        SELECT u.id, u.name, u.city, u.country, u.tuition_fee,
+               u.min_gpa, u.ranking, u.scholarship_available
+        FROM universities u
+        WHERE u.is_active = 1
+    """
+    params: List[Any] = []
+
+    if filters.get("country"):
+        sql += " AND u.country = ?"
+        params.append(filters["country"])
+
+    if filters.get("major"):
+        sql += """ AND EXISTS (
+            SELECT 1 FROM university_majors um
+            WHERE um.university_id = u.id AND LOWER(TRIM(um.major_name)) = LOWER(TRIM(?))
+        )"""
+        params.append(filters["major"])
+
+    if filters.get("max_tuition") and filters["max_tuition"] > 0:
+        sql += " AND u.tuition_fee <= ?"
+        params.append(filters["max_tuition"])
+
+    if filters.get("min_gpa") and filters["min_gpa"] > 0:
+        # The student's GPA must meet the university's minimum
+        sql += " AND u.min_gpa <= ?"
+        params.append(filters["min_gpa"])
+
+    if filters.get("scholarship_track"):
+        sql += " AND u.scholarship_available = 1"
+
+    sql += " ORDER BY u.tuition_fee ASC LIMIT ?"
+    params.append(limit)
+    return sql, params
+
+
+def university_media_query(university_ids: List[int]) -> Query:
+    """Media for a batch of universities in one statement, grouped and in display order"""
+    placeholders = ",".join("?" for _ in university_ids)
+    sql = f"""
+        SELECT university_id, id, media_type, media_url, caption
+        FROM university_media
+        WHERE university_id IN ({placeholders})
+        ORDER BY university_id, display_order
+    """
+    return sql, list(university_ids)
+
+
+ADMIN_APPLICATIONS_FROM = """
+    FROM applications a
+    JOIN universities u ON a.university_id = u.id
+    JOIN university_majors m ON a.major_id = m.id
+    JOIN student_profiles sp ON a.user_id = sp.user_id
+"""
+
+ADMIN_APPLICATIONS_COLUMNS = """
+            a.id, a.user_id, a.status, a.application_date, a.last_updated,
+            u.name as university_name, u.country,
+            m.major_name,
+            sp.full_name as student_name,
+            (SELECT COUNT(*) FROM {schema}application_documents d WHERE d.application_id = a.id) as document_count
+"""
+
+
+def _admin_applications_from(schema: str = "") -> str:
+    """ADMIN_APPLICATIONS_FROM reading applications from `schema` ("main."/"archive.")"""
+    return ADMIN_APPLICATIONS_FROM.replace("FROM applications a", f"FROM {schema}applications a", 1)
+
+
+def _admin_applications_where(status: Optional[str], university_id: Optional[int]) -> Query:
+    where_clauses = []
+    params: List[Any] = []
+    if status:
+        where_clauses.append("a.status = ?")
+        params.append(status)
+    if university_id:
+        where_clauses.append("a.university_id = ?")
+        params.append(university_id)
+    return (" WHERE " + " AND ".join(where_clauses)) if where_clauses else "", params
+
+
+def admin_applications_count_query(
+    status: Optional[str] = None,
+    university_id: Optional[int] = None,
+    include_archived: bool = False
+) -> Query:
+    """include_archived adds the archive store's applications (services/archive_service.py)"""
+    where, params = _admin_applications_where(status, university_id)
+    if not include_archived:
+        return "SELECT COUNT(*)" + ADMIN_APPLICATIONS_FROM + where, params
+    sql = (
+        "SELECT (SELECT COUNT(*)" + _admin_applications_from("main.") + where + ")"
+        " + (SELECT COUNT(*)" + _admin_applications_from("archive.") + where + ")"
+    )
+    return sql, params + params
+
+
+def admin_applications_query(
+    status: Optional[str] = None,
+    university_id: Optional[int] = None,
+    page: int = 1,
+    page_size: int = 20,
+    include_archived: bool = False
+) -> Query:
+    where, params = _admin_applications_where(status, university_id)
+    order = " ORDER BY a.last_updated DESC LIMIT ? OFFSET ?"
+    offset = (page - 1) * page_size
+    if not include_archived:
+        sql = "SELECT" + ADMIN_APPLICATIONS_COLUMNS.format(schema="") + ADMIN_APPLICATIONS_FROM + where + order
+        return sql, params + [page_size, offset]
+    # Each store returns its own first offset + page_size rows off its last_updated index;
+    # the page is cut from the merge of the two.
+    arms = [
+        "SELECT * FROM (SELECT" + ADMIN_APPLICATIONS_COLUMNS.format(schema=schema)
+        + _admin_applications_from(schema) + where + " ORDER BY a.last_updated DESC LIMIT ?)"
+        for schema in ("main.", "archive.")
+    ]
+    sql = " UNION ALL ".join(arms) + " ORDER BY last_updated DESC LIMIT ? OFFSET ?"
+    arm_params = params + [offset + page_size]
+    return sql, arm_params + arm_params + [page_size, offset]
+
+
+def payment_report_query() -> Query:
+    """Admin payment report, newest first; columns are named after the response keys"""
+    sql = """
+        SELECT p.id, u.email AS student_email, f.feature_name AS feature, p.amount,
+               p.payment_method AS method, p.status, p.completed_at AS date
+        FROM payments p
+        JOIN users u ON p.user_id = u.id
+        JOIN premium_features f ON p.feature_id = f.id
+        ORDER BY p.completed_at DESC
+    """
+    return sql, []
+
+
+def payment_rollups_query(start: Optional[str] = None, end: Optional[str] = None) -> Query:
+    """Daily payment rollup rows for the days start..end (YYYY-MM-DD, inclusive), by day"""
+    where_clauses: List[str] = []
+    params: List[Any] = []
+    if start:
+        where_clauses.append("r.day >= ?")
+        params.append(start)
+    if end:
+        where_clauses.append("r.day <= ?")
+        params.append(end)
+    where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    sql = f"""
+        SELECT r.day, r.feature_id, f.feature_name AS feature, r.payment_method AS method,
+               r.status, r.payments, r.amount
+        FROM payment_rollups r
+        LEFT JOIN premium_features f ON f.id = r.feature_id
+        {where}
+        ORDER BY r.day
+    """
+    return sql, params
+
+
+def leads_query() -> Query:
+    """Admin service leads, newest first; columns are named after the response keys"""
+    sql = """
+        SELECT l.id, l.student_name AS name, l.student_email AS email, l.student_phone AS phone,
+               l.status, l.created_at AS date, p.name AS partner, o.title AS offer
+        FROM service_leads l
+        JOIN partners p ON l.partner_id = p.id
+        JOIN service_offers o ON l.offer_id = o.id
+        ORDER BY l.created_at DESC
+    """
+    return sql, []
+
+
+def admin_applications_export_query(
+    status: Optional[str] = None,
+    university_id: Optional[int] = None,
+    include_archived: bool = False
+) -> Query:
+    """
+    Every application admin_applications_query would page through, newest
+    first. Rows come off the last_updated indexes in order (the two stores
+    are merged, not sorted), so an export streams without buffering.
+    """
+    where, params = _admin_applications_where(status, university_id)
+    if not include_archived:
+        sql = "SELECT" + ADMIN_APPLICATIONS_COLUMNS.format(schema="") + ADMIN_APPLICATIONS_FROM + where
+        return sql + " ORDER BY a.last_updated DESC", params
+    arms = [
+        "SELECT" + ADMIN_APPLICATIONS_COLUMNS.format(schema=schema) + _admin_applications_from(schema) + where
+        for schema in ("main.", "archive.")
+    ]
+    return " UNION ALL ".join(arms) + " ORDER BY last_updated DESC", params + params
@@ -1,9 +1,7 @@
 from typing import List, Dict, Optional
 import sqlite3
-from sqlite import get_db
 from datetime import datetime
 import logging
-logging.basicConfig(level=logging.INFO,format={'%(asctime)s - %(name)s - %(levelname)s - %(message)s'})
 logger = logging.getLogger(__name__)
 logger.info("logger sucessfuly initializd in scholarship service")
 class ScholarshipService:
@@ -27,30 +25,25 @@ class ScholarshipService:
                 
             cursor.execute(query, params)
             rows = cursor.fetchall()
-            logger.info(f'fetched data from scholarship tables with filters country')
             scholarships = []
-            seen=set()
             for row in rows:
-                if row[1] not in  seen:
-                    seen.add(row[1])
-                    scholarships.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "country": row[2],
-                        "provider": row[3],
-                        "min_gpa": row[4],
-                        "max_age": row[5],
-                        "nationality_requirement": row[6],
-                        "coverage": row[7],
-                        "amount": row[8],
-                        "deadline": row[9],
-                        "description": row[10],
-                        "required_documents": row[11],
-                        "website": row[12]
-                    })
-            
-            conn.close()
-            logger.info(f"fetched {len(scholarships)} and all unique scholrship:{scholarships}")
+                scholarships.append({
+                    "id": row[0],
+                    "name": row[1],
+                    "country": row[2],
+                    "provider": row[3],
+                    "min_gpa": row[4],
+                    "max_age": row[5],
+                    "nationality_requirement": row[6],
+                    "coverage": row[7],
+                    "amount": row[8],
+                    "deadline": row[9],
+                    "description": row[10],
+                    "required_documents": row[11],
+                    "website": row[12]
+                })
+            
+            logger.debug("fetched %d scholarships (country=%s, min_amount=%s)", len(scholarships), country, min_amount)
             return scholarships
         except Exception as e:
             logger.error(f"Error fetching scholarships: {e}")
@@ -96,11 +89,10 @@ class ScholarshipService:
         try:
             conn = db
             cursor = conn.cursor()
-            print("cursor created sucessfullly")
             # Get student profile
             cursor.execute("SELECT gpa, nationality FROM student_profiles WHERE user_id = ?", (user_id,))
             student = cursor.fetchone()
-            logger.info(f"fetched student profile data :{student}")
+            logger.debug("fetched student profile data: %s", student)
             if not student:
                 conn.close()
                 return {"eligible": False, "reason": "Student profile not found"}
@@ -120,12 +112,11 @@ class ScholarshipService:
             reasons = []
             
 
-            print("running sucessfully")
             # Check GPA
             if (student_gpa) < (min_gpa):
                 score -= 40
                 reasons.append(f"GPA ({student_gpa}) is below required ({min_gpa})")
-                print(f"GPA check failed :{reasons}")
+                logger.debug("GPA check failed: %s", reasons)
             
             # Check Nationality
             if nat_req != "All nationalities" and student_nationality.lower() not in nat_req.lower():
@@ -144,9 +135,9 @@ class ScholarshipService:
 
     @staticmethod
     def create_scholarship_application(user_id: int, scholarship_id: int,db:sqlite3.Connection) -> Dict:
-        """Create a new scholarship application draft"""
+        """Create a new scholarship application draft; run as a write job"""
         try:
-            conn = get_db()
+            conn = db
             cursor = conn.cursor()
             
             # Check for existing application
@@ -159,7 +150,7 @@ class ScholarshipService:
                 return {"error": "Application already exists"}
             
             # Calculate initial eligibility score
-            eligibility = ScholarshipService.calculate_eligibility(user_id, scholarship_id)
+            eligibility = ScholarshipService.calculate_eligibility(user_id, scholarship_id, db=conn)
             
             cursor.execute(
                 """INSERT INTO scholarship_applications (user_id, scholarship_id, status, eligibility_score)
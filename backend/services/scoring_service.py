@@ -1,10 +1,387 @@
+# services/scoring_service.py - Vectorized university scoring engine
+import hashlib
+import json
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from services import catalog_version
+from services.catalog_snapshot import CatalogSnapshot, get_catalog_snapshot
+from services.weights_registry import DEFAULT_WEIGHTS, WeightsSnapshot, get_weights_registry
+
+logger = logging.getLogger(__name__)
+
+# Country preference has no column in ai_weights
+COUNTRY_WEIGHT = 0.1
+MIN_RECOMMENDATION_SCORE = 0.3
+MAX_CACHED_PROFILES = 1024
+
+
+class UniversityFeatures:
+    """Column-oriented view of the active universities used for scoring"""
+
+    def __init__(self, rows: List[Dict], majors: Optional[List[Tuple[int, str]]] = None):
+        self.rows = rows
+        self.ids = np.array([r.get("id", 0) for r in rows], dtype=np.int64)
+        self.tuition = np.array([r.get("tuition_fee") or 0 for r in rows], dtype=np.float64)
+        self.min_gpa = np.array([r.get("min_gpa") or 0.0 for r in rows], dtype=np.float64)
+        self.acceptance_rate = np.array(
+            [r.get("acceptance_rate") or 0.0 for r in rows], dtype=np.float64
+        )
+        self.scholarship = np.array([bool(r.get("scholarship_available")) for r in rows], dtype=bool)
+        self.success_weight = np.array(
+            [r.get("success_weight") or 1.0 for r in rows], dtype=np.float64
+        )
+        self.country = np.array([(r.get("country") or "").lower() for r in rows], dtype=object)
+
+        # major name (lowercase) -> positions of the universities offering it
+        position = {uni_id: i for i, uni_id in enumerate(self.ids.tolist())}
+        by_major: Dict[str, List[int]] = {}
+        for uni_id, major_name in majors or []:
+            pos = position.get(uni_id)
+            if pos is not None and major_name:
+                by_major.setdefault(major_name.strip().lower(), []).append(pos)
+        self.by_major = {name: np.unique(np.array(p, dtype=np.int64)) for name, p in by_major.items()}
+        self._major_masks: Dict[str, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> "UniversityFeatures":
+        rows = [uni._asdict() for uni in snapshot.active]
+        majors = [
+            (uni_id, um.major_name)
+            for uni_id, ums in snapshot.majors_of.items()
+            for um in ums
+        ]
+        return cls(rows, majors)
+
+    def major_mask(self, major: Optional[str]) -> Optional[np.ndarray]:
+        """Boolean mask of universities offering a major (substring match, like the old LIKE query)"""
+        if not major:
+            return None
+        key = major.strip().lower()
+        mask = self._major_masks.get(key)
+        if mask is None:
+            mask = np.zeros(len(self.rows), dtype=bool)
+            for name, positions in self.by_major.items():
+                if key in name:
+                    mask[positions] = True
+            self._major_masks[key] = mask
+        return mask
+
+
+def score_features(
+    features: UniversityFeatures,
+    gpa: float,
+    budget: Optional[float],
+    preferred_country: Optional[str],
+    weights: Dict[str, float],
+) -> np.ndarray:
+    """
+    Score every university in one pass.
+    Returns an array of scores in [0, 1]; universities whose minimum GPA is
+    above the student's GPA get -inf.
+    """
+    gpa = float(gpa or 0.0)
+    min_gpa = features.min_gpa
+
+    headroom = np.where(min_gpa < 4.0, 4.0 - min_gpa, 1.0)
+    gpa_score = np.clip((gpa - min_gpa) / headroom, 0.0, 1.0)
+
+    if budget:
+        within_budget = features.tuition <= budget
+        budget_score = np.where(
+            within_budget,
+            1.0 - (features.tuition / budget) * 0.5,
+            np.where(features.scholarship, 0.6, 0.0),
+        )
+    else:
+        budget_score = np.full(len(features), 0.5)
+
+    scholarship_score = features.scholarship.astype(np.float64)
+    success_score = np.clip((features.success_weight - 1.0) / 0.5, 0.0, 1.0)
+    acceptance_score = np.clip(features.acceptance_rate, 0.0, 1.0)
+
+    if preferred_country:
+        country_score = (features.country == preferred_country.lower()).astype(np.float64)
+    else:
+        country_score = np.zeros(len(features))
+
+    gpa_w = weights.get("gpa_weight", DEFAULT_WEIGHTS["gpa_weight"])
+    budget_w = weights.get("budget_weight", DEFAULT_WEIGHTS["budget_weight"])
+    scholarship_w = weights.get("scholarship_weight", DEFAULT_WEIGHTS["scholarship_weight"])
+    success_w = weights.get("success_history_weight", DEFAULT_WEIGHTS["success_history_weight"])
+    acceptance_w = weights.get("acceptance_rate_weight", DEFAULT_WEIGHTS["acceptance_rate_weight"])
+    total_weight = gpa_w + budget_w + scholarship_w + success_w + acceptance_w + COUNTRY_WEIGHT
+
+    scores = (
+        gpa_w * gpa_score
+        + budget_w * budget_score
+        + scholarship_w * scholarship_score
+        + success_w * success_score
+        + acceptance_w * acceptance_score
+        + COUNTRY_WEIGHT * country_score
+    ) / (total_weight or 1.0)
+
+    return np.where(min_gpa <= gpa, scores, -np.inf)
+
 
 def score_university(student, uni, weights):
-    score = 0
-    score += weights["acceptance_rate"]
-    if uni["min_gpa"] <= student["gpa"]:
-        score += weights["success_history"]
-    if uni["scholarship_available"]:
-        score += weights["scholarship_weight"]
-        print(score)
-    return score
+    """Score a single university (same formula as the vectorized engine)"""
+    features = UniversityFeatures([dict(uni)])
+    score = score_features(
+        features,
+        student["gpa"],
+        student.get("budget"),
+        student.get("preferred_country"),
+        weights,
+    )[0]
+    return float(score) if np.isfinite(score) else 0.0
+
+
+def profile_version(user_id: int, profile: Dict, preferred_major: Optional[str]) -> str:
+    """Fingerprint of every profile field that influences university scores"""
+    raw = "|".join(
+        str(v) for v in (
+            user_id,
+            profile.get("gpa"),
+            profile.get("budget"),
+            (profile.get("preferred_country") or "").lower(),
+            (preferred_major or "").strip().lower(),
+        )
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class UniversityScoringEngine:
+    """
+    Holds university features in NumPy arrays and caches the ranked result
+    per (profile version, weights version). Features follow the catalog
+    snapshot: a new snapshot object rebuilds them and drops every ranking.
+    """
+
+    def __init__(self, max_cached_profiles: int = MAX_CACHED_PROFILES):
+        self.max_cached_profiles = max_cached_profiles
+        self._features: Optional[UniversityFeatures] = None
+        self._source: Optional[CatalogSnapshot] = None
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        catalog_version.subscribe(self._on_catalog_change)
+        get_weights_registry().subscribe(self._on_weights_change)
+
+    def _on_catalog_change(self, version: int, university_ids: Optional[List[int]]):
+        self.invalidate()
+
+    def _on_weights_change(self, snapshot: WeightsSnapshot):
+        # Entries are keyed by weights version; only rankings for other versions go stale
+        with self._lock:
+            for key in [k for k in self._cache if k[1] != snapshot.version]:
+                del self._cache[key]
+
+    def invalidate(self):
+        with self._lock:
+            self._features = None
+            self._source = None
+            self._cache.clear()
+
+    def features(self) -> UniversityFeatures:
+        snapshot = get_catalog_snapshot()
+        features = self._features
+        # Compare snapshot identity too: a request may land between the
+        # catalog bump clearing us and the snapshot swap
+        if features is None or self._source is not snapshot:
+            features = UniversityFeatures.from_snapshot(snapshot)
+            with self._lock:
+                self._features = features
+                self._source = snapshot
+                self._cache.clear()
+            logger.info(f"Loaded scoring features for {len(features)} universities")
+        return features
+
+    def ranked(
+        self,
+        profile: Dict,
+        profile_key: str,
+        preferred_major: Optional[str],
+        weights_version: int,
+        weights: Dict[str, float],
+    ) -> Tuple[UniversityFeatures, np.ndarray, np.ndarray]:
+        """Positions and scores of every recommendable university, best first"""
+        features = self.features()
+        key = (profile_key, weights_version)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return features, cached[0], cached[1]
+
+        scores = score_features(
+            features,
+            profile.get("gpa"),
+            profile.get("budget"),
+            profile.get("preferred_country"),
+            weights,
+        )
+        mask = features.major_mask(preferred_major)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+
+        candidates = np.flatnonzero(scores > MIN_RECOMMENDATION_SCORE)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        ranked_scores = scores[order]
+
+        with self._lock:
+            if self._features is features:
+                self._cache[key] = (order, ranked_scores)
+                if len(self._cache) > self.max_cached_profiles:
+                    self._cache.popitem(last=False)
+
+        return features, order, ranked_scores
+
+    def recommend(
+        self,
+        db: sqlite3.Connection,
+        user_id: int,
+        preferred_major: Optional[str] = None,
+        max_results: int = 10,
+    ) -> List[Dict]:
+        """Top-k university recommendations for a student"""
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT gpa, budget, preferred_country, preferred_major FROM student_profiles WHERE user_id = ?",
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return []
+
+        profile = {
+            "gpa": row[0] or 0.0,
+            "budget": row[1],
+            "preferred_country": row[2],
+        }
+        major = preferred_major or row[3]
+        weights = get_weights_registry().current()
+
+        features, order, scores = self.ranked(
+            profile, profile_version(user_id, profile, major), major, weights.version, weights.weights
+        )
+
+        return [
+            _build_recommendation(features.rows[pos], float(score), profile)
+            for pos, score in zip(order[:max_results].tolist(), scores[:max_results].tolist())
+        ]
+
+
+def _build_recommendation(uni: Dict, score: float, profile: Dict) -> Dict:
+    """Human-readable reasons for a single recommended university"""
+    gpa = profile["gpa"]
+    budget = profile.get("budget")
+    preferred_country = profile.get("preferred_country")
+    tuition = uni.get("tuition_fee") or 0
+    min_gpa = uni.get("min_gpa") or 0.0
+    country = uni.get("country") or ""
+    has_scholarship = bool(uni.get("scholarship_available"))
+
+    reasons, pros, cons = [], [], []
+
+    if gpa >= min_gpa + 0.3:
+        pros.append(f"Your GPA ({gpa}) exceeds requirements ({min_gpa})")
+        reasons.append("Strong academic match based on GPA")
+
+    if budget and tuition <= budget:
+        pros.append(f"Tuition (${tuition}) is within your budget (${budget})")
+        reasons.append("Affordable tuition within budget")
+    elif budget and has_scholarship:
+        pros.append("Scholarship opportunities available")
+        cons.append(f"Tuition (${tuition}) exceeds budget, but scholarships may help")
+    elif budget:
+        cons.append(f"Tuition (${tuition}) exceeds budget (${budget})")
+
+    if has_scholarship:
+        reasons.append("Scholarship opportunities available")
+
+    if preferred_country and country.lower() == preferred_country.lower():
+        reasons.append(f"Located in your preferred country ({country})")
+        pros.append(f"Located in {country} as preferred")
+
+    if (uni.get("success_weight") or 1.0) > 1.1:
+        reasons.append("Strong success history with past students")
+        pros.append("High success rate with previous applicants")
+
+    return {
+        "id": uni["id"],
+        "name": uni["name"],
+        "country": country,
+        "city": uni.get("city"),
+        "tuition_fee": tuition,
+        "min_gpa": min_gpa,
+        "scholarship_available": has_scholarship,
+        "ranking": uni.get("ranking"),
+        "recommendation_score": round(score, 2),
+        "reasons": reasons,
+        "pros": pros,
+        "cons": cons
+    }
+
+
+# ============= Major matching (assessment traits) =============
+
+def trait_similarity(user_scores: dict, major_scores: dict) -> float:
+    """User-weighted overlap between a student's trait scores and a major's trait profile"""
+    numerator = 0.0
+    denominator = 0.0
+
+    for trait, user_value in user_scores.items():
+        numerator += user_value * major_scores.get(trait, 0.0)
+        denominator += user_value
+
+    if denominator == 0:
+        return 0.0
+
+    return numerator / denominator
+
+
+def score_major(user_traits: dict, major_row: dict, trait_weights: Optional[Dict[str, float]] = None) -> float:
+    """Weighted trait similarity between a student and one Major_data row"""
+    if trait_weights is None:
+        trait_weights = get_weights_registry().current().trait_weights
+
+    final_score = 0.0
+    for group, weight in trait_weights.items():
+        major_scores = major_row[f"{group}_scores"]
+        if isinstance(major_scores, str):
+            major_scores = json.loads(major_scores)
+        final_score += weight * trait_similarity(user_traits[group], major_scores)
+
+    return round(final_score, 2)
+
+
+def recommend_majors(user_traits, majors, top_k=5):
+    """Rank majors for a student's trait scores"""
+    trait_weights = get_weights_registry().current().trait_weights
+    recommendations = []
+
+    for major in majors:
+        score = score_major(user_traits, major, trait_weights)
+        recommendations.append({
+            "major": major["major"],
+            "score": score
+        })
+
+    recommendations.sort(key=lambda x: x["score"], reverse=True)
+    return recommendations[:top_k]
+
+
+_scoring_engine = None
+
+def get_scoring_engine() -> UniversityScoringEngine:
+    global _scoring_engine
+    if _scoring_engine is None:
+        _scoring_engine = UniversityScoringEngine()
+    return _scoring_engine
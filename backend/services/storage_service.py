@@ -4,8 +4,11 @@ from fastapi import UploadFile
 from config import settings
 from typing import Optional
 import hashlib
+import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 async def save_upload_file(file: UploadFile, user_id: int, category: str = "general") -> dict:
     """
     Save an uploaded file to storage
@@ -65,10 +68,9 @@ async def delete_file(file_path: str) -> bool:
             return True
         return False
     except Exception as e:
-        print(f"Error deleting file {file_path}: {e}")
+        logger.error("Error deleting file %s: %s", file_path, e)
         return False
-    
-print(f"function is being called the delete file ")
+
 
 def get_file_url(file_path: str) -> str:
     """Convert file path to accessible URL"""
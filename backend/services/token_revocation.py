@@ -0,0 +1,218 @@
+# services/token_revocation.py - Revoked sessions and rotating refresh tokens
+"""
+Every token pair belongs to a session ("fam" claim): login starts one, and
+each /auth/refresh swaps the refresh token for a new pair in the same
+session. Refresh tokens are single use (refresh_tokens table); presenting
+one a second time means it was copied, so the whole session is revoked.
+
+Logging out (or a detected reuse) revokes the session: its id goes into
+revoked_tokens until every access token issued in it has expired, and its
+refresh tokens are marked revoked. Single access tokens can be revoked by
+jti the same way.
+
+get_current_user checks both ids of every request against RevocationList,
+an in-memory Bloom filter of the revoked ids. A miss (nearly every request)
+is definite and costs no query; only a possible hit is confirmed in SQLite.
+The filter is rebuilt from the table every TOKEN_REVOCATION_REFRESH_SECONDS,
+which also drops expired ids. A revocation is seen at once by the worker
+that made it and within that interval by the others.
+"""
+import time
+import uuid
+import threading
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from config import settings
+from db_writer import db_writer
+from sqlite import connect
+from utils import metrics
+from utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHECKS = metrics.REGISTRY.register(metrics.Counter(
+    "token_revocation_checks_total", "Token revocation checks by outcome (filtered: answered without a query)",
+    labels=("result",)))
+
+
+def new_token_id() -> str:
+    return uuid.uuid4().hex
+
+
+def _utc(moment: datetime) -> str:
+    # The format CURRENT_TIMESTAMP writes, so expiry compares with datetime('now')
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _purge_expired(conn):
+    """Write job: drop revocations and refresh tokens that can no longer be presented"""
+    conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= datetime('now')")
+    conn.execute("DELETE FROM refresh_tokens WHERE expires_at <= datetime('now')")
+    conn.commit()
+
+
+class RevocationList:
+    """Bloom filter of revoked token and session ids, backed by revoked_tokens"""
+
+    def __init__(self, ttl: float, capacity: int, error_rate: float):
+        self.ttl = ttl
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Ids added while a rebuild reads the table, which may not include them yet
+        self._added_during_build: Optional[List[str]] = None
+
+    def _load(self) -> BloomFilter:
+        conn = connect()
+        try:
+            ids = [row[0] for row in conn.execute(
+                "SELECT jti FROM revoked_tokens WHERE expires_at > datetime('now')")]
+        finally:
+            conn.close()
+        bloom = BloomFilter(max(self.capacity, 2 * len(ids)), self.error_rate)
+        for token_id in ids:
+            bloom.add(token_id)
+        return bloom
+
+    def rebuild(self) -> BloomFilter:
+        with self._lock:
+            self._added_during_build = []
+        try:
+            bloom = self._load()
+        except Exception:
+            with self._lock:
+                self._added_during_build = None
+            raise
+        with self._lock:
+            for token_id in self._added_during_build:
+                bloom.add(token_id)
+            self._added_during_build = None
+            # Readers keep the old filter until this single assignment
+            self._filter, self._built_at = bloom, time.monotonic()
+        return bloom
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.rebuild()
+                db_writer().submit(_purge_expired)
+            except Exception as e:
+                logger.error(f"Revocation filter rebuild failed: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="revocation-refresh", daemon=True).start()
+
+    def _current(self) -> BloomFilter:
+        bloom = self._filter
+        if bloom is None:
+            bloom = self.rebuild()
+        elif time.monotonic() - self._built_at > self.ttl:
+            self._refresh_in_background()
+        return bloom
+
+    def add(self, token_id: str):
+        """Mark an id revoked in this process right away (the table row is the durable record)"""
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(token_id)
+            if self._added_during_build is not None:
+                self._added_during_build.append(token_id)
+
+    def is_revoked(self, *token_ids: Optional[str]) -> bool:
+        """Whether any of the ids (a token's jti and session) has been revoked"""
+        bloom = self._current()
+        candidates = [token_id for token_id in token_ids if token_id and token_id in bloom]
+        if not candidates:
+            REVOCATION_CHECKS.inc(("filtered",))
+            return False
+        conn = connect()
+        try:
+            row = conn.execute(
+                f"SELECT 1 FROM revoked_tokens WHERE jti IN ({','.join('?' for _ in candidates)}) LIMIT 1",
+                candidates
+            ).fetchone()
+        finally:
+            conn.close()
+        REVOCATION_CHECKS.inc(("revoked",) if row else ("false_positive",))
+        return row is not None
+
+
+_revocations: Optional[RevocationList] = None
+_revocations_lock = threading.Lock()
+
+
+def revocation_list() -> RevocationList:
+    """The process-wide revocation filter (loaded on first use)"""
+    global _revocations
+    if _revocations is None:
+        with _revocations_lock:
+            if _revocations is None:
+                _revocations = RevocationList(
+                    settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+                    settings.TOKEN_REVOCATION_CAPACITY,
+                    settings.TOKEN_REVOCATION_ERROR_RATE,
+                )
+    return _revocations
+
+
+# ============= Write jobs =============
+
+def revoke(conn, token_id: str, user_id: Optional[int], expires: datetime):
+    """Revoke a token (jti) or a whole session (fam) until `expires`; doesn't commit"""
+    conn.execute(
+        """INSERT INTO revoked_tokens (jti, user_id, expires_at) VALUES (?, ?, ?)
+        ON CONFLICT(jti) DO UPDATE SET expires_at = MAX(expires_at, excluded.expires_at)""",
+        (token_id, user_id, _utc(expires))
+    )
+    revocation_list().add(token_id)
+
+
+def revoke_session(conn, family: str, user_id: Optional[int]):
+    """Revoke every token of a session: its refresh tokens, and its access tokens by session id"""
+    conn.execute(
+        "UPDATE refresh_tokens SET revoked_at = CURRENT_TIMESTAMP WHERE family = ? AND revoked_at IS NULL",
+        (family,)
+    )
+    # Access tokens of the session were all issued before now, so none outlives this
+    revoke(conn, family, user_id, datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+
+def store_refresh_token(conn, jti: str, user_id: int, family: str, expires: datetime):
+    conn.execute(
+        "INSERT INTO refresh_tokens (jti, user_id, family, expires_at) VALUES (?, ?, ?, ?)",
+        (jti, user_id, family, _utc(expires))
+    )
+
+
+def consume_refresh_token(conn, jti: str, user_id: int) -> Optional[str]:
+    """
+    Mark a refresh token used and return its session, or None if it can't
+    be used. A token used before revokes its session (committed).
+    """
+    row = conn.execute(
+        """SELECT family, used_at IS NOT NULL, revoked_at IS NOT NULL, expires_at > datetime('now')
+        FROM refresh_tokens WHERE jti = ? AND user_id = ?""",
+        (jti, user_id)
+    ).fetchone()
+    if row is None:
+        return None
+    family, used, revoked, live = row
+    if revoked or not live:
+        return None
+    if used:
+        logger.warning(f"Refresh token reuse for user {user_id}: revoking session {family}")
+        revoke_session(conn, family, user_id)
+        conn.commit()
+        return None
+    conn.execute("UPDATE refresh_tokens SET used_at = CURRENT_TIMESTAMP WHERE jti = ?", (jti,))
+    return family
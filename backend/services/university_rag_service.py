@@ -7,14 +7,75 @@ from typing import List, Dict, Any, Optional
 from langchain_ollama import ChatOllama
 from langchain_core.messages import SystemMessage, HumanMessage
 from config import settings
+from sqlite import connect, connect_catalog
+from utils import metrics
+from services.catalog_snapshot import get_catalog_snapshot
+from models.university import MAX_COMPARE_UNIVERSITIES
+from services.facet_service import get_facet_service
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+COMPARISON_FIELDS = (
+    "country", "city", "tuition_fee", "min_gpa", "scholarship_available", "ranking",
+    "acceptance_rate", "duration", "overview", "accommodation_info", "website"
+)
+
+
+def post_filter_results(results: Optional[Dict[str, Any]], filters: Optional[Dict[str, Any]], n_results: int) -> List[Dict]:
+    """
+    Apply the filters Chroma's where clause cannot express (tuition ceiling,
+    student GPA, major substring) to a query result, keeping the first
+    n_results hits in relevance order.
+    """
+    if not results or not results['metadatas'] or not results['metadatas'][0]:
+        return []
+
+    filters = filters or {}
+    max_tuition = filters.get('max_tuition')
+    min_gpa = filters.get('min_gpa')
+    major = (filters.get('major') or '').lower()
+
+    universities = []
+    for metadata, document, distance in zip(
+        results['metadatas'][0],
+        results['documents'][0],
+        results['distances'][0]
+    ):
+        if max_tuition and metadata['tuition_fee'] > max_tuition:
+            logger.debug("Filtered out %s: tuition $%s > $%s", metadata['name'], metadata['tuition_fee'], max_tuition)
+            continue
+
+        if min_gpa and metadata['min_gpa'] > min_gpa:
+            logger.debug("Filtered out %s: requires GPA %s > user's %s", metadata['name'], metadata['min_gpa'], min_gpa)
+            continue
+
+        if major and major not in metadata.get('majors', '').lower():
+            logger.debug("Filtered out %s: major '%s' not in '%s'", metadata['name'], major, metadata.get('majors', ''))
+            continue
+
+        universities.append({
+            "id": metadata['id'],
+            "name": metadata['name'],
+            "country": metadata['country'],
+            "city": metadata['city'],
+            "tuition_fee": metadata['tuition_fee'],
+            "min_gpa": metadata['min_gpa'],
+            "scholarship_available": metadata['scholarship'],
+            "ranking": metadata['ranking'],
+            "relevance_score": 1 - distance,
+            "content": document
+        })
+
+        if len(universities) >= n_results:
+            break
+
+    return universities
+
 
 class UniversityRAGService:
-    def __init__(self, db_path: str = "University.db", chroma_path: str = "chroma_db_dir"):
+    def __init__(self, db_path: Optional[str] = None, chroma_path: str = "chroma_db_dir"):
+        # db_path None reads the configured catalog store (split out or not)
         self.db_path = db_path
         self.chroma_client = chromadb.PersistentClient(path=chroma_path)
         self.collection_name = "universities"
@@ -22,14 +83,12 @@ class UniversityRAGService:
         
         try:
             self.collection = self.chroma_client.get_collection(name=self.collection_name)
-            print(self.collection)
             logger.info(f"Loaded existing collection: {self.collection_name}")
         except:
             self.collection = self.chroma_client.create_collection(
                 name=self.collection_name,
                 metadata={"description": "University information for RAG"}
             )
-            print(f"self.collection created sucessfully:{self.collection}")
             logger.info(f"Created new collection: {self.collection_name}")
             self._ingest_universities()
         
@@ -40,44 +99,43 @@ class UniversityRAGService:
                 base_url=settings.OLLAMA_BASE_URL,
                 temperature=0.0
             )
-            print(f"self.llm model callled:{self.llm}")
             logger.info(f"Initialized Ollama model: {settings.OLLAMA_MODEL}")
         except Exception as e:
             logger.warning(f"Could not initialize Ollama: {e}")
             self.llm = None
     
-    def _ingest_universities(self):
-        logger.info("Starting university data ingestion into ChromaDB...")
-        
-        conn = sqlite3.connect(self.db_path)
+    def _fetch_university_rows(self, university_ids: Optional[List[int]] = None) -> List[sqlite3.Row]:
+        """Active universities with their majors, optionally limited to the given ids"""
+        conn = connect_catalog() if self.db_path is None else connect(self.db_path)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Fetch all universities with their majors
-        cursor.execute("""
+        query = """
             SELECT 
                 u.id, u.name, u.country, u.city, u.tuition_fee, u.min_gpa, 
                 u.language, u.scholarship_available, u.overview, u.duration,
                 u.accommodation_info, u.website, u.ranking, u.acceptance_rate,
-                GROUP_CONCAT(m.name, ', ') as majors
+                GROUP_CONCAT(um.major_name, ', ') as majors
             FROM universities u
             LEFT JOIN university_majors um ON u.id = um.university_id
-            LEFT JOIN majors m ON um.major_id = m.id
             WHERE u.is_active = 1
-            GROUP BY u.id
-        """)
-        
-        universities = cursor.fetchall()
-        print(f"universities:",universities)
-        print(f"universities fetch from the database")
+        """
+        params: List[Any] = []
+        if university_ids is not None:
+            query += f" AND u.id IN ({','.join('?' for _ in university_ids)})"
+            params.extend(university_ids)
+        query += " GROUP BY u.id"
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
         conn.close()
-        
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for uni in universities:
-            doc_text = f"""
+        return rows
+    
+    @staticmethod
+    def _build_document(uni) -> tuple:
+        """Document text, metadata and id for one university row"""
+        acceptance = f"{uni['acceptance_rate']*100}%" if uni['acceptance_rate'] is not None else "N/A"
+        doc_text = f"""
             University: {uni['name']}
             Country: {uni['country']}, City: {uni['city']}
             Ranking: {uni['ranking']}
@@ -85,27 +143,43 @@ class UniversityRAGService:
             Minimum GPA: {uni['min_gpa']}
             Language: {uni['language']}
             Scholarship Available: {'Yes' if uni['scholarship_available'] else 'No'}
-            Acceptance Rate: {uni['acceptance_rate']*100}%
+            Acceptance Rate: {acceptance}
             Duration: {uni['duration']}
             Overview: {uni['overview']}
             Accommodation: {uni['accommodation_info']}
             Majors Offered: {uni['majors'] or 'Various programs'}
             Website: {uni['website']}
             """
-            
+        
+        # Chroma metadata values cannot be None
+        metadata = {
+            "id": uni['id'],
+            "name": uni['name'],
+            "country": uni['country'] or "",
+            "city": uni['city'] or "",
+            "tuition_fee": uni['tuition_fee'] or 0,
+            "min_gpa": float(uni['min_gpa'] or 0.0),
+            "scholarship": bool(uni['scholarship_available']),
+            "ranking": uni['ranking'] or 0,
+            "majors": uni['majors'] or ""
+        }
+        return doc_text, metadata, f"uni_{uni['id']}"
+    
+    def _ingest_universities(self):
+        logger.info("Starting university data ingestion into ChromaDB...")
+        
+        universities = self._fetch_university_rows()
+        logger.info(f"Fetched {len(universities)} universities from the database")
+        
+        documents = []
+        metadatas = []
+        ids = []
+        
+        for uni in universities:
+            doc_text, metadata, doc_id = self._build_document(uni)
             documents.append(doc_text)
-            metadatas.append({
-                "id": uni['id'],
-                "name": uni['name'],
-                "country": uni['country'],
-                "city": uni['city'],
-                "tuition_fee": uni['tuition_fee'],
-                "min_gpa": float(uni['min_gpa']),
-                "scholarship": bool(uni['scholarship_available']),
-                "ranking": uni['ranking'],
-                "majors": uni['majors'] or ""
-            })
-            ids.append(f"uni_{uni['id']}")
+            metadatas.append(metadata)
+            ids.append(doc_id)
         
         # Add to ChromaDB
         if documents:
@@ -118,6 +192,38 @@ class UniversityRAGService:
         else:
             logger.warning("No universities found to ingest")
     
+    def sync_universities(self, university_ids: List[int], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Incrementally re-sync the given universities into ChromaDB.
+        Active universities are upserted; inactive or deleted ones are removed.
+        """
+        university_ids = sorted(set(university_ids))
+        upserted = removed = 0
+        
+        for start in range(0, len(university_ids), batch_size):
+            chunk = university_ids[start:start + batch_size]
+            rows = self._fetch_university_rows(chunk)
+            
+            documents, metadatas, ids = [], [], []
+            for uni in rows:
+                doc_text, metadata, doc_id = self._build_document(uni)
+                documents.append(doc_text)
+                metadatas.append(metadata)
+                ids.append(doc_id)
+            
+            if documents:
+                self.collection.upsert(documents=documents, metadatas=metadatas, ids=ids)
+                upserted += len(documents)
+            
+            active = {uni['id'] for uni in rows}
+            stale = [f"uni_{uid}" for uid in chunk if uid not in active]
+            if stale:
+                self.collection.delete(ids=stale)
+                removed += len(stale)
+        
+        logger.info(f"Synced universities into ChromaDB: {upserted} upserted, {removed} removed")
+        return {"upserted": upserted, "removed": removed}
+    
     def search_universities(
         self, 
         query: str, 
@@ -130,11 +236,9 @@ class UniversityRAGService:
         if filters:
             if filters.get('scholarship_track'):
                 where_conditions.append({'scholarship': True})
-                print(f"where condition applied:{where_conditions}")
             
             if filters.get('country') and filters['country'] != '':
                 where_conditions.append({'country': filters['country']})
-                print(f"where condition is applied :{where_conditions}")
         
       
         where_clause = None
@@ -150,61 +254,18 @@ class UniversityRAGService:
             filters.get('major')
         )
         chromadb_results = n_results * 3 if has_post_filters else n_results
-        print(f"chromadb_results",chromadb_results)
+        logger.debug("chroma where=%s n_results=%s", where_clause, chromadb_results)
        
         try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=chromadb_results,
-                where=where_clause
-            )
+            with metrics.timed("chroma"):
+                results = self.collection.query(
+                    query_texts=[query],
+                    n_results=chromadb_results,
+                    where=where_clause
+                )
             
            
-            universities = []
-            if results and results['metadatas'] and results['metadatas'][0]:
-                for metadata, document, distance in zip(
-                    results['metadatas'][0], 
-                    results['documents'][0],
-                    results['distances'][0]
-                ):
-                 
-                    if filters:
-                        
-                        if filters.get('max_tuition'):
-                            if metadata['tuition_fee'] > filters['max_tuition']:
-                                logger.debug(f"Filtered out {metadata['name']}: tuition ${metadata['tuition_fee']} > ${filters['max_tuition']}")
-                                continue
-                        
-                        
-                        if filters.get('min_gpa'):
-                            if metadata['min_gpa'] > filters['min_gpa']:
-                                logger.debug(f"Filtered out {metadata['name']}: requires GPA {metadata['min_gpa']} > user's {filters['min_gpa']}")
-                                continue
-                        
-                       
-                        if filters.get('major') and filters['major'] != '':
-                            majors_str = metadata.get('majors', '').lower()
-                            filter_major = filters['major'].lower()
-                            if filter_major not in majors_str:
-                                logger.debug(f"Filtered out {metadata['name']}: major '{filters['major']}' not in '{metadata.get('majors', '')}'")
-                                continue
-                    
-                    universities.append({
-                        "id": metadata['id'],
-                        "name": metadata['name'],
-                        "country": metadata['country'],
-                        "city": metadata['city'],
-                        "tuition_fee": metadata['tuition_fee'],
-                        "min_gpa": metadata['min_gpa'],
-                        "scholarship_available": metadata['scholarship'],
-                        "ranking": metadata['ranking'],
-                        "relevance_score": 1 - distance,
-                        "content": document
-                    })
-                    
-                    
-                    if len(universities) >= n_results:
-                        break
+            universities = post_filter_results(results, filters, n_results)
             
             logger.info(f"Found {len(universities)} universities matching filters from ChromaDB search")
             return universities[:n_results]  
@@ -263,16 +324,17 @@ IF NO UNIVERSITIES MATCH:
         messages.append(HumanMessage(content=user_message))
         
         try:
-            response = self.llm.invoke(messages)
-            print(f"response generated using LLM :{response}")
+            with metrics.timed("llm"):
+                response = self.llm.invoke(messages)
+            logger.debug("LLM response: %s", response)
             return response.content
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
 
-            print("unable to call the LLM generate the response")
             return self._fallback_response(context_universities)
     
-    def _build_context(self, universities: List[Dict]) -> str:
+    @staticmethod
+    def _build_context(universities: List[Dict]) -> str:
         if not universities:
             return "No universities found matching your criteria."
         
@@ -286,7 +348,6 @@ IF NO UNIVERSITIES MATCH:
    - Scholarship: {'Available' if uni['scholarship_available'] else 'Not available'}
    - Location: {uni['city']}, {uni['country']}
 """)
-        print(f"total university:{context_parts}")
         return "\n".join(context_parts)
     
     def _fallback_response(self, universities: List[Dict]) -> str:
@@ -304,79 +365,24 @@ IF NO UNIVERSITIES MATCH:
         
         return response
     
-    def get_filter_options(self) -> Dict[str, List]:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        
-        cursor.execute("SELECT DISTINCT country FROM universities WHERE is_active = 1 ORDER BY country")
-        countries = [row[0] for row in cursor.fetchall()]
-        logger.info("fetch the conteries from DB")
-     
-        cursor.execute("SELECT DISTINCT name FROM majors ORDER BY name")
-        majors = [row[0] for row in cursor.fetchall()]
-        print(f"major fetch in the DB")
-       
-        cursor.execute("SELECT MIN(tuition_fee), MAX(tuition_fee) FROM universities WHERE is_active = 1")
-        tuition_range = cursor.fetchone()
-        
-       
-        cursor.execute("SELECT MIN(min_gpa), MAX(min_gpa) FROM universities WHERE is_active = 1")
-        gpa_range = cursor.fetchone()
-        
-        conn.close()
-        
-        return {
-            "countries": countries,
-            "majors": majors,
-            "tuition_range": {"min": tuition_range[0], "max": tuition_range[1]},
-            "gpa_range": {"min": gpa_range[0], "max": gpa_range[1]}
-        }
+    def get_filter_options(self, conn: Optional[sqlite3.Connection] = None) -> Dict[str, List]:
+        """Countries, majors and ranges from the in-memory facet index"""
+        return get_facet_service().filter_options(conn)
     
     def compare_universities(self, university_ids: List[int]) -> Dict:
-        if len(university_ids) < 2 or len(university_ids) > 3:
-            raise ValueError("Please provide 2 or 3 university IDs to compare")
+        """Columnar comparison: one list of values per criterion, in request order"""
+        if len(university_ids) < 2 or len(university_ids) > MAX_COMPARE_UNIVERSITIES:
+            raise ValueError(f"Please provide 2 to {MAX_COMPARE_UNIVERSITIES} university IDs to compare")
         
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        universities = []
-        for uni_id in university_ids:
-            cursor.execute("""
-    SELECT 
-        u.id, 
-        u.name, 
-        u.country, 
-        u.city, 
-        u.tuition_fee, 
-        u.min_gpa,
-        u.scholarship_available, 
-        u.ranking, 
-        u.acceptance_rate, 
-        u.duration,
-        u.overview, 
-        u.accommodation_info, 
-        u.website,
-        GROUP_CONCAT(um.major_name, ', ') AS majors
-    FROM universities u
-    LEFT JOIN university_majors um 
-        ON u.id = um.university_id
-    WHERE u.id = ?
-    GROUP BY u.id
-""", (uni_id,))
-            
-            uni = cursor.fetchone()
-            print(f"university fetch from the db:{uni}")
-            if uni:
-                universities.append(dict(uni))
-            
-
-        
-        conn.close()
+        snapshot = get_catalog_snapshot()
+        universities, missing = snapshot.get_many(university_ids, active_only=False)
+        columns = {field: [getattr(uni, field) for uni in universities] for field in COMPARISON_FIELDS}
+        columns["majors"] = [", ".join(snapshot.major_names(uni.id)) or None for uni in universities]
         
         return {
-            "universities": universities[:4],
+            "universities": [{"id": uni.id, "name": uni.name} for uni in universities],
+            "columns": columns,
+            "missing": missing,
             "comparison_criteria": [
                 "tuition_fee",
                 "min_gpa",
@@ -388,62 +394,27 @@ IF NO UNIVERSITIES MATCH:
         }
     
     def fetch_filtered_universities(self, filters: dict):
-        conn = sqlite3.connect(self.db_path)
-        print(conn)
-        conn.row_factory = sqlite3.Row  
-        cursor = conn.cursor()
-        
-      
-        base_query = """
-        SELECT DISTINCT u.id, u.name, u.city, u.country, u.tuition_fee,
-                        u.min_gpa, u.ranking, u.scholarship_available
-        FROM universities u
-        LEFT JOIN university_majors m ON u.id = m.university_id
-        WHERE u.is_active = 1
-    """
-
-        params = []
-        
-        if filters.get("country") and filters["country"] != "":
-            print(repr(filters["country"]))
-            base_query += " OR u.country = ?"
-            
-            params.append(filters["country"])
-        
-        if filters.get("major") and filters["major"] != "":
-            print(repr(filters["major"]))
-            base_query += " OR LOWER(TRIM(m.major_name)) = LOWER(TRIM(?))"
-            params.append(filters["major"])
-        print(f"params are available:{params}")
-        
-        if filters.get("max_tuition") and filters["max_tuition"] > 0:
-            print(repr(filters["max_tuition"]))
-            base_query += " OR u.tuition_fee <= ?"
-            params.append(filters["max_tuition"])
-        
-        if filters.get("min_gpa") and filters["min_gpa"] > 0:
-            print(repr(filters["min_gpa"]))
-            base_query += " OR CAST(u.min_gpa as REAL) <= ?"
-            params.append(filters["min_gpa"])
-        
-        if filters.get("scholarship_track"):
-            base_query += " OR u.scholarship_available = 1"
-        
-        base_query += " ORDER BY u.tuition_fee ASC LIMIT 20"
-        
-        cursor.execute(base_query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        
-        return [dict(row) for row in rows]
+        """Sidebar-filtered universities from the catalog snapshot, cheapest first"""
+        return [
+            {
+                "id": uni.id,
+                "name": uni.name,
+                "city": uni.city,
+                "country": uni.country,
+                "tuition_fee": uni.tuition_fee,
+                "min_gpa": uni.min_gpa,
+                "ranking": uni.ranking,
+                "scholarship_available": uni.scholarship_available
+            }
+            for uni in get_catalog_snapshot().filter_universities(filters)
+        ]
 
 
 
     def query_with_filters(self, query: str, filters: dict, conversation_history: Optional[List[Dict]] = None) -> Dict:
     
         universities = self.fetch_filtered_universities(filters)
-        print(universities)
+        logger.debug("filtered universities: %s", universities)
         if not universities:
             return {
                 "response": "No universities match the selected filters. Try broadening your criteria.",
@@ -451,16 +422,16 @@ IF NO UNIVERSITIES MATCH:
             }
             
         context = self.build_context(universities)
-        print(f"context of the :{context}")
+        logger.debug("context: %s", context)
         response = self.ask_llm_with_history(query, context, conversation_history)
-        print(response)
         
         return {
             "response": response,
             "universities": universities[:2]
         }
     
-    def build_context(self, universities):
+    @staticmethod
+    def build_context(universities):
         if not universities:
             return "No universities found matching your criteria."
         
@@ -474,7 +445,6 @@ IF NO UNIVERSITIES MATCH:
                 f"   Ranking: {uni['ranking']}\n"
                 f"   Scholarship: {'Yes' if uni['scholarship_available'] else 'No'}\n"
             )
-        print(f"data fetch and concatenate :{lines[2:]}")
         return "\n".join(lines)
     
     def ask_llm_with_history(self, query: str, context: str, conversation_history: Optional[List[Dict]] = None) -> str:
@@ -508,7 +478,8 @@ IF NO UNIVERSITIES MATCH:
         messages.append(HumanMessage(content=query))
         
         try:
-            response = self.llm.invoke(messages)
+            with metrics.timed("llm"):
+                response = self.llm.invoke(messages)
             return response.content
         except Exception as e:
             logger.error(f"Error in ask_llm_with_history: {e}")
@@ -542,9 +513,10 @@ IF NO UNIVERSITIES MATCH:
         ]
         
         try:
-            response = self.llm.invoke(messages)
+            with metrics.timed("llm"):
+                response = self.llm.invoke(messages)
             logger.info(f"Generated LLM response for filtered query")
-            print(f"response generated with the content:{response.content}")
+            logger.debug("LLM response: %s", response.content)
             return response.content
         except Exception as e:
             logger.error(f"Error generating LLM response: {e}")
@@ -0,0 +1,206 @@
+# services/weights_registry.py - In-memory, versioned AI weight configuration
+import math
+import time
+import sqlite3
+import threading
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from config import settings
+from sqlite import connect
+
+logger = logging.getLogger(__name__)
+
+# University scoring weights (ai_weights defaults)
+DEFAULT_WEIGHTS = {
+    "acceptance_rate_weight": 0.3,
+    "scholarship_weight": 0.4,
+    "success_history_weight": 0.2,
+    "feedback_weight": 0.1,
+    "gpa_weight": 0.3,
+    "budget_weight": 0.25,
+    "assessment_weight": 0.45,
+}
+
+# Major matching weights, keyed by trait group (ai_weights.<group>_weight)
+DEFAULT_TRAIT_WEIGHTS = {
+    "academic_strengths": 0.30,
+    "thinking_style": 0.25,
+    "learning_style": 0.20,
+    "interests": 0.15,
+}
+
+
+def parse_weight(value: Any) -> float:
+    """A weight as ai_weights stores it: a finite, non-negative number (ValueError/TypeError otherwise)"""
+    if isinstance(value, bool):
+        raise TypeError("weights are numbers, not booleans")
+    number = float(value)
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"weight out of range: {value!r}")
+    return number
+
+
+def weight_values(updates: Mapping[str, Any], columns: Sequence[str], defaults: Mapping[str, float]) -> Tuple[float, ...]:
+    """Values for an ai_weights row: `updates` where given, `defaults` otherwise; ValueError names invalid keys"""
+    values, invalid = [], []
+    for column in columns:
+        if column not in updates:
+            values.append(defaults[column])
+            continue
+        try:
+            values.append(parse_weight(updates[column]))
+        except (TypeError, ValueError):
+            invalid.append(column)
+    if invalid:
+        raise ValueError(f"Weights must be non-negative numbers: {', '.join(invalid)}")
+    return tuple(values)
+
+
+@dataclass(frozen=True)
+class WeightsSnapshot:
+    """Immutable view of one ai_weights row; version is the row id (0 = built-in defaults)"""
+    version: int
+    weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    trait_weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TRAIT_WEIGHTS))
+
+    def as_settings(self) -> Dict[str, float]:
+        """Flat dict in the shape returned by the admin ai-settings endpoint"""
+        data = dict(self.weights)
+        data.update({f"{group}_weight": value for group, value in self.trait_weights.items()})
+        return data
+
+
+class AIWeightsRegistry:
+    """
+    Loads the active ai_weights row once and serves it from memory.
+    Reloaded explicitly after admin updates in the worker that made them; the
+    others compare MAX(id) every `refresh_seconds` and reload when it moved.
+    Listeners are told the new version so version-keyed caches can drop
+    stale entries.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, refresh_seconds: Optional[float] = None):
+        self.db_path = db_path
+        self.refresh_seconds = settings.AI_WEIGHTS_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self._snapshot: Optional[WeightsSnapshot] = None
+        self._columns: List[str] = []
+        # Newest ai_weights id seen by the last reload (valid or not), and when it was checked
+        self._latest_id = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._listeners: List[Callable[[WeightsSnapshot], None]] = []
+
+    def subscribe(self, listener: Callable[[WeightsSnapshot], None]):
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    @property
+    def columns(self) -> List[str]:
+        """Weight columns present in the ai_weights table"""
+        if self._snapshot is None:
+            self.current()
+        return list(self._columns)
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect(self.db_path, catalog=None, archive=None)
+
+    def _check_for_update(self):
+        """Reload if another worker added an ai_weights row; one thread checks, the rest keep serving"""
+        if not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            conn = self._connect()
+            try:
+                latest = conn.execute("SELECT COALESCE(MAX(id), 0) FROM ai_weights").fetchone()[0]
+                if latest != self._latest_id:
+                    self.reload(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"AI weights update check failed: {e}")
+        finally:
+            self._check_lock.release()
+
+    def current(self) -> WeightsSnapshot:
+        """Active weights; after the first load, the database is only checked every refresh_seconds"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            conn = self._connect()
+            try:
+                snapshot = self.reload(conn)
+            finally:
+                conn.close()
+        elif time.monotonic() - self._checked_at > self.refresh_seconds:
+            self._check_for_update()
+            snapshot = self._snapshot
+        return snapshot
+
+    @staticmethod
+    def _parse(data: Dict[str, Any]) -> WeightsSnapshot:
+        weights = {
+            k: parse_weight(data[k]) if data.get(k) is not None else default
+            for k, default in DEFAULT_WEIGHTS.items()
+        }
+        trait_weights = {
+            group: parse_weight(data[f"{group}_weight"]) if data.get(f"{group}_weight") is not None else default
+            for group, default in DEFAULT_TRAIT_WEIGHTS.items()
+        }
+        return WeightsSnapshot(version=data["id"], weights=weights, trait_weights=trait_weights)
+
+    def reload(self, db: sqlite3.Connection) -> WeightsSnapshot:
+        """
+        Re-read the newest ai_weights row and publish it. A row that doesn't
+        parse (written around the admin endpoint's validation) is skipped
+        for the newest one before it, so scoring keeps working.
+        """
+        cursor = db.cursor()
+        snapshot, columns, latest = None, [], 0
+        try:
+            cursor.execute("SELECT * FROM ai_weights ORDER BY id DESC")
+            columns = [d[0] for d in cursor.description]
+            for row in cursor:
+                data = dict(zip(columns, row))
+                latest = max(latest, data["id"])
+                try:
+                    snapshot = self._parse(data)
+                    break
+                except (TypeError, ValueError) as e:
+                    logger.error(f"Skipping invalid ai_weights row {data['id']}: {e}")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"ai_weights unavailable, using default weights: {e}")
+        finally:
+            cursor.close()
+
+        if snapshot is None:
+            snapshot = WeightsSnapshot(version=0)
+
+        with self._lock:
+            previous = self._snapshot
+            self._snapshot = snapshot
+            self._columns = [c for c in columns if c.endswith("_weight")]
+            self._latest_id = latest
+            self._checked_at = time.monotonic()
+            listeners = list(self._listeners)
+
+        if previous is None or previous.version != snapshot.version:
+            logger.info(f"Loaded AI weights version {snapshot.version}")
+            for listener in listeners:
+                try:
+                    listener(snapshot)
+                except Exception as e:
+                    logger.error(f"Weights listener {listener} failed: {e}")
+
+        return snapshot
+
+
+_weights_registry = None
+
+def get_weights_registry() -> AIWeightsRegistry:
+    global _weights_registry
+    if _weights_registry is None:
+        _weights_registry = AIWeightsRegistry()
+    return _weights_registry
@@ -1,14 +1,291 @@
+import os
 import sqlite3
+import time
+import logging
+from typing import Optional
+from urllib.parse import quote, urlencode
 from config import settings
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("slow_query")
+
+MAX_LOGGED_PARAMS = 500
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "REPLACE", "UPDATE", "DELETE")
+
+
+def _trace_statement(statement: str):
+    # Trigger bodies are reported as "-- TRIGGER ..."; only count top-level statements
+    if not statement.startswith("--"):
+        metrics.record_db_statement()
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, parameters=()) -> list:
+    """EXPLAIN QUERY PLAN detail lines, run on a plain cursor so it is not timed itself"""
+    try:
+        rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error as e:
+        return [f"<plan unavailable: {e}>"]
+    return [row[-1] for row in rows]
+
+
+def _log_slow_query(conn, sql: str, parameters, elapsed: float):
+    """parameters is None for executemany, whose plan is not captured"""
+    metrics.SLOW_QUERIES.inc()
+    words = sql.split(None, 1)
+    plan = []
+    if parameters is not None and words and words[0].upper() in EXPLAINABLE:
+        plan = explain_query_plan(conn, sql, parameters)
+    slow_query_logger.warning(
+        "slow query %.1f ms | sql=%s | params=%s | plan=%s",
+        elapsed * 1000,
+        " ".join(sql.split()),
+        "<executemany>" if parameters is None else repr(parameters)[:MAX_LOGGED_PARAMS],
+        " / ".join(plan),
+    )
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that charges execute/fetch time to the current request.
+    A statement's time runs from execute until its rows are exhausted (or the
+    next execute); past SLOW_QUERY_MS it is logged with its query plan.
+    """
+    _sql = None
+    _parameters = ()
+    _elapsed = 0.0
+
+    def _begin(self, sql, parameters):
+        self._finish()
+        self._sql = sql
+        self._parameters = parameters
+        self._elapsed = 0.0
+
+    def _charge(self, seconds: float):
+        self._elapsed += seconds
+        metrics.record_db_time(seconds)
+
+    def _finish(self):
+        if self._sql is not None:
+            threshold = settings.SLOW_QUERY_MS
+            if threshold and self._elapsed * 1000 >= threshold:
+                _log_slow_query(self.connection, self._sql, self._parameters, self._elapsed)
+            self._sql = None
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._charge(time.perf_counter() - start)
+            if self.description is None:
+                self._finish()
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql, None)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._charge(time.perf_counter() - start)
+            self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            row = super().fetchone()
+        finally:
+            self._charge(time.perf_counter() - start)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        try:
+            rows = super().fetchmany(size)
+        finally:
+            self._charge(time.perf_counter() - start)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._charge(time.perf_counter() - start)
+            self._finish()
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() drops the cursor before its rows are exhausted
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose statements are counted (trace callback) and timed (cursor)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(_trace_statement)
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # The C shortcuts create a plain cursor internally, so route them through ours
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# ============= Stores =============
+# The catalog tables can live in their own file (CATALOG_DATABASE_NAME), split
+# out by migrations.catalog_split. Transactional connections ATTACH it as
+# "catalog"; SQLite resolves unqualified table names across attached
+# databases, so queries and joins don't change with the layout.
+
+CATALOG_SCHEMA = "catalog"
+CATALOG_TABLES = (
+    "universities", "university_media", "majors", "university_majors",
+    "scholarships", "partners", "service_offers", "premium_features",
+    "main_catgeory", "Major_data",
+)
+
+
+def catalog_database() -> Optional[str]:
+    """Path of the separate catalog store, or None when the catalog lives in DATABASE_NAME"""
+    name = settings.CATALOG_DATABASE_NAME
+    if not name or os.path.abspath(name) == os.path.abspath(settings.DATABASE_NAME):
+        return None
+    return name
+
+
+def database_uri(path: str, **params) -> str:
+    query = urlencode({k: v for k, v in params.items() if v is not None})
+    return "file:" + quote(path) + ("?" + query if query else "")
+
+
+def _catalog_params(writable: bool) -> dict:
+    if writable:
+        return {"mode": "rw"}
+    return {"mode": "ro", "immutable": 1 if settings.CATALOG_IMMUTABLE else None}
+
+
+def attach_catalog(conn: sqlite3.Connection, writable: bool = False, path: Optional[str] = None):
+    """ATTACH the catalog store (read-only unless writable); no-op for a single-file layout"""
+    path = path or catalog_database()
+    if path is None:
+        return
+    # The main database must have been opened with uri=True for the URI to be honoured
+    conn.execute(f"ATTACH DATABASE ? AS {CATALOG_SCHEMA}", (database_uri(path, **_catalog_params(writable)),))
+
+
+# Rows moved out of the hot tables by services.archive_service live in the
+# archive store (ARCHIVE_DATABASE_NAME), attached as "archive" once it exists.
+# Its tables share the hot tables' names; unqualified names resolve to main,
+# so only code that reads cold rows names archive.<table> explicitly.
+
+ARCHIVE_SCHEMA = "archive"
+
+
+def archive_database() -> Optional[str]:
+    """Path of the archive store, or None when archiving is disabled"""
+    name = settings.ARCHIVE_DATABASE_NAME
+    if not name or os.path.abspath(name) == os.path.abspath(settings.DATABASE_NAME):
+        return None
+    return name
+
+
+def attach_archive(conn: sqlite3.Connection, writable: bool = False, path: Optional[str] = None):
+    """ATTACH the archive store; read-only attaches are skipped until the file exists"""
+    path = path or archive_database()
+    if path is None or not (writable or os.path.exists(path)):
+        return
+    mode = "rwc" if writable else "ro"
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (database_uri(path, mode=mode),))
+
+
+def has_archive(conn: sqlite3.Connection) -> bool:
+    """Whether archive.<table> can be queried on this connection"""
+    return any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list").fetchall())
+
+
+def connect(db_name=None, catalog: Optional[str] = "ro", archive: Optional[str] = "ro", **kwargs) -> sqlite3.Connection:
+    """
+    sqlite3.connect with request instrumentation; defaults to the platform
+    database. When the catalog is split out it is attached read-only
+    (catalog="rw" for catalog writers, None to leave it off); the archive
+    store likewise.
+    """
+    kwargs.setdefault("timeout", 10)
+    catalog_path = catalog_database() if db_name is None and catalog else None
+    archive_path = archive_database() if db_name is None and archive else None
+    if catalog_path is None and archive_path is None:
+        return sqlite3.connect(db_name or settings.DATABASE_NAME, factory=InstrumentedConnection, **kwargs)
+    conn = sqlite3.connect(
+        database_uri(settings.DATABASE_NAME), uri=True, factory=InstrumentedConnection, **kwargs
+    )
+    if catalog_path is not None:
+        attach_catalog(conn, writable=catalog == "rw", path=catalog_path)
+    if archive_path is not None:
+        attach_archive(conn, writable=archive == "rw", path=archive_path)
+    return conn
+
+
+def open_stores(
+    db_name: Optional[str] = None,
+    catalog_name: Optional[str] = None,
+    archive_name: Optional[str] = None,
+    **kwargs
+) -> sqlite3.Connection:
+    """
+    Plain connection to the transactional store with the catalog and archive
+    stores attached read-write (created if missing), for migrations and
+    offline tools
+    """
+    db_name = db_name or settings.DATABASE_NAME
+    if db_name == settings.DATABASE_NAME:
+        catalog_name = catalog_name or catalog_database()
+        archive_name = archive_name or archive_database()
+    kwargs.setdefault("timeout", 10)
+    conn = sqlite3.connect(database_uri(db_name), uri=True, **kwargs)
+    if catalog_name and os.path.abspath(catalog_name) != os.path.abspath(db_name):
+        conn.execute(f"ATTACH DATABASE ? AS {CATALOG_SCHEMA}", (database_uri(catalog_name, mode="rwc"),))
+    if archive_name and os.path.abspath(archive_name) != os.path.abspath(db_name):
+        attach_archive(conn, writable=True, path=archive_name)
+    return conn
+
+
+def connect_catalog(**kwargs) -> sqlite3.Connection:
+    """Read-only connection for code that only reads catalog tables (snapshot, facets, cached lists)"""
+    path = catalog_database()
+    if path is None:
+        return connect(archive=None, **kwargs)
+    kwargs.setdefault("timeout", 10)
+    return sqlite3.connect(
+        database_uri(path, **_catalog_params(False)), uri=True, factory=InstrumentedConnection, **kwargs
+    )
+
 
 def get_db():
-    conn = sqlite3.connect(settings.DATABASE_NAME, check_same_thread=False,timeout=10)
+    conn = connect(check_same_thread=False)
     try:
         conn.row_factory = sqlite3.Row
-        print(f"db connection sucessful created")
         yield conn
     except Exception as e:
-        print(f"db connection error: {e}")
+        logger.error("db connection error: %s", e)
         raise e
     finally:
         conn.close()
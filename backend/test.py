@@ -18,7 +18,7 @@ load_dotenv(find_dotenv(filename="/Users/swarajsolanke/Smart_assistant_chatbot/u
 
 
 
-ollama_embed=OllamaEmbeddings(model="nomic-embed-text:latest")
+ollama_embed=OllamaEmbeddings(model="nomic-embed-text:latest", base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
 
 class VectorStore:
     def __init__(self):
@@ -166,7 +166,8 @@ CAREER_TENDENCIES:
 
 llm = ChatOllama(
     model="gemma2:2b",
-    temperature=0
+    temperature=0,
+    base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 )
 
 
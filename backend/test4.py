@@ -213,88 +213,15 @@ Return ONLY valid JSON matching the schema.
 
 
 
-# def trait_similarity(user_scores: dict, major_scores: dict) -> float:
-#     score = 0.0
-#     for trait, user_value in user_scores.items():
-#         print(trait)
-#         print(user_value)
-#         major_value = major_scores.get(trait, 0.0)
-#         score += user_value * major_value
-#     return score
-
-
-def trait_similarity(user_scores: dict, major_scores: dict) -> float:
-    numerator = 0.0
-    denominator = 0.0
-
-    for trait, user_value in user_scores.items():
-        print(trait)
-        print(user_value)
-        numerator += user_value * major_scores.get(trait, 0.0)
-        denominator += user_value
-        print(numerator)
-        print(denominator)
-
-    if denominator == 0:
-        return 0.0
-
-    return numerator / denominator   
-
-
-
-Trait_Weights ={
-    "academic_strengths": 0.30,
-    "thinking_style": 0.25,
-    "learning_style": 0.20,
-    "interests": 0.15
-}
-
-
-
-#score one major
-
-
-
-def score_major(user_traits: dict, major_row: dict) -> float:
-    academic = trait_similarity(
-        user_traits["academic_strengths"],
-        json.loads(major_row["academic_strengths_scores"])
-    )
-
-    thinking = trait_similarity(
-        user_traits["thinking_style"],
-        json.loads(major_row["thinking_style_scores"])
-    )
-
-    learning = trait_similarity(
-        user_traits["learning_style"],
-        json.loads(major_row["learning_style_scores"])
-    )
-
-    interests = trait_similarity(
-        user_traits["interests"],
-        json.loads(major_row["interests_scores"])
-
-    )
-
-    final_score = (
-       Trait_Weights["academic_strengths"] * academic +
-        Trait_Weights["thinking_style"] * thinking +
-        Trait_Weights["learning_style"] * learning +
-        Trait_Weights["interests"] * interests
-    )
-    print(final_score)
-
-    return round(final_score, 2)
-
-
+# Trait scoring lives in services.scoring_service so the weights come from the
+# AI weights registry instead of a hardcoded dict.
+from services.scoring_service import trait_similarity, score_major, recommend_majors
 
 
 
 #fetch major from DB
 
 def fetch_majors(conn):
-    conn = sqlite3.connect("/Users/swarajsolanke/Smart_assistant_chatbot/university_recommander/University.db")
     cursor = conn.cursor()
     cursor.execute("""
         SELECT 
@@ -314,33 +241,6 @@ def fetch_majors(conn):
 
 
 
-#rank and recommanded the major 
-
-def recommend_majors(user_traits, majors, top_k=5):
-    recommendations = []
-
-    for major in majors:
-        score = score_major(user_traits, major)
-        recommendations.append({
-            "major": major["major"],
-            #"category": major["category_Name"],
-            "score": score
-        })
-
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-    return recommendations[:top_k]
-
-
-
-
-
-
-
-
-
-
-
-
 def insert_into_db_score(data:dict ,category_id:str):
     conn = sqlite3.connect("/Users/swarajsolanke/Smart_assistant_chatbot/university_recommander/University.db")
     cur = conn.cursor()
@@ -0,0 +1,200 @@
+# metrics.py - In-process request metrics with Prometheus text exposition
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ============= Per-request accounting =============
+
+class RequestStats:
+    """Work done while serving one request; filled in by the timers below"""
+    __slots__ = ("db_queries", "db_time", "llm_calls", "llm_time", "chroma_queries", "chroma_time")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.llm_calls = 0
+        self.llm_time = 0.0
+        self.chroma_queries = 0
+        self.chroma_time = 0.0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def begin_request() -> Tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def end_request(token):
+    _current_stats.reset(token)
+
+
+def record_db_statement():
+    """Called from the SQLite trace callback once per executed statement"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+
+
+def record_db_time(seconds: float):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.db_time += seconds
+
+
+@contextmanager
+def timed(kind: str):
+    """Time an external call ('llm' or 'chroma') against the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current_stats.get()
+        if stats is not None:
+            elapsed = time.perf_counter() - start
+            if kind == "llm":
+                stats.llm_calls += 1
+                stats.llm_time += elapsed
+            elif kind == "chroma":
+                stats.chroma_queries += 1
+                stats.chroma_time += elapsed
+
+
+# ============= Metric types =============
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+ROUTE_LABELS = ("method", "route")
+
+REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status")))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "End-to-end request latency", ROUTE_LABELS))
+REQUEST_DB_QUERIES = REGISTRY.register(Histogram(
+    "http_request_db_queries", "SQLite statements executed per request", ROUTE_LABELS, COUNT_BUCKETS))
+REQUEST_DB_SECONDS = REGISTRY.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQLite per request", ROUTE_LABELS))
+REQUEST_LLM_CALLS = REGISTRY.register(Counter(
+    "http_request_llm_calls_total", "LLM calls made while serving requests", ROUTE_LABELS))
+REQUEST_LLM_SECONDS = REGISTRY.register(Histogram(
+    "http_request_llm_seconds", "Time spent waiting on the LLM per request", ROUTE_LABELS))
+REQUEST_CHROMA_QUERIES = REGISTRY.register(Counter(
+    "http_request_chroma_queries_total", "Chroma queries made while serving requests", ROUTE_LABELS))
+REQUEST_CHROMA_SECONDS = REGISTRY.register(Histogram(
+    "http_request_chroma_seconds", "Time spent in Chroma retrieval per request", ROUTE_LABELS))
+SLOW_QUERIES = REGISTRY.register(Counter(
+    "db_slow_queries_total", "SQLite statements slower than SLOW_QUERY_MS"))
+
+
+def observe_request(method: str, route: str, status: int, duration: float, stats: RequestStats):
+    labels = (method, route)
+    REQUESTS_TOTAL.inc((method, route, str(status)))
+    REQUEST_DURATION.observe(labels, duration)
+    REQUEST_DB_QUERIES.observe(labels, stats.db_queries)
+    REQUEST_DB_SECONDS.observe(labels, stats.db_time)
+    if stats.llm_calls:
+        REQUEST_LLM_CALLS.inc(labels, stats.llm_calls)
+        REQUEST_LLM_SECONDS.observe(labels, stats.llm_time)
+    if stats.chroma_queries:
+        REQUEST_CHROMA_QUERIES.inc(labels, stats.chroma_queries)
+        REQUEST_CHROMA_SECONDS.observe(labels, stats.chroma_time)
@@ -0,0 +1,84 @@
+# utils/responses.py - Response classes for large JSON, NDJSON and CSV bodies
+"""
+FastJSONResponse is the app's default response class (main.py), so every
+body is encoded with utils.serialization.dumps. Returning one directly also
+skips FastAPI's jsonable_encoder walk and response_model validation: do
+that for rows read straight from our own tables, not for data that relies
+on the model's coercion.
+
+Listings that can grow large are also streamed, as NDJSON (one object per
+line) to clients sending "Accept: application/x-ndjson", and as CSV or
+NDJSON from the admin export endpoints:
+
+    if wants_ndjson(request):
+        return stream_query("SELECT ... FROM universities ORDER BY id DESC")
+
+stream_query steps one statement on its own connection (the request's
+get_db connection can be closed before a streamed body is finished) and
+encodes STREAM_BATCH_ROWS rows per chunk, so memory stays flat however
+many rows there are. Give it queries whose ORDER BY is served by an index:
+a sort has to buffer every row before the first one comes out.
+"""
+import sqlite3
+from typing import Any, Dict, Iterator, Optional, Sequence
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from sqlite import connect
+from utils.serialization import column_names, dumps, dumps_csv, dumps_lines
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+STREAM_FORMATS = {"ndjson": NDJSON_MEDIA_TYPE, "csv": CSV_MEDIA_TYPE}
+STREAM_BATCH_ROWS = 500
+
+
+class FastJSONResponse(Response):
+    """JSONResponse encoded with orjson"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _query_chunks(sql: str, params: Sequence[Any], fmt: str, batch_rows: int) -> Iterator[bytes]:
+    # Starlette advances a sync iterator on its thread pool, not always the same thread
+    conn = connect(check_same_thread=False)
+    try:
+        # A plain cursor: an export is one long statement by design, not a slow query to log
+        cursor = sqlite3.Cursor(conn).execute(sql, params)
+        columns = column_names(cursor)
+        if fmt == "csv":
+            yield dumps_csv((), header=columns)
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                return
+            if fmt == "csv":
+                yield dumps_csv(rows)
+            else:
+                yield dumps_lines(dict(zip(columns, values)) for values in rows)
+    finally:
+        conn.close()
+
+
+def stream_query(
+    sql: str,
+    params: Sequence[Any] = (),
+    fmt: str = "ndjson",
+    filename: Optional[str] = None,
+    batch_rows: int = STREAM_BATCH_ROWS,
+) -> StreamingResponse:
+    """
+    The query's rows as an NDJSON stream (objects keyed by column name) or a
+    CSV stream (column names as the header row); `filename` makes it a download
+    """
+    headers: Dict[str, str] = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return StreamingResponse(
+        _query_chunks(sql, params, fmt, batch_rows), media_type=STREAM_FORMATS[fmt], headers=headers
+    )
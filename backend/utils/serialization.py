@@ -0,0 +1,65 @@
+# utils/serialization.py - Fast JSON (and CSV) encoding for response bodies
+"""
+orjson encodes the large list responses (university search, admin
+listings, session history) several times faster than the stdlib encoder
+behind FastAPI's JSONResponse, and produces bytes directly. When it isn't
+installed, dumps() falls back to json with the same compact UTF-8 output.
+dumps_lines and dumps_csv encode chunks of rows for streamed exports.
+"""
+import io
+import csv
+import json
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # optional: requirements.txt installs it
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _default(value: Any) -> Any:
+    # What orjson encodes natively and the stdlib encoder doesn't
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON for dicts/lists of plain values (datetimes as ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(data, option=_ORJSON_OPTIONS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def dumps_lines(items: Iterable[Any]) -> bytes:
+    """NDJSON: one encoded item per line, each line newline-terminated"""
+    return b"".join(dumps(item) + b"\n" for item in items)
+
+
+def _csv_cell(value: Any) -> Any:
+    # Spreadsheets run cells starting with these as formulas; user-entered text must not
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+def dumps_csv(rows: Iterable[Sequence[Any]], header: Optional[Sequence[str]] = None) -> bytes:
+    """CSV lines (RFC 4180 quoting, CRLF) for rows of plain values; None becomes an empty cell"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header is not None:
+        writer.writerow(header)
+    writer.writerows([_csv_cell(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def column_names(cursor) -> List[str]:
+    return [column[0] for column in cursor.description]
+
+
+def rows_to_dicts(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Rows (tuples or sqlite3.Row) as dicts keyed by column name, without per-row models"""
+    return [dict(zip(columns, row)) for row in rows]
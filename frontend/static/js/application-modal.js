@@ -1,9 +1,13 @@
+// Matches MAX_BATCH_UNIVERSITIES on the server
+const MAJORS_BATCH_SIZE = 50;
+
 class ApplicationModal {
     constructor() {
         this.selectedUniversity = null;
         this.selectedMajor = null;
         this.universities = [];
         this.majors = [];
+        this.majorsCache = new Map();
         this.init();
     }
 
@@ -172,6 +176,26 @@ class ApplicationModal {
                 this.selectUniversity(uniId);
             });
         });
+
+        // Warm the majors of the first cards with one batch request
+        this.prefetchMajors(universities.slice(0, MAJORS_BATCH_SIZE).map(uni => uni.id))
+            .catch(error => console.warn('Majors prefetch failed:', error));
+    }
+
+    async prefetchMajors(universityIds) {
+        const ids = universityIds.filter(id => !this.majorsCache.has(id));
+        if (ids.length === 0) return;
+
+        const response = await fetch('/api/universities/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ university_ids: ids, include_media: false })
+        });
+        if (!response.ok) {
+            throw new Error('Failed to load majors');
+        }
+        const data = await response.json();
+        data.universities.forEach(uni => this.majorsCache.set(uni.id, uni.majors));
     }
 
     filterUniversities(searchTerm) {
@@ -213,14 +237,11 @@ class ApplicationModal {
 
     async loadMajors(universityId) {
         try {
-            const response = await fetch(`/api/universities/${universityId}/majors`);
-            const data = await response.json();
-
-            if (!response.ok) {
-                throw new Error('Failed to load majors');
+            if (!this.majorsCache.has(universityId)) {
+                await this.prefetchMajors([universityId]);
             }
 
-            this.majors = data.majors || data;
+            this.majors = this.majorsCache.get(universityId) || [];
             this.displayMajors();
         } catch (error) {
             console.error('Error loading majors:', error);
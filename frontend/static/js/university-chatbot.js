@@ -1,4 +1,7 @@
 
+// Matches MAX_COMPARE_UNIVERSITIES on the server
+const MAX_COMPARE = 10;
+
 class UniversityChatbot {
     constructor() {
         this.sessionId = null;
@@ -125,6 +128,7 @@ class UniversityChatbot {
         this.budgetValue = document.getElementById('budgetValue');
         this.gpaRange = document.getElementById('gpaRange');
         this.gpaValue = document.getElementById('gpaValue');
+        this.facetMatchCount = document.getElementById('facetMatchCount');
 
         // Buttons
         this.trackBtns = document.querySelectorAll('.track-btn');
@@ -149,6 +153,7 @@ class UniversityChatbot {
                 this.trackBtns.forEach(b => b.classList.remove('active'));
                 btn.classList.add('active');
                 this.filters.scholarship_track = btn.dataset.track === 'scholarship';
+                this.refreshFacets();
             });
         });
 
@@ -167,14 +172,19 @@ class UniversityChatbot {
             const value = parseInt(e.target.value);
             this.budgetValue.textContent = value.toLocaleString();
             this.filters.max_tuition = value;
+            this.scheduleFacetRefresh();
         });
 
         this.gpaRange.addEventListener('input', (e) => {
             const value = parseFloat(e.target.value);
             this.gpaValue.textContent = value.toFixed(1);
             this.filters.min_gpa = value;
+            this.scheduleFacetRefresh();
         });
 
+        this.countryFilter.addEventListener('change', () => this.refreshFacets());
+        this.majorFilter.addEventListener('change', () => this.refreshFacets());
+
         this.applyFiltersBtn.addEventListener('click', () => {
             this.filters.country = this.countryFilter.value;
             this.filters.major = this.majorFilter.value;
@@ -223,12 +233,57 @@ class UniversityChatbot {
                 this.filters.max_tuition = data.tuition_range.max;
             }
 
+            if (data.facets) this.renderFacets(data.facets);
+
         } catch (error) {
             console.error('Error loading filters:', error);
             this.showToast('Failed to load filter options', 'error');
         }
     }
 
+    scheduleFacetRefresh() {
+        // Sliders fire on every step; only ask once they settle
+        clearTimeout(this.facetTimer);
+        this.facetTimer = setTimeout(() => this.refreshFacets(), 150);
+    }
+
+    async refreshFacets() {
+        const params = new URLSearchParams();
+        if (this.countryFilter.value) params.set('country', this.countryFilter.value);
+        if (this.majorFilter.value) params.set('major', this.majorFilter.value);
+        if (this.filters.max_tuition) params.set('max_tuition', this.filters.max_tuition);
+        if (this.filters.min_gpa) params.set('min_gpa', this.filters.min_gpa);
+        if (this.filters.scholarship_track) params.set('scholarship_track', 'true');
+
+        // Drop the previous request so a slow answer never overwrites a newer one
+        if (this.facetRequest) this.facetRequest.abort();
+        this.facetRequest = new AbortController();
+        try {
+            const response = await fetch(`/chatbot/university/facets?${params}`, { signal: this.facetRequest.signal });
+            if (!response.ok) return;
+            this.renderFacets(await response.json());
+        } catch (error) {
+            if (error.name !== 'AbortError') console.error('Error loading facet counts:', error);
+        }
+    }
+
+    renderFacets(facets) {
+        const label = (select, entries) => {
+            const counts = new Map(entries.map(e => [e.value, e.count]));
+            Array.from(select.options).forEach(option => {
+                if (!option.value) return;
+                const count = counts.get(option.value) || 0;
+                option.textContent = `${option.value} (${count})`;
+                option.disabled = count === 0 && option.value !== select.value;
+            });
+        };
+        label(this.countryFilter, facets.countries);
+        label(this.majorFilter, facets.majors);
+        if (this.facetMatchCount) {
+            this.facetMatchCount.textContent = `${facets.total.toLocaleString()} universities match`;
+        }
+    }
+
     async createSession() {
         try {
             const response = await fetch('/chatbot/university/session', {
@@ -443,9 +498,9 @@ class UniversityChatbot {
         const checkbox = card.querySelector('input[type="checkbox"]');
         checkbox.addEventListener('change', (e) => {
             if (e.target.checked) {
-                if (this.selectedUniversities.size >= 2) {
+                if (this.selectedUniversities.size >= MAX_COMPARE) {
                     e.target.checked = false;
-                    this.showToast('You can only compare up to 3 universities', 'warning');
+                    this.showToast(`You can only compare up to ${MAX_COMPARE} universities`, 'warning');
                     return;
                 }
                 this.selectedUniversities.add(uni.id);
@@ -463,8 +518,8 @@ class UniversityChatbot {
             return;
         }
 
-        if (this.selectedUniversities.size > 3) {
-            this.showToast('You can only compare up to 3 universities', 'warning');
+        if (this.selectedUniversities.size > MAX_COMPARE) {
+            this.showToast(`You can only compare up to ${MAX_COMPARE} universities`, 'warning');
             return;
         }
 
@@ -511,9 +566,9 @@ class UniversityChatbot {
 
         criteria.forEach(criterion => {
             tableHTML += `<tr><td><strong>${criterion.label}</strong></td>`;
-            universities.forEach(uni => {
-                let value = uni[criterion.key];
-                if (criterion.format) value = criterion.format(value);
+            // Columnar payload: one array of values per criterion
+            (data.columns[criterion.key] || []).forEach(value => {
+                if (criterion.format && value != null) value = criterion.format(value);
                 tableHTML += `<td>${value || 'N/A'}</td>`;
             });
             tableHTML += '</tr>';